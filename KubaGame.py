@@ -7,7 +7,54 @@
 #   this video: https://www.youtube.com/watch?v=XglqkfzsXYc to learn how to
 #   play the game.  KubaGame is composed of the KubaPlayer and KubaBoard
 #   classes and differs from the original board game by not allowing players to
-#   continue making moves after pushing off a marble.
+#   continue making moves after pushing off a marble. KubaPlayout plays by the
+#   same rules with nothing but the position, for fast self-play.
+
+import random
+import sys
+import time
+
+from kuba_render import (BLACK_BACKGROUND, WHITE_BACKGROUND, RED_BACKGROUND,
+                         RESET, render_board)
+from kuba_stats import (KubaStats, WRONG_TURN, GAME_OVER, OUT_OF_RANGE,
+                        WRONG_COLOR, BLOCKED, OWN_MARBLE, BAD_DIRECTION, UNDO)
+
+DIRECTIONS = ('L', 'R', 'F', 'B')   # Every direction a marble can be pushed
+
+# Zobrist keys: a random 64 bit number for every marble on every cell. The hash
+# of a board is the xor of the keys of its marbles, so a push only has to xor
+# out the old and xor in the new marbles of one row or column. The keys come
+# from a fixed seed so hashes are the same in every process and every run.
+_MASK_64 = (1 << 64) - 1
+_zobrist_random = random.Random(0x4B756261)
+_ZOBRIST = {
+    marble: [_zobrist_random.getrandbits(64) for _ in range(49)]
+    for marble in ('W', 'B', 'R')
+}
+_ZOBRIST[' '] = [0] * 49
+# Keys for the player to move and each player's captured count, by the order
+# the players were passed to KubaGame.
+_ZOBRIST_TURN = [_zobrist_random.getrandbits(64) for _ in range(2)]
+_ZOBRIST_CAPTURED = [
+    [_zobrist_random.getrandbits(64) for _ in range(14)] for _ in range(2)
+]
+
+
+def move_to_index(move):
+    """
+    Returns the number 0-195 of move ((row, col), direction). It is the index
+    of the cell (row * 7 + col) times 4 plus the index of the direction in
+    DIRECTIONS, so every move fits in one byte.
+    """
+    (row, col), direction = move
+    return (7 * row + col) * 4 + DIRECTIONS.index(direction)
+
+
+def index_to_move(index):
+    """Returns the move ((row, col), direction) numbered index by move_to_index"""
+    cell, direction = divmod(index, 4)
+    return divmod(cell, 7), DIRECTIONS[direction]
+
 
 class KubaPlayer:
     """
@@ -44,6 +91,10 @@ class KubaPlayer:
         """Increases the number of red marbles captured by the player by 1"""
         self._captured_count += 1
 
+    def decrement_captured_count(self):
+        """Decreases the number of red marbles captured by the player by 1"""
+        self._captured_count -= 1
+
 
 class KubaBoard:
     """
@@ -52,6 +103,12 @@ class KubaBoard:
     specifed coordinate, get a count of all the marbles on the board, and to
     display the board with or without color.
     """
+    # for printing the board in color, shared by every board
+    _BLACKBG  = BLACK_BACKGROUND
+    _WHITEBG  = WHITE_BACKGROUND
+    _REDBG    = RED_BACKGROUND
+    _ENDC     = RESET
+
     def __init__(self, clone=None):
         """
         Creates a new KubaBoard.
@@ -61,11 +118,6 @@ class KubaBoard:
         marbles. If clone is provided, it should be a 7x7 grid (list of lists)
         of marbles ('W', 'B', 'R', and ' ' for empty positions).
         """
-        # for printing the board in color
-        self._BLACKBG  = '\33[40m'
-        self._WHITEBG  = '\33[47m'
-        self._REDBG    = '\33[41m'
-        self._ENDC     = '\033[0m'
         if clone is None:
             self.board = [
                 ['W', 'W', ' ', ' ', ' ', 'B', 'B'],
@@ -94,6 +146,14 @@ class KubaBoard:
             new_board.append(new_row)
         self.board = new_board
 
+    def same_position(self, other):
+        """
+        Returns True if other has the same marbles on every cell. Boards still
+        compare and hash by identity with == and hash, so they can be kept in
+        sets and used as dictionary keys.
+        """
+        return self.board == other.board
+
     def get_marble(self, coordinates):
         """
         Returns the marble at coordinates
@@ -117,6 +177,136 @@ class KubaBoard:
             R += row.count('R')
         return W, B, R
 
+    def zobrist_hash(self):
+        """Returns the 64 bit Zobrist hash of the marbles on the board"""
+        value = 0
+        for row in range(7):
+            for col in range(7):
+                value ^= _ZOBRIST[self.board[row][col]][7 * row + col]
+        return value
+
+    def hash_change(self, other, row, col, direction):
+        """
+        Returns the xor of the Zobrist hashes of this board and the board
+        other, where other is this board after pushing (row, col) in
+        direction. Only the row (for 'L' and 'R') or column (for 'F' and 'B')
+        that was pushed is looked at.
+        """
+        value = 0
+        if direction in 'LR':
+            cells = [(row, c) for c in range(7)]
+        else:
+            cells = [(r, col) for r in range(7)]
+        for row, col in cells:
+            before, after = self.board[row][col], other.board[row][col]
+            if before != after:
+                index = 7 * row + col
+                value ^= _ZOBRIST[before][index] ^ _ZOBRIST[after][index]
+        return value
+
+    def push(self, row, col, direction):
+        """
+        Pushes the marble at (row, col) and every marble directly in front of
+        it one cell in direction, changing the board in place. Does not check
+        whether the push is allowed (see candidate_moves).
+
+        :return: A tuple (fallen, hash_change, undo) where fallen is the marble
+                 ('W', 'B' or 'R') pushed off of the board or None, hash_change
+                 is the xor of the Zobrist hashes before and after the push and
+                 undo can be passed to undo_push to take the push back.
+        """
+        board = self.board
+        ray = _RAYS[direction][7 * row + col]
+        length = 0
+        for r, c in ray:
+            if board[r][c] == ' ':
+                break
+            length += 1
+        if length == len(ray):              # The last marble is pushed off
+            cells = ray
+            fallen = board[ray[-1][0]][ray[-1][1]]
+        else:                               # Only marbles up to a gap move
+            cells = ray[:length + 1]
+            fallen = None
+
+        marbles = tuple(board[r][c] for r, c in cells)
+        hash_change = 0
+        previous = ' '
+        for (r, c), marble in zip(cells, marbles):
+            if marble != previous:
+                index = 7 * r + c
+                hash_change ^= _ZOBRIST[marble][index] ^ _ZOBRIST[previous][index]
+                board[r][c] = previous
+            previous = marble
+        return fallen, hash_change, (cells, marbles)
+
+    def pushed_off(self, row, col, direction):
+        """
+        Returns the marble ('W', 'B' or 'R') that pushing the marble at (row,
+        col) in direction would push off of the board, or None. Only the cells
+        of one row or column are looked at and the board is not changed.
+        """
+        board = self.board
+        for r, c in _RAYS[direction][7 * row + col]:
+            if board[r][c] == ' ':
+                return None
+        return board[r][c]
+
+    def undo_push(self, undo):
+        """
+        Takes back a push, where undo is the last item of the tuple returned by
+        push. Pushes have to be taken back in the reverse order they were made.
+        """
+        cells, marbles = undo
+        board = self.board
+        for (r, c), marble in zip(cells, marbles):
+            board[r][c] = marble
+
+    def candidate_moves(self, color):
+        """
+        Returns a list of every move ((row, col), direction) that pushes a
+        marble of color without being blocked or pushing off a marble of color.
+        The moves are ordered by row, column and then direction in the order of
+        DIRECTIONS. This does not know about turns or the rule against undoing
+        the last move, see KubaGame.legal_moves for that.
+        """
+        board = self.board
+        first_row, last_row = board[0], board[6]
+        moves = []
+        for row in range(7):
+            cells = board[row]
+            left_is_own = cells[0] == color
+            right_is_own = cells[6] == color
+            for col in range(7):
+                if cells[col] != color:
+                    continue
+                if not left_is_own and (col == 6 or cells[col + 1] == ' '):
+                    moves.append(((row, col), 'L'))
+                if not right_is_own and (col == 0 or cells[col - 1] == ' '):
+                    moves.append(((row, col), 'R'))
+                if first_row[col] != color and (row == 6 or board[row + 1][col] == ' '):
+                    moves.append(((row, col), 'F'))
+                if last_row[col] != color and (row == 0 or board[row - 1][col] == ' '):
+                    moves.append(((row, col), 'B'))
+        return moves
+
+    def changed_lines(self, other):
+        """
+        Compares this board with the board other and returns a tuple (row, col)
+        where row is the index of the only row with cells that differ between
+        the two boards (or None if the differences are spread over more than
+        one row or there are none) and col is the same for columns.
+        """
+        rows, cols = set(), set()
+        for row in range(7):
+            for col in range(7):
+                if self.board[row][col] != other.board[row][col]:
+                    rows.add(row)
+                    cols.add(col)
+        row = rows.pop() if len(rows) == 1 else None
+        col = cols.pop() if len(cols) == 1 else None
+        return row, col
+
     def display(self, colored=False):
         """
         Prints out the 7x7 board with the rows and column numbers displayed on
@@ -124,43 +314,418 @@ class KubaBoard:
         displayed in color. Note: this requires a terminal that excepts the
         escape codes profided by the Colors class.
         """
-        if not colored:
-            i = 0
-            print(' ', *list(range(7)), sep=' ')
-            for row in self.board:
-                print(i, end=' ')
-                for column in row:
-                    print(column, end=' ')
-                i +=1
-                print()
+        sys.stdout.write(render_board(self.board, colored))
+
+
+# Bitboard layout: the cell (row, col) is stored in bit row * 7 + col of a 49
+# bit integer. The tables below are indexed by that bit index and are built
+# once at import time so pushing and validating never loop over the board.
+_FULL_MASK = (1 << 49) - 1
+_ROW_MASKS = [0x7F << (7 * row) for row in range(7)]
+_COL_MASKS = [sum(1 << (7 * row + col) for row in range(7)) for col in range(7)]
+_EDGE_MASK = _ROW_MASKS[0] | _ROW_MASKS[6] | _COL_MASKS[0] | _COL_MASKS[6]
+_SHIFTS = {'R': 1, 'L': -1, 'B': 7, 'F': -7}
+_CELLS = range(7)           # Valid row and column indices
+
+
+def _build_rays():
+    """
+    Returns {direction: [ray, ...]} where ray is a tuple of the cells (row,
+    col) from a cell to the edge of the board in direction, starting with the
+    cell itself.
+    """
+    rays = {}
+    for direction in _SHIFTS:
+        entries = []
+        for index in range(49):
+            row, col = divmod(index, 7)
+            if direction == 'R':
+                cells = [(row, c) for c in range(col, 7)]
+            elif direction == 'L':
+                cells = [(row, c) for c in range(col, -1, -1)]
+            elif direction == 'B':
+                cells = [(r, col) for r in range(row, 7)]
+            else:
+                cells = [(r, col) for r in range(row, -1, -1)]
+            entries.append(tuple(cells))
+        rays[direction] = entries
+    return rays
+
+
+def _build_push_table():
+    """
+    Returns {direction: [(ray, last, line, shift), ...]} where ray is the mask
+    of the cells in _RAYS, last is the bit of the cell on the edge, line is
+    the mask of the row or column being pushed and shift is the bit offset of
+    a push.
+    """
+    table = {}
+    for direction, shift in _SHIFTS.items():
+        entries = []
+        for index, cells in enumerate(_RAYS[direction]):
+            row, col = divmod(index, 7)
+            bits = [1 << (7 * r + c) for r, c in cells]
+            line = _ROW_MASKS[row] if direction in 'RL' else _COL_MASKS[col]
+            entries.append((sum(bits), bits[-1], line, shift))
+        table[direction] = entries
+    return table
+
+
+def _build_guard_table():
+    """
+    Returns {direction: [(edge, behind), ...]} where edge is the bit of the
+    cell a push in direction could knock off of the board and behind is the
+    bit of the cell that has to be empty for the push to be allowed (0 when
+    the marble is already on the edge it is pushed away from).
+    """
+    table = {}
+    for direction in _SHIFTS:
+        entries = []
+        for index in range(49):
+            row, col = divmod(index, 7)
+            if direction == 'R':
+                edge, behind = (row, 6), (row, col - 1) if col > 0 else None
+            elif direction == 'L':
+                edge, behind = (row, 0), (row, col + 1) if col < 6 else None
+            elif direction == 'B':
+                edge, behind = (6, col), (row - 1, col) if row > 0 else None
+            else:
+                edge, behind = (0, col), (row + 1, col) if row < 6 else None
+            edge_bit = 1 << (7 * edge[0] + edge[1])
+            behind_bit = 0 if behind is None else 1 << (7 * behind[0] + behind[1])
+            entries.append((edge_bit, behind_bit))
+        table[direction] = entries
+    return table
+
+
+_RAYS = _build_rays()
+_PUSH_TABLE = _build_push_table()
+_GUARD_TABLE = _build_guard_table()
+# {(row, col, direction): (bit of the cell, edge, behind, push)} of every
+# move on the board, where edge and behind come from _GUARD_TABLE and push is
+# the entry of _PUSH_TABLE, so a move is looked up only once.
+_MOVE_TABLE = {
+    (row, col, direction): ((1 << (7 * row + col),)
+                            + _GUARD_TABLE[direction][7 * row + col]
+                            + (_PUSH_TABLE[direction][7 * row + col],))
+    for row in range(7) for col in range(7) for direction in DIRECTIONS
+}
+
+
+def _push_bits(white, black, red, push):
+    """
+    Returns (white, black, red, fallen), the bitboards after a push, where
+    push is an entry of _PUSH_TABLE, and the marble pushed off of the board
+    or None. Does not check whether the push is allowed.
+    """
+    ray, last, line, shift = push
+    # The marbles that move are the ones from the pushed marble up to the
+    # first empty cell of the ray, or the whole ray if it has none.
+    free = ray & ~(white | black | red)
+    if not free:
+        run = ray
+        fallen = 'W' if white & last else 'B' if black & last else 'R'
+    elif shift > 0:
+        run = ray & ((free & -free) - 1)
+        fallen = None
+    else:
+        run = ray & -(1 << free.bit_length())
+        fallen = None
+
+    moved_white, moved_black, moved_red = white & run, black & run, red & run
+    if shift > 0:
+        moved_white <<= shift
+        moved_black <<= shift
+        moved_red <<= shift
+    else:
+        moved_white >>= -shift
+        moved_black >>= -shift
+        moved_red >>= -shift
+    keep = ~run
+    return ((white & keep) | (moved_white & line),
+            (black & keep) | (moved_black & line),
+            (red & keep) | (moved_red & line), fallen)
+
+
+class KubaBitBoard:
+    """
+    A drop in replacement for KubaBoard that stores the white, black and red
+    marbles as three 49 bit integers. Pushing a row or column of marbles and
+    counting marbles are a handful of shift and mask operations instead of
+    copies of a list of lists.
+    """
+    def __init__(self, clone=None):
+        """
+        Creates a new KubaBitBoard.
+
+        :param clone: Same as for KubaBoard, a 7x7 grid (list of lists) of
+                      marbles ('W', 'B', 'R', and ' ' for empty positions). If
+                      left out, the board is set up for a new game.
+        """
+        if clone is None:
+            self._white, self._black, self._red = _START_BITS
             return
+        self._white, self._black, self._red = 0, 0, 0
+        for row in range(7):
+            for col in range(7):
+                marble = clone[row][col]
+                bit = 1 << (7 * row + col)
+                if marble == 'W':
+                    self._white |= bit
+                elif marble == 'B':
+                    self._black |= bit
+                elif marble == 'R':
+                    self._red |= bit
 
-        new_board = []
-        for row in self.board:
-            new_row = []
-            for column in row:
-                if column == 'W':
-                    new_row.append(self._WHITEBG + 'W' + self._ENDC)
-                elif column == 'B':
-                    new_row.append(self._BLACKBG + 'B' + self._ENDC)
-                elif column == 'R':
-                    new_row.append(self._REDBG + 'R' + self._ENDC)
-                else:
-                    new_row.append(' ')
-            new_board.append(new_row)
+    @property
+    def board(self):
+        """Returns the board as a 7x7 grid (list of lists) like KubaBoard"""
+        return [
+            [self._marble_at(7 * row + col) for col in range(7)]
+            for row in range(7)
+        ]
+
+    def same_position(self, other):
+        """Same as KubaBoard.same_position"""
+        return (self._white == other._white and self._black == other._black
+                and self._red == other._red)
+
+    def copy(self):
+        """Returns a new KubaBitBoard with the same marbles as this one"""
+        new_board = KubaBitBoard.__new__(KubaBitBoard)
+        new_board._white = self._white
+        new_board._black = self._black
+        new_board._red = self._red
+        return new_board
+
+    def _marble_at(self, index):
+        """Returns 'W', 'B', 'R' or ' ' for the cell at bit index"""
+        bit = 1 << index
+        if self._white & bit:
+            return 'W'
+        if self._black & bit:
+            return 'B'
+        if self._red & bit:
+            return 'R'
+        return ' '
 
-        print('  ', '-'*16)
-        print(' ', '|', *list(range(7)), '|', sep=' ')
-        print('  ', '-'*16)
-        i = 0
-        for row in new_board:
-            print(i, '|', end=' ')
-            for column in row:
-                print(column, end=' ')
-            i += 1
-            print('|', end=' ')
-            print()
-        print('  ', '-'*16)
+    def get_marble(self, coordinates):
+        """
+        Returns the marble at coordinates
+
+        :param coordinates: A tuple (row, col) of indicis on the board
+        """
+        # Indexing a range raises or wraps around exactly like indexing the
+        # lists of KubaBoard.board does.
+        row = range(7)[coordinates[0]]
+        col = range(7)[coordinates[1]]
+        marble = self._marble_at(7 * row + col)
+        if marble == ' ':
+            return 'X'
+        else:
+            return marble
+
+    def get_marble_count(self):
+        """
+        Returns tuple (W, B, R) of marble counts on the board
+        """
+        return (self._white.bit_count(), self._black.bit_count(),
+                self._red.bit_count())
+
+    def can_push(self, row, col, direction, color):
+        """
+        Returns True if the marble of color at (row, col) is allowed to be
+        pushed in direction. This follows the same rules as
+        KubaGame._validate_move: the marble has to belong to color, the cell
+        it is pushed away from has to be empty (or off the board) and a marble
+        of color can not be on the edge the row or column is pushed towards.
+        """
+        if direction not in _GUARD_TABLE:
+            return False
+        if color == 'W':
+            own = self._white
+        elif color == 'B':
+            own = self._black
+        else:
+            return False
+        index = 7 * row + col
+        if not own & (1 << index):
+            return False
+        edge, behind = _GUARD_TABLE[direction][index]
+        if own & edge:
+            return False
+        if behind & (self._white | self._black | self._red):
+            return False
+        return True
+
+    def zobrist_hash(self):
+        """Returns the same hash as KubaBoard.zobrist_hash"""
+        return self._bits_hash(self._white, self._black, self._red)
+
+    def hash_change(self, other, row, col, direction):
+        """
+        Same as KubaBoard.hash_change. Only the cells whose marble changed are
+        looked at, so row, col and direction are not needed.
+        """
+        return self._bits_hash(self._white ^ other._white,
+                               self._black ^ other._black,
+                               self._red ^ other._red)
+
+    @staticmethod
+    def _bits_hash(white, black, red):
+        """Returns the xor of the Zobrist keys of the marbles in each mask"""
+        value = 0
+        for bits, keys in ((white, _ZOBRIST['W']), (black, _ZOBRIST['B']),
+                           (red, _ZOBRIST['R'])):
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                value ^= keys[bit.bit_length() - 1]
+        return value
+
+    def candidate_moves(self, color):
+        """
+        Returns the same list of moves as KubaBoard.candidate_moves in the same
+        order. The cells that can be pushed in each direction are found for the
+        whole board at once with a few masks.
+        """
+        pushable = self._pushable(color)
+        if pushable is None:
+            return []
+        cells = pushable['L'] | pushable['R'] | pushable['F'] | pushable['B']
+        moves = []
+        while cells:
+            bit = cells & -cells
+            cells ^= bit
+            coordinates = divmod(bit.bit_length() - 1, 7)
+            for direction in DIRECTIONS:
+                if pushable[direction] & bit:
+                    moves.append((coordinates, direction))
+        return moves
+
+    def _pushable(self, color):
+        """
+        Used internally to return {direction: mask of the cells with a marble
+        of color that can be pushed in direction}, or None if color is not 'W'
+        or 'B'. The masks are found for the whole board at once.
+        """
+        if color == 'W':
+            own = self._white
+        elif color == 'B':
+            own = self._black
+        else:
+            return None
+        empty = ~(self._white | self._black | self._red) & _FULL_MASK
+        first_col, last_col = _COL_MASKS[0], _COL_MASKS[6]
+        first_row, last_row = _ROW_MASKS[0], _ROW_MASKS[6]
+        # Multiplying the edge cells by a row (or column) of ones fills every
+        # row (or column) that has one of the player's marbles on that edge.
+        return {
+            'L': own & ~((own & first_col) * 0x7F)
+                     & (((empty >> 1) & ~last_col) | last_col),
+            'R': own & ~(((own & last_col) >> 6) * 0x7F)
+                     & (((empty << 1) & ~first_col) | first_col),
+            'F': own & ~((own & first_row) * first_col)
+                     & ((empty >> 7) | last_row),
+            'B': own & ~(((own & last_row) >> 42) * first_col)
+                     & ((empty << 7) | first_row),
+        }
+
+    def push_off_targets(self, color):
+        """
+        Returns the mask of the cells whose marbles a player of color could
+        push off of the board with one move, ignoring the rule against undoing
+        the last move. These are never marbles of color.
+        """
+        pushable = self._pushable(color)
+        if pushable is None:
+            return 0
+        occupied = self._white | self._black | self._red
+        first_col, last_col = _COL_MASKS[0], _COL_MASKS[6]
+        targets = 0
+        # Walk every pushable marble along the unbroken line of marbles in
+        # front of it; the lines that reach the edge push that marble off.
+        for direction, step, edge in (
+                ('L', lambda bits: (bits >> 1) & ~last_col, first_col),
+                ('R', lambda bits: (bits << 1) & ~first_col, last_col),
+                ('F', lambda bits: bits >> 7, _ROW_MASKS[0]),
+                ('B', lambda bits: (bits << 7) & _FULL_MASK, _ROW_MASKS[6])):
+            reach = pushable[direction]
+            for _ in range(6):
+                reach |= step(reach) & occupied
+            targets |= reach & edge
+        return targets
+
+    def get_features(self, color, targets=None):
+        """
+        Returns a dictionary of numbers about the marbles of color that are
+        useful to evaluate a position, each found with a few masks:
+
+            edge        marbles of color on an edge cell
+            exposed     marbles of color the other player could push off
+            capturable  red marbles a player of color could push off
+            threats     marbles of the other player color could push off
+            mobility    moves of color, ignoring the rule against undoing
+
+        :param targets: {color: push_off_targets(color)} for 'W' and 'B' if
+                        they are already known, so they are not found again.
+        """
+        if color == 'W':
+            own, other, other_color = self._white, self._black, 'B'
+        else:
+            own, other, other_color = self._black, self._white, 'W'
+        if targets is None:
+            targets = {'W': self.push_off_targets('W'),
+                       'B': self.push_off_targets('B')}
+        pushable = self._pushable(color) or {}
+        return {
+            'edge': (own & _EDGE_MASK).bit_count(),
+            'exposed': (own & targets[other_color]).bit_count(),
+            'capturable': (self._red & targets[color]).bit_count(),
+            'threats': (other & targets[color]).bit_count(),
+            'mobility': sum(mask.bit_count() for mask in pushable.values()),
+        }
+
+    def changed_lines(self, other):
+        """
+        Same as KubaBoard.changed_lines but for two KubaBitBoards.
+        """
+        changed = ((self._white ^ other._white) | (self._black ^ other._black)
+                   | (self._red ^ other._red))
+        row = col = None
+        if changed:
+            low_row, low_col = divmod((changed & -changed).bit_length() - 1, 7)
+            if not changed & ~_ROW_MASKS[low_row]:
+                row = low_row
+            if not changed & ~_COL_MASKS[low_col]:
+                col = low_col
+        return row, col
+
+    def push(self, row, col, direction):
+        """
+        Same as KubaBoard.push. Does not check whether the push is allowed
+        (see can_push).
+        """
+        white, black, red = self._white, self._black, self._red
+        self._white, self._black, self._red, fallen = _push_bits(
+            white, black, red, _PUSH_TABLE[direction][7 * row + col])
+        hash_change = self._bits_hash(white ^ self._white, black ^ self._black,
+                                      red ^ self._red)
+        return fallen, hash_change, (white, black, red)
+
+    def undo_push(self, undo):
+        """Same as KubaBoard.undo_push"""
+        self._white, self._black, self._red = undo
+
+    def display(self, colored=False):
+        """
+        Prints out the board exactly like KubaBoard.display.
+        """
+        sys.stdout.write(render_board(self.board, colored))
+
+
+_START_BOARD = KubaBitBoard(KubaBoard().board)
+_START_BITS = (_START_BOARD._white, _START_BOARD._black, _START_BOARD._red)
 
 
 class KubaGame:
@@ -170,7 +735,7 @@ class KubaGame:
     methods required to make moves, keep track of the current state, and play
     the game from start to finish.
     """
-    def __init__(self, player1_info, player2_info):
+    def __init__(self, player1_info, player2_info, bitboard=False):
         """
         Creates a new game of Kuba with a 7x7 board set up with marbles in the
         correct locations. Two players are created using the information
@@ -180,6 +745,10 @@ class KubaGame:
                              be either 'W' of 'B' and their name. Both are strings.
 
         :param player2_info: tuple (color, name) same info but for player 2.
+
+        :param bitboard:     If True, the board is stored as a KubaBitBoard
+                             instead of a KubaBoard. The game behaves exactly
+                             the same but moves are much faster.
         """
         self._player_info = {
             player1_info[0]: KubaPlayer(player1_info),
@@ -187,16 +756,294 @@ class KubaGame:
         }
         self._turn = None       # Name of player whose turn it is
         self._winner = None     # Name of player who wins the game
-        self._board = KubaBoard()
-        self._old_board = KubaBoard()
+        self._bitboard = bitboard
+        board_class = KubaBitBoard if bitboard else KubaBoard
+        self._board = board_class()
+        self._old_board = board_class()
+        # Zobrist hashes of _board and _old_board, kept up to date by each move
+        self._hash = self._board.zobrist_hash()
+        self._old_hash = self._hash
+        # The last move (row, col, direction) turned _old_board into _board.
+        # It is None while both are the starting board.
+        self._last_move = None
+        # (W, B, R) marble counts of _board, kept up to date by each move
+        self._marble_count = self._board.get_marble_count()
+        self._move_stack = []   # Undo records of the moves made with push
+        # Moves made since the start of the game with make_move or push, less
+        # the ones taken back; unlike _history it survives copy
+        self._move_count = 0
+        # (name, move, state before the move) of every move made with
+        # make_move, and (name, move, state after the move) of every move
+        # taken back with undo, so both can be done again without copying.
+        self._history = []
+        self._redo_stack = []
+        self._positions = {self.position_key(): 1}  # Times each key occurred
+        self._draw = False      # True once the draw policy ended the game
+        self._max_repetitions = None
+        self._max_moves = None
+        self._has_draw_policy = False
 
         self._debug = False     # Will print board after each move if True
         self._debug_color = False   # Will print board in color if True
+        self._stats = None      # KubaStats collecting numbers if not None
+
+    def enable_stats(self, stats=None):
+        """
+        Turns on instrumentation: make_move will count and time its work in
+        stats, a KubaStats that can be shared by many games. Returns stats,
+        which is a new KubaStats if left out.
+        """
+        if stats is None:
+            stats = KubaStats()
+        self._stats = stats
+        return stats
+
+    def disable_stats(self):
+        """Turns off instrumentation so make_move does no extra work"""
+        self._stats = None
+
+    def get_stats(self):
+        """
+        Returns a snapshot dictionary of the numbers collected since
+        enable_stats (see KubaStats.snapshot), or None if it is off.
+        """
+        if self._stats is None:
+            return None
+        return self._stats.snapshot()
+
+    def set_draw_policy(self, repetitions=None, max_moves=None):
+        """
+        Makes the game end in a draw (see is_draw) as soon as a move made with
+        make_move reaches a position for the repetitions time, or once a move
+        made with make_move brings get_move_count to max_moves. None turns a
+        rule off, which is the default for both.
+        """
+        self._max_repetitions = repetitions
+        self._max_moves = max_moves
+        self._has_draw_policy = repetitions is not None or max_moves is not None
+
+    def is_draw(self):
+        """Returns True if the game ended in a draw by the draw policy"""
+        return self._draw
+
+    def get_history(self):
+        """
+        Returns the list of (name, ((row, col), direction)) of the moves made
+        with make_move that have not been taken back with undo, oldest first
+        """
+        return [(name, move) for name, move, _ in self._history]
+
+    def get_move_count(self):
+        """
+        Returns the number of moves made since the start of the game with
+        make_move or push that have not been taken back, including the moves
+        made before the game was copied
+        """
+        return self._move_count
+
+    def get_repetitions(self):
+        """
+        Returns how many times the current position (see position_key) has
+        occurred in the moves made with make_move
+        """
+        return self._positions.get(self.position_key(), 0)
+
+    def undo(self):
+        """
+        Takes back the last move made with make_move and returns it, or None if
+        there is none. Only references to the boards are swapped back, so
+        nothing is copied. Moves made with push have to be popped first.
+        """
+        if self._move_stack:
+            raise ValueError('moves made with push have to be popped first')
+        if not self._history:
+            return None
+        name, move, before = self._history.pop()
+        self._count_position(-1)
+        self._redo_stack.append((name, move, self._snapshot(self._turn)))
+        self._restore(before)
+        return move
+
+    def redo(self):
+        """
+        Makes the last move taken back with undo again and returns it, or None
+        if there is none. Making any other move with make_move forgets the
+        moves that could be made again.
+        """
+        if self._move_stack:
+            raise ValueError('moves made with push have to be popped first')
+        if not self._redo_stack:
+            return None
+        name, move, after = self._redo_stack.pop()
+        self._history.append((name, move, self._snapshot(self._turn)))
+        self._restore(after)
+        self._count_position(1)
+        return move
+
+    def _snapshot(self, turn):
+        """
+        Used internally to return everything make_move changes as a tuple for
+        _restore, with turn as the player whose turn it is
+        """
+        first, second = self._player_info.values()
+        return (self._board, self._old_board, self._hash, self._old_hash,
+                self._last_move, turn, self._winner, self._draw,
+                self._marble_count, self._move_count, first._captured_count,
+                second._captured_count)
+
+    def _restore(self, snapshot):
+        """Used internally to go back to a state returned by _snapshot"""
+        (self._board, self._old_board, self._hash, self._old_hash,
+         self._last_move, self._turn, self._winner, self._draw,
+         self._marble_count, self._move_count, first_captured,
+         second_captured) = snapshot
+        first, second = self._player_info.values()
+        first._captured_count = first_captured
+        second._captured_count = second_captured
+
+    def _count_position(self, change):
+        """
+        Used internally to add change to the number of times the current
+        position occurred and return the new number
+        """
+        key = self.position_key()
+        positions = self._positions
+        count = positions.get(key, 0) + change
+        if count:
+            positions[key] = count
+        else:
+            del positions[key]
+        return count
 
     def get_current_turn(self):
         """Returns the players name whose turn it is"""
         return self._turn
 
+    def get_color(self, player_name):
+        """Returns the color of the marbles ('W' or 'B') of player_name"""
+        return self._player_info[player_name].get_color()
+
+    def get_opponent(self, player_name):
+        """Returns the name of the player who is not player_name"""
+        return self._get_opponent_name(player_name)
+
+    def get_players(self):
+        """
+        Returns a list of the (name, color) tuples of both players in the
+        order they were passed to KubaGame
+        """
+        return [(name, player.get_color())
+                for name, player in self._player_info.items()]
+
+    def copy(self, bitboard=None):
+        """
+        Returns a new KubaGame in exactly the same state as this one that can
+        be changed without changing this game. The moves made with push can
+        not be popped from the copy and the moves made with make_move can not
+        be taken back with undo, but the copy knows how often each position
+        occurred and has the same draw policy.
+
+        :param bitboard: Whether the copy stores its board as a KubaBitBoard.
+                         Defaults to the same kind of board as this game.
+        """
+        if bitboard is None:
+            bitboard = self._bitboard
+        board_class = KubaBitBoard if bitboard else KubaBoard
+        new_game = KubaGame.__new__(KubaGame)
+        new_game._player_info = {}
+        for name, player in self._player_info.items():
+            new_player = KubaPlayer((name, player.get_color()))
+            new_player._captured_count = player.get_captured_count()
+            new_game._player_info[name] = new_player
+        new_game._turn = self._turn
+        new_game._winner = self._winner
+        new_game._bitboard = bitboard
+        new_game._board = board_class(self._board.board)
+        new_game._old_board = board_class(self._old_board.board)
+        new_game._hash = self._hash
+        new_game._old_hash = self._old_hash
+        new_game._last_move = self._last_move
+        new_game._marble_count = self._marble_count
+        new_game._move_stack = []
+        new_game._move_count = self._move_count
+        new_game._history = []
+        new_game._redo_stack = []
+        new_game._positions = dict(self._positions)
+        new_game._draw = self._draw
+        new_game._max_repetitions = self._max_repetitions
+        new_game._max_moves = self._max_moves
+        new_game._has_draw_policy = self._has_draw_policy
+        new_game._debug = self._debug
+        new_game._debug_color = self._debug_color
+        new_game._stats = self._stats
+        return new_game
+
+    def playout(self):
+        """
+        Returns a KubaPlayout in the same position as this game, for playing
+        many fast moves that are never taken back
+        """
+        return KubaPlayout.from_state(*self.get_players(), self.get_state())
+
+    def get_state(self):
+        """
+        Returns the state of the game as a flat tuple of small ints that is
+        cheap to send to another process or store:
+
+            (white, black, red, old_white, old_black, old_red,
+             turn, winner, captured1, captured2, last_move)
+
+        The first six are the bitboards (see KubaBitBoard) of the board and the
+        board before the last move, turn and winner are 0 for the first player
+        passed to KubaGame, 1 for the second or None, and last_move is the
+        (row, col, direction) that turned the old board into the board or None.
+        KubaGame.from_state turns it back into a game.
+        """
+        names = list(self._player_info)
+        board, old_board = self._board, self._old_board
+        if not self._bitboard:
+            board = KubaBitBoard(board.board)
+            old_board = KubaBitBoard(old_board.board)
+        return (
+            board._white, board._black, board._red,
+            old_board._white, old_board._black, old_board._red,
+            None if self._turn is None else names.index(self._turn),
+            None if self._winner is None else names.index(self._winner),
+            self.get_captured(names[0]), self.get_captured(names[1]),
+            self._last_move,
+        )
+
+    @classmethod
+    def from_state(cls, player1_info, player2_info, state, bitboard=True,
+                   move_count=0):
+        """
+        Returns a new KubaGame for the two players in the state returned by
+        get_state. The players have to be passed in the same order as they
+        were to the game the state came from.
+
+        :param move_count: get_move_count of the game the state came from, so
+                           the move cap of a draw policy carries over.
+        """
+        game = cls(player1_info, player2_info, bitboard=bitboard)
+        names = list(game._player_info)
+        boards = []
+        for white, black, red in (state[0:3], state[3:6]):
+            board = KubaBitBoard.__new__(KubaBitBoard)
+            board._white, board._black, board._red = white, black, red
+            boards.append(board if bitboard else KubaBoard(board.board))
+        game._board, game._old_board = boards
+        game._hash = game._board.zobrist_hash()
+        game._old_hash = game._old_board.zobrist_hash()
+        game._marble_count = game._board.get_marble_count()
+        game._turn = None if state[6] is None else names[state[6]]
+        game._winner = None if state[7] is None else names[state[7]]
+        for name, captured in zip(names, state[8:10]):
+            game._player_info[name]._captured_count = captured
+        game._last_move = state[10]
+        game._move_count = move_count
+        game._positions = {game.position_key(): 1}
+        return game
+
     def _validate_move(self, player, row, col, direction):
         """
         Used internally to check if the move is valid.
@@ -207,9 +1054,12 @@ class KubaGame:
             return False
         if self._winner != None:            # A player has already won
             return False
-        for coordinate in (row, col):      # The coordinates are out of range
-            if coordinate not in range(7):
-                return False
+        if self._draw:                      # The draw policy ended the game
+            return False
+        if row not in _CELLS or col not in _CELLS:  # Out of range
+            return False
+        if self._bitboard:
+            return self._board.can_push(row, col, direction, player.get_color())
         # Can only push using players balls
         if self._board.board[row][col] != player.get_color():
             return False
@@ -243,6 +1093,8 @@ class KubaGame:
             # Ball is blocked by another ball
             if row in range(6) and self._board.board[row + 1][col] != ' ':
                 return False
+        else:                               # Not a valid direction
+            return False
 
         return True
 
@@ -324,38 +1176,90 @@ class KubaGame:
         :return Boolean:    True if the move is made and False if the move is
                             invalid (i.e. make_move did not do anything).
         """
+        if self._stats is None:
+            return self._make_move(player_name, coordinates, direction)
+        start = time.perf_counter()
+        move_is_made = self._make_move(player_name, coordinates, direction)
+        self._stats.add_time('make_move', time.perf_counter() - start)
+        if move_is_made:
+            self._stats.increment('moves_made')
+        return move_is_made
+
+    def _make_move(self, player_name, coordinates, direction):
+        """
+        Used internally to make a move for make_move, which only adds the
+        instrumentation around it. Takes the same arguments and returns the
+        same Boolean.
+        """
+        stats = self._stats
+        turn = self._turn
         if self._turn is None:                      # First move of the game
             self._turn = player_name
         row, col = coordinates[0], coordinates[1]   # To reduce typing and brain power
         player = self._player_info[player_name]
 
-        move_is_valid = self._validate_move(player, row, col, direction)
+        if stats is None:
+            move_is_valid = self._validate_move(player, row, col, direction)
+        else:
+            move_is_valid = self._timed_validate_move(player, row, col, direction)
         if not move_is_valid:
             return False
 
-        red_count = self._board.get_marble_count()[2]
-
-        if direction == 'R':
-            new_board = self._move_right(self._board.board, row, col, player)
-        elif direction == 'L':
-            new_board = self._move_left(self._board.board, row, col, player)
-        elif direction == 'B':
-            new_board = self._move_backward(self._board.board, row, col, player)
-        elif direction == 'F':
-            new_board = self._move_forward(self._board.board, row, col, player)
-
-        if new_board == self._old_board.board:
-            return False
+        if self._bitboard:
+            new_board = self._board.copy()
+            fallen, hash_change, _ = new_board.push(row, col, direction)
         else:
-            self._old_board = KubaBoard(self._board.board)
-            self._board = KubaBoard(new_board)
+            fallen = self._board.pushed_off(row, col, direction)
+            if direction == 'R':
+                new_board = self._move_right(self._board.board, row, col, player)
+            elif direction == 'L':
+                new_board = self._move_left(self._board.board, row, col, player)
+            elif direction == 'B':
+                new_board = self._move_backward(self._board.board, row, col, player)
+            elif direction == 'F':
+                new_board = self._move_forward(self._board.board, row, col, player)
+            new_board = KubaBoard(new_board)
+            hash_change = self._board.hash_change(new_board, row, col,
+                                                  direction)
+        if stats is not None:
+            stats.increment('board_allocations')
 
-        if red_count > self._board.get_marble_count()[2]:
-            player.increment_captured_count()
+        new_hash = self._hash ^ hash_change
+        # Boards are only compared cell by cell if their hashes collide
+        if (new_hash == self._old_hash
+                and new_board.same_position(self._old_board)):
+            if stats is not None:
+                stats.reject(UNDO)
+            return False
+        if self._move_stack:
+            # Moves made with push changed the boards the history refers to
+            self._history = []
+        self._history.append((player_name, ((row, col), direction),
+                              self._snapshot(turn)))
+        if self._redo_stack:
+            self._redo_stack = []
+        self._old_board = self._board
+        self._board = new_board
+        self._old_hash = self._hash
+        self._hash = new_hash
+        self._last_move = (row, col, direction)
+        self._move_stack = []       # Moves made with push can not be popped
+        self._move_count += 1
 
-        self._update_winner_state()
+        if fallen is not None:          # Only a push off can end the game
+            self._remove_marble(fallen)
+            if fallen == 'R':
+                player.increment_captured_count()
+            self._update_winner_state()
 
         self._turn = self._get_opponent_name(player_name)
+        repetitions = self._count_position(1)
+        if self._has_draw_policy and self._winner is None and (
+                self._max_repetitions is not None
+                and repetitions >= self._max_repetitions
+                or self._max_moves is not None
+                and self._move_count >= self._max_moves):
+            self._draw = True
 
         if self._debug:
             print('Player:', player_name)
@@ -365,6 +1269,238 @@ class KubaGame:
 
         return True
 
+    def _timed_validate_move(self, player, row, col, direction):
+        """
+        Used internally to call _validate_move when instrumentation is on,
+        timing it and counting the reason if the move is rejected.
+        """
+        start = time.perf_counter()
+        move_is_valid = self._validate_move(player, row, col, direction)
+        self._stats.add_time('validate_move', time.perf_counter() - start)
+        if not move_is_valid:
+            self._stats.reject(
+                self._rejection_reason(player, row, col, direction))
+        return move_is_valid
+
+    def _rejection_reason(self, player, row, col, direction):
+        """
+        Used internally to find out why _validate_move rejected a move, in the
+        same order as it checks. Only used with instrumentation on so the
+        checks in _validate_move stay as fast as possible.
+        """
+        if self._turn != player.get_name():
+            return WRONG_TURN
+        if self._winner is not None or self._draw:
+            return GAME_OVER
+        if row not in range(7) or col not in range(7):
+            return OUT_OF_RANGE
+        color = player.get_color()
+        if self._board.get_marble((row, col)) != color:
+            return WRONG_COLOR
+        if direction not in _SHIFTS:
+            return BAD_DIRECTION
+        edge, behind = {
+            'R': ((row, 6), (row, col - 1) if col > 0 else None),
+            'L': ((row, 0), (row, col + 1) if col < 6 else None),
+            'B': ((6, col), (row - 1, col) if row > 0 else None),
+            'F': ((0, col), (row + 1, col) if row < 6 else None),
+        }[direction]
+        if self._board.get_marble(edge) == color:
+            return OWN_MARBLE
+        if behind is not None and self._board.get_marble(behind) != 'X':
+            return BLOCKED
+        return None
+
+    def legal_moves(self, player_name=None):
+        """
+        Returns a list of every move ((row, col), direction) that make_move
+        would accept for player_name without changing the game. The moves are
+        ordered by row, column and then direction in the order of DIRECTIONS.
+
+        :param player_name: Defaults to the player whose turn it is. Before the
+                            first move of the game either player can move, so
+                            an empty list is returned unless it is given.
+        """
+        if player_name is None:
+            player_name = self._turn
+        if player_name is None or self._winner is not None or self._draw:
+            return []
+        if self._turn is not None and self._turn != player_name:
+            return []
+        color = self._player_info[player_name].get_color()
+        moves = self._board.candidate_moves(color)
+
+        # A push only changes one row or column, so it can only recreate the
+        # previous board if every cell that differs from it is in that line.
+        row, col = self._board.changed_lines(self._old_board)
+        if row is None and col is None:
+            return moves
+        return [
+            move for move in moves
+            if not (move[1] in 'LR' and move[0][0] == row
+                    or move[1] in 'FB' and move[0][1] == col)
+            or not self._is_undo(move[0][0], move[0][1], move[1])
+        ]
+
+    def validate_moves(self, moves, player_name=None):
+        """
+        Checks many moves at once without changing the game. Returns a list
+        with one result per move in moves: None if make_move would accept it,
+        otherwise the reason it would be rejected (WRONG_TURN, GAME_OVER,
+        OUT_OF_RANGE, WRONG_COLOR, BAD_DIRECTION, OWN_MARBLE, BLOCKED or UNDO
+        from kuba_stats), checked in the same order as make_move.
+
+        :param moves:       Iterable of (row, col, direction), e.g. a list of
+                            tuples or the rows of an array. A row and column
+                            given as strings, like in a NumPy array that also
+                            holds the directions, are read as integers.
+
+        :param player_name: Defaults to the player whose turn it is. Before the
+                            first move of the game either player can move, so
+                            every move is rejected with WRONG_TURN unless it is
+                            given.
+        """
+        if player_name is None:
+            player_name = self._turn
+        if player_name is None or (self._turn is not None
+                                   and self._turn != player_name):
+            reason = WRONG_TURN
+        elif self._winner is not None or self._draw:
+            reason = GAME_OVER
+        else:
+            reason = None
+        if reason is not None:
+            return [reason for _ in moves]
+
+        # Everything the checks share is worked out once for the whole batch
+        color = self._player_info[player_name].get_color()
+        board = self._board
+        if not self._bitboard:
+            board = KubaBitBoard(board.board)
+        own = board._white if color == 'W' else board._black
+        occupied = board._white | board._black | board._red
+        undo_row, undo_col = self._board.changed_lines(self._old_board)
+
+        results = []
+        for row, col, direction in moves:
+            if isinstance(row, str) or isinstance(col, str):
+                try:
+                    row, col = int(row), int(col)
+                except ValueError:
+                    results.append(OUT_OF_RANGE)
+                    continue
+            if row not in _CELLS or col not in _CELLS:
+                results.append(OUT_OF_RANGE)
+                continue
+            index = 7 * row + col
+            if not own & (1 << index):
+                results.append(WRONG_COLOR)
+                continue
+            if direction not in _GUARD_TABLE:
+                results.append(BAD_DIRECTION)
+                continue
+            edge, behind = _GUARD_TABLE[direction][index]
+            if own & edge:
+                results.append(OWN_MARBLE)
+            elif behind & occupied:
+                results.append(BLOCKED)
+            elif ((direction in 'LR' and row == undo_row
+                   or direction in 'FB' and col == undo_col)
+                  and self._is_undo(row, col, direction)):
+                results.append(UNDO)
+            else:
+                results.append(None)
+        return results
+
+    def _is_undo(self, row, col, direction):
+        """
+        Used internally to check if pushing the marble at (row, col) in
+        direction would recreate the board from before the last move.
+        """
+        _, hash_change, undo = self._board.push(row, col, direction)
+        is_undo = (self._hash ^ hash_change == self._old_hash
+                   and self._board.same_position(self._old_board))
+        self._board.undo_push(undo)
+        return is_undo
+
+    def push(self, move):
+        """
+        Makes move ((row, col), direction) for the player whose turn it is by
+        changing the board in place, so nothing is copied. It is meant for
+        searching through moves and, unlike make_move, does not check that
+        the move is legal: only pass moves returned by legal_moves. Before the
+        first move of the game the player is the owner of the pushed marble.
+        The move can be taken back with pop.
+        """
+        (row, col), direction = move
+        name = self._turn
+        if name is None:
+            color = self._board.get_marble((row, col))
+            for player in self._player_info.values():
+                if player.get_color() == color:
+                    name = player.get_name()
+
+        # Bring the previous board up to the current board by replaying the
+        # last move on it, then make the move on the current board.
+        if self._last_move is None:
+            old_undo = None
+        else:
+            old_undo = self._old_board.push(*self._last_move)[2]
+        fallen, hash_change, undo = self._board.push(row, col, direction)
+        self._move_stack.append((
+            move, name, fallen, undo, old_undo, self._turn, self._winner,
+            self._hash, self._old_hash, self._last_move, self._marble_count,
+        ))
+
+        self._old_hash = self._hash
+        self._hash ^= hash_change
+        self._last_move = (row, col, direction)
+        self._move_count += 1
+        self._turn = name
+        if fallen is not None:
+            self._remove_marble(fallen)
+            if fallen == 'R':
+                self._player_info[name].increment_captured_count()
+            self._update_winner_state()
+        self._turn = self._get_opponent_name(name)
+
+    def pop(self):
+        """
+        Takes back the last move made with push and returns it. Restores the
+        board, the previous board, captured counts, turn and winner exactly.
+        """
+        (move, name, fallen, undo, old_undo, self._turn, self._winner,
+         self._hash, self._old_hash, self._last_move,
+         self._marble_count) = self._move_stack.pop()
+        self._move_count -= 1
+        self._board.undo_push(undo)
+        if old_undo is not None:
+            self._old_board.undo_push(old_undo)
+        if fallen == 'R':
+            self._player_info[name].decrement_captured_count()
+        return move
+
+    def position_key(self):
+        """
+        Returns a 64 bit Zobrist hash of everything that decides how the game
+        can continue: the board, the player whose turn it is, the number of
+        red marbles each player has captured and the board before the last
+        move (because of the rule against undoing a move). Two games with the
+        same key can be treated as the same position, e.g. as dictionary keys.
+        """
+        first, second = self._player_info.values()
+        old_hash = self._old_hash
+        # Rotate the hash of the previous board so it can not cancel out the
+        # hash of the current board.
+        key = (self._hash ^ (((old_hash << 17) | (old_hash >> 47)) & _MASK_64)
+               ^ _ZOBRIST_CAPTURED[0][first._captured_count]
+               ^ _ZOBRIST_CAPTURED[1][second._captured_count])
+        if self._turn == first._name:
+            key ^= _ZOBRIST_TURN[0]
+        elif self._turn == second._name:
+            key ^= _ZOBRIST_TURN[1]
+        return key
+
     def _transpose_matrix(self, matrix):
         """
         Takes an iterable of iterables and returns a new iterable of iterables
@@ -381,12 +1517,12 @@ class KubaGame:
 
     def _get_opponent_name(self, player_name):
         """Returns the name of the player who is not player_name"""
-        players = list(self._player_info.keys())
-        index = players.index(player_name)
-        if index == 0:
-            return players[1]
-        else:
-            return players[0]
+        first, second = self._player_info
+        if player_name == first:
+            return second
+        if player_name == second:
+            return first
+        raise ValueError('{!r} is not a player'.format(player_name))
 
     def _update_winner_state(self):
         """
@@ -394,12 +1530,25 @@ class KubaGame:
         in capturing 7 balls or knocking all of their opponents balls off of
         the board.
         """
-        marble_count = self.get_marble_count()
         if self._player_info[self._turn].get_captured_count() == 7:
             self._winner = self._turn
-        elif marble_count[0] == 0 or marble_count[1] == 0:
+        elif self._marble_count[0] == 0 or self._marble_count[1] == 0:
             self._winner = self._turn
 
+    def _remove_marble(self, marble):
+        """
+        Used internally to take a marble ('W', 'B' or 'R') pushed off of the
+        board out of the marble counts
+        """
+        white, black, red = self._marble_count
+        if marble == 'W':
+            white -= 1
+        elif marble == 'B':
+            black -= 1
+        else:
+            red -= 1
+        self._marble_count = (white, black, red)
+
     def get_winner(self):
         """Returns the name of the winner of the game"""
         return self._winner
@@ -419,6 +1568,208 @@ class KubaGame:
 
     def get_marble_count(self):
         """
-        Returns tuple (W, B, R) of marble counts on the board
+        Returns tuple (W, B, R) of marble counts on the board. The counts are
+        kept up to date by every move, so the board is not scanned.
+        """
+        return self._marble_count
+
+    def get_features(self, player_name=None):
+        """
+        Returns a dictionary of numbers that evaluation functions can use to
+        judge the position for player_name, which defaults to the player whose
+        turn it is (or the first player before the first move):
+
+            marbles, captured   marbles on the board and red marbles captured
+            red                 red marbles left on the board
+            edge, exposed,      see KubaBitBoard.get_features
+            capturable, threats,
+            mobility
+
+        Every key except red is also given for the other player with the
+        prefix 'opponent_'. The counts are kept up to date by every move and
+        the rest is found with a few masks of the bitboard. A game with a
+        KubaBoard first copies its 49 cells into a KubaBitBoard on every call,
+        so use bitboard=True where features are needed often.
+        """
+        if player_name is None:
+            player_name = self._turn or next(iter(self._player_info))
+        opponent = self._get_opponent_name(player_name)
+        color = self._player_info[player_name].get_color()
+        other_color = self._player_info[opponent].get_color()
+        board = self._board
+        if not self._bitboard:
+            board = KubaBitBoard(board.board)
+        counts = dict(zip('WBR', self._marble_count))
+        features = {
+            'marbles': counts[color],
+            'captured': self.get_captured(player_name),
+            'red': counts['R'],
+            'opponent_marbles': counts[other_color],
+            'opponent_captured': self.get_captured(opponent),
+        }
+        targets = {'W': board.push_off_targets('W'),
+                   'B': board.push_off_targets('B')}
+        features.update(board.get_features(color, targets))
+        for name, value in board.get_features(other_color, targets).items():
+            features['opponent_' + name] = value
+        return features
+
+
+class KubaPlayout:
+    """
+    A lean game of Kuba on bitboards for self-play and random playouts.
+    make_move and legal_moves follow exactly the same rules as the ones of
+    KubaGame, but nothing else is kept: there is no history, undo, draw
+    policy, Zobrist hash, position count or instrumentation. Use
+    KubaGame.playout to start one from a game and get_state to turn it back
+    into a KubaGame with KubaGame.from_state.
+    """
+    __slots__ = ('_names', '_colors', '_white', '_black', '_red', '_old',
+                 '_last_move', '_turn', '_winner', '_captured')
+
+    def __init__(self, player1_info, player2_info):
+        """
+        Creates a new game at the starting position, with the players passed
+        like to KubaGame
         """
-        return self._board.get_marble_count()
+        self._names = {player1_info[0]: 0, player2_info[0]: 1}
+        self._colors = (player1_info[1], player2_info[1])
+        self._white, self._black, self._red = _START_BITS
+        self._old = _START_BITS     # (white, black, red) before the last move
+        self._last_move = None
+        self._turn = None       # Index of the player to move, None at first
+        self._winner = None     # Index of the winner
+        self._captured = [0, 0]
+
+    @classmethod
+    def from_state(cls, player1_info, player2_info, state):
+        """Same as KubaGame.from_state, but returns a KubaPlayout"""
+        playout = cls(player1_info, player2_info)
+        playout._white, playout._black, playout._red = state[0:3]
+        playout._old = tuple(state[3:6])
+        playout._turn, playout._winner = state[6], state[7]
+        playout._captured = list(state[8:10])
+        playout._last_move = state[10]
+        return playout
+
+    def get_state(self):
+        """Returns the same state tuple as KubaGame.get_state"""
+        return ((self._white, self._black, self._red) + self._old
+                + (self._turn, self._winner, self._captured[0],
+                   self._captured[1], self._last_move))
+
+    def _board(self, bits):
+        """Used internally to return a KubaBitBoard of (white, black, red)"""
+        board = KubaBitBoard.__new__(KubaBitBoard)
+        board._white, board._black, board._red = bits
+        return board
+
+    def _name(self, index):
+        """Used internally to return the name of the player with index"""
+        if index is None:
+            return None
+        for name, player_index in self._names.items():
+            if player_index == index:
+                return name
+
+    def get_current_turn(self):
+        """Same as KubaGame.get_current_turn"""
+        return self._name(self._turn)
+
+    def get_winner(self):
+        """Same as KubaGame.get_winner"""
+        return self._name(self._winner)
+
+    def get_color(self, player_name):
+        """Same as KubaGame.get_color"""
+        return self._colors[self._names[player_name]]
+
+    def get_opponent(self, player_name):
+        """Same as KubaGame.get_opponent"""
+        return self._name(1 - self._names[player_name])
+
+    def get_players(self):
+        """Same as KubaGame.get_players"""
+        return list(zip(self._names, self._colors))
+
+    def get_captured(self, player_name):
+        """Same as KubaGame.get_captured"""
+        return self._captured[self._names[player_name]]
+
+    def get_marble(self, coordinates):
+        """Same as KubaGame.get_marble"""
+        return self._board((self._white, self._black,
+                            self._red)).get_marble(coordinates)
+
+    def get_marble_count(self):
+        """Same as KubaGame.get_marble_count"""
+        return (self._white.bit_count(), self._black.bit_count(),
+                self._red.bit_count())
+
+    def legal_moves(self, player_name=None):
+        """Same as KubaGame.legal_moves"""
+        index = self._turn if player_name is None else self._names[player_name]
+        if index is None or self._winner is not None:
+            return []
+        if self._turn is not None and self._turn != index:
+            return []
+        white, black, red = self._white, self._black, self._red
+        board = self._board((white, black, red))
+        moves = board.candidate_moves(self._colors[index])
+        row, col = board.changed_lines(self._board(self._old))
+        if row is None and col is None:
+            return moves
+        old = self._old
+        return [
+            move for move in moves
+            if not (move[1] in 'LR' and move[0][0] == row
+                    or move[1] in 'FB' and move[0][1] == col)
+            or _push_bits(white, black, red, _PUSH_TABLE[move[1]][
+                7 * move[0][0] + move[0][1]])[:3] != old
+        ]
+
+    def make_move(self, player_name, coordinates, direction):
+        """
+        Same as KubaGame.make_move: makes the move and returns True, or
+        returns False if the move is not allowed
+        """
+        index = self._names[player_name]
+        if self._turn is None:                      # First move of the game
+            self._turn = index
+        elif self._turn != index:
+            return False
+        if self._winner is not None:
+            return False
+        row, col = coordinates[0], coordinates[1]
+        # One lookup checks the coordinates and the direction
+        entry = _MOVE_TABLE.get((row, col, direction))
+        if entry is None:
+            return False
+        # The checks of KubaBitBoard.can_push, without the call
+        bit, edge, behind, push = entry
+        white, black, red = self._white, self._black, self._red
+        color = self._colors[index]
+        if color == 'W':
+            own = white
+        elif color == 'B':
+            own = black
+        else:
+            return False
+        if not own & bit or own & edge or behind & (white | black | red):
+            return False
+        new_white, new_black, new_red, fallen = _push_bits(
+            white, black, red, push)
+        if (new_white, new_black, new_red) == self._old:  # Undoes last move
+            return False
+        self._old = (white, black, red)
+        self._white, self._black, self._red = new_white, new_black, new_red
+        self._last_move = (row, col, direction)
+        if fallen is not None:          # Only a push off can end the game
+            if fallen == 'R':
+                self._captured[index] += 1
+                if self._captured[index] == 7:
+                    self._winner = index
+            elif not new_white or not new_black:
+                self._winner = index
+        self._turn = 1 - index
+        return True
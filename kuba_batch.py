@@ -0,0 +1,313 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaBatch, which plays many games of Kuba at once by keeping all
+#   of their boards in one NumPy array of shape (N, 7, 7). make_moves applies
+#   one move to every game in a single vectorized step and gives exactly the
+#   same results as calling KubaGame.make_move on each game.
+
+import numpy as np
+
+from KubaGame import (KubaBoard, KubaGame, DIRECTIONS, index_to_move,
+                      move_to_index)
+
+# Cells of the board array
+EMPTY, WHITE, BLACK, RED = 0, 1, 2, 3
+_CODES = {' ': EMPTY, 'W': WHITE, 'B': BLACK, 'R': RED}
+MOVE_COUNT = 196            # Moves are numbered like KubaGame.move_to_index
+
+
+def _build_lines():
+    """
+    Returns (lines, starts) where lines[move] holds the 7 flat cell indices of
+    the row or column that move pushes, ordered in the direction of the push,
+    and starts[move] is the position of the pushed marble in that line. This
+    turns every push into a push towards the end of a line of 7 cells.
+    """
+    lines = np.zeros((MOVE_COUNT, 7), dtype=np.intp)
+    starts = np.zeros(MOVE_COUNT, dtype=np.intp)
+    for cell in range(49):
+        row, col = divmod(cell, 7)
+        for index, direction in enumerate(DIRECTIONS):
+            move = cell * 4 + index
+            if direction == 'R':
+                lines[move] = [7 * row + c for c in range(7)]
+                starts[move] = col
+            elif direction == 'L':
+                lines[move] = [7 * row + c for c in range(6, -1, -1)]
+                starts[move] = 6 - col
+            elif direction == 'B':
+                lines[move] = [7 * r + col for r in range(7)]
+                starts[move] = row
+            else:
+                lines[move] = [7 * r + col for r in range(6, -1, -1)]
+                starts[move] = 6 - row
+    return lines, starts
+
+
+_LINES, _STARTS = _build_lines()
+_POSITIONS = np.arange(7)
+_START_BOARD = np.array(
+    [[_CODES[marble] for marble in row] for row in KubaBoard().board],
+    dtype=np.int8)
+_BIT_VALUES = np.array([1 << index for index in range(49)], dtype=np.int64)
+
+
+def _push_lines(lines, starts):
+    """
+    Pushes the marble at position starts[i] of every line in lines (shape
+    (M, 7)) towards position 6. Returns the new lines and the marble pushed
+    off of each line (EMPTY if none), like KubaGame._move_right does for one
+    row.
+    """
+    after = _POSITIONS > starts[..., None]
+    gaps = (lines == EMPTY) & after
+    has_gap = gaps.any(axis=-1)
+    # Marbles from the start up to the first gap move; without a gap the
+    # marble on the edge is pushed off
+    last = np.where(has_gap, gaps.argmax(axis=-1), 6)
+    moved = after & (_POSITIONS <= last[..., None])
+    shifted = np.empty_like(lines)
+    shifted[..., 0] = EMPTY
+    shifted[..., 1:] = lines[..., :-1]
+    new_lines = np.where(moved, shifted, lines)
+    np.put_along_axis(new_lines, starts[..., None], EMPTY, axis=-1)
+    fallen = np.where(has_gap, EMPTY, lines[..., 6])
+    return new_lines, fallen
+
+
+class KubaBatch:
+    """
+    Represents size games of Kuba between the same two players. Players are
+    referred to by their index: 0 for player1_info and 1 for player2_info.
+    Turns and winners are -1 while nobody has moved or won yet.
+    """
+    def __init__(self, size, player1_info, player2_info):
+        """
+        Creates size new games of Kuba.
+
+        :param size:         Number of games.
+        :param player1_info: tuple (name, color) of player 0, like KubaGame.
+        :param player2_info: tuple (name, color) of player 1.
+        """
+        self._players = [tuple(player1_info), tuple(player2_info)]
+        self._colors = np.array([_CODES.get(player1_info[1], -1),
+                                 _CODES.get(player2_info[1], -1)], dtype=np.int8)
+        self._boards = np.repeat(_START_BOARD[None], size, axis=0)
+        self._old_boards = self._boards.copy()
+        self._turns = np.full(size, -1, dtype=np.intp)
+        self._winners = np.full(size, -1, dtype=np.intp)
+        self._captured = np.zeros((size, 2), dtype=np.intp)
+        self._last_moves = np.full(size, -1, dtype=np.intp)
+
+    @classmethod
+    def from_states(cls, player1_info, player2_info, states):
+        """
+        Returns a new KubaBatch with one game for each state tuple returned by
+        KubaGame.get_state in states. The players have to be passed in the
+        same order as they were to the games the states came from.
+        """
+        batch = cls(0, player1_info, player2_info)
+        size = len(states)
+        bitboards = np.array([state[:6] for state in states],
+                             dtype=np.int64).reshape(size, 6)
+        bits = (bitboards[:, :, None] >> np.arange(49)) & 1
+        boards = (WHITE * bits[:, 0::3] + BLACK * bits[:, 1::3]
+                  + RED * bits[:, 2::3])
+        boards = boards.astype(np.int8).reshape(size, 2, 7, 7)
+        batch._boards = boards[:, 0].copy()
+        batch._old_boards = boards[:, 1].copy()
+        batch._turns = np.array([-1 if state[6] is None else state[6]
+                                 for state in states], dtype=np.intp)
+        batch._winners = np.array([-1 if state[7] is None else state[7]
+                                   for state in states], dtype=np.intp)
+        batch._captured = np.array([state[8:10] for state in states],
+                                   dtype=np.intp).reshape(size, 2)
+        batch._last_moves = np.array([
+            -1 if state[10] is None
+            else move_to_index(((state[10][0], state[10][1]), state[10][2]))
+            for state in states], dtype=np.intp)
+        return batch
+
+    def __len__(self):
+        return len(self._boards)
+
+    def take(self, games):
+        """
+        Returns a new KubaBatch with copies of the games with the indices (or
+        boolean mask) games, e.g. one copy of a game for every move to try.
+        """
+        batch = KubaBatch.__new__(KubaBatch)
+        batch._players = self._players
+        batch._colors = self._colors
+        batch._boards = self._boards[games]
+        batch._old_boards = self._old_boards[games]
+        batch._turns = self._turns[games]
+        batch._winners = self._winners[games]
+        batch._captured = self._captured[games]
+        batch._last_moves = self._last_moves[games]
+        return batch
+
+    def reset(self, games):
+        """
+        Starts the games with the indices (or boolean mask) games over again.
+        """
+        self._boards[games] = _START_BOARD
+        self._old_boards[games] = _START_BOARD
+        self._turns[games] = -1
+        self._winners[games] = -1
+        self._captured[games] = 0
+        self._last_moves[games] = -1
+
+    def get_boards(self):
+        """Returns the (N, 7, 7) array of boards (0 empty, 1 W, 2 B, 3 R)"""
+        return self._boards
+
+    def get_old_boards(self):
+        """Returns the (N, 7, 7) array of the boards before the last move"""
+        return self._old_boards
+
+    def get_turns(self):
+        """Returns the player to move in each game, -1 before the first move"""
+        return self._turns
+
+    def get_winners(self):
+        """Returns the winner of each game, -1 if there is none yet"""
+        return self._winners
+
+    def get_captured(self):
+        """Returns the (N, 2) array of red marbles captured by each player"""
+        return self._captured
+
+    def get_marble_counts(self):
+        """Returns the (N, 3) array of the (W, B, R) marble counts"""
+        flat = self._boards.reshape(len(self), 49)
+        return np.stack([(flat == WHITE).sum(axis=1),
+                         (flat == BLACK).sum(axis=1),
+                         (flat == RED).sum(axis=1)], axis=1)
+
+    def make_moves(self, players, moves):
+        """
+        Makes one move in every game, exactly like KubaGame.make_move would.
+
+        :param players: Array of the index of the player moving in each game.
+        :param moves:   Array of the moves numbered like move_to_index. Numbers
+                        outside of 0-195 are invalid moves.
+
+        :return: Boolean array, True where the move was made and False where
+                 it was invalid and the game did not change.
+        """
+        players = np.asarray(players, dtype=np.intp)
+        moves = np.asarray(moves, dtype=np.intp)
+        size = len(self)
+
+        # Like make_move, the first player to try a move gets the turn even if
+        # the move is invalid
+        first = self._turns == -1
+        self._turns[first] = players[first]
+        valid = ((self._turns == players) & (self._winners == -1)
+                 & (moves >= 0) & (moves < MOVE_COUNT))
+        moves = np.where(valid, moves, 0)
+
+        flat = self._boards.reshape(size, 49)
+        old_flat = self._old_boards.reshape(size, 49)
+        cells = _LINES[moves]
+        starts = _STARTS[moves]
+        lines = np.take_along_axis(flat, cells, axis=1)
+        old_lines = np.take_along_axis(old_flat, cells, axis=1)
+        valid &= self._static_checks(lines, starts, self._colors[players])
+
+        new_lines, fallen = _push_lines(lines, starts)
+        valid &= ~self._is_undo(flat, old_flat, lines, old_lines, new_lines)
+
+        made = np.nonzero(valid)[0]
+        movers = players[made]
+        old_flat[made] = flat[made]
+        new_flat = flat[made]
+        np.put_along_axis(new_flat, cells[made], new_lines[made], axis=1)
+        flat[made] = new_flat
+        self._captured[made, movers] += fallen[made] == RED
+        white = (new_flat == WHITE).sum(axis=1)
+        black = (new_flat == BLACK).sum(axis=1)
+        won = (self._captured[made, movers] == 7) | (white == 0) | (black == 0)
+        self._winners[made[won]] = movers[won]
+        self._turns[made] = 1 - movers
+        self._last_moves[made] = moves[made]
+        return valid
+
+    def legal_move_mask(self, players=None):
+        """
+        Returns an (N, 196) boolean array that is True for every move that
+        make_moves would accept in each game, like KubaGame.legal_moves.
+
+        :param players: Array of the player to check in each game. Defaults to
+                        the player to move. Games where nobody has moved yet
+                        have no legal moves unless players is given.
+        """
+        size = len(self)
+        if players is None:
+            players = self._turns
+        players = np.asarray(players, dtype=np.intp)
+        known = (players >= 0) & (self._winners == -1)
+        known &= (self._turns == -1) | (self._turns == players)
+        colors = np.where(known, self._colors[np.maximum(players, 0)], -1)
+
+        flat = self._boards.reshape(size, 49)
+        old_flat = self._old_boards.reshape(size, 49)
+        lines = flat[:, _LINES]                     # (N, 196, 7)
+        old_lines = old_flat[:, _LINES]
+        starts = np.broadcast_to(_STARTS, (size, MOVE_COUNT))
+        mask = self._static_checks(lines, starts, colors[:, None])
+        new_lines, _ = _push_lines(lines, starts)
+        mask &= ~self._is_undo(flat[:, None], old_flat[:, None], lines,
+                               old_lines, new_lines)
+        return mask & known[:, None]
+
+    @staticmethod
+    def _static_checks(lines, starts, colors):
+        """
+        Used internally to check the same things as KubaGame._validate_move
+        on lines ordered in the direction of the push: the pushed marble is
+        the player's, the player's own marble is not on the edge and the cell
+        behind the pushed marble is empty or off of the board.
+        """
+        pushed = np.take_along_axis(lines, starts[..., None], axis=-1)[..., 0]
+        behind = np.take_along_axis(
+            lines, np.maximum(starts - 1, 0)[..., None], axis=-1)[..., 0]
+        return ((pushed == colors) & (lines[..., 6] != colors)
+                & ((starts == 0) | (behind == EMPTY)))
+
+    @staticmethod
+    def _is_undo(flat, old_flat, lines, old_lines, new_lines):
+        """
+        Used internally to check if pushing would recreate the board before
+        the last move. That needs the current and old board to be the same
+        outside of the pushed line and the new line to match the old one.
+        """
+        differences = (flat != old_flat).sum(axis=-1)
+        outside = differences - (lines != old_lines).sum(axis=-1)
+        return (outside == 0) & (new_lines == old_lines).all(axis=-1)
+
+    def get_game(self, index):
+        """
+        Returns a new KubaGame in the same state as the game at index.
+        """
+        state = []
+        for board in (self._boards[index], self._old_boards[index]):
+            flat = board.reshape(49)
+            for code in (WHITE, BLACK, RED):
+                state.append(int(_BIT_VALUES[flat == code].sum()))
+        turn, winner = int(self._turns[index]), int(self._winners[index])
+        last_move = int(self._last_moves[index])
+        if last_move >= 0:
+            (row, col), direction = index_to_move(last_move)
+            last_move = (row, col, direction)
+        else:
+            last_move = None
+        state += [
+            None if turn < 0 else turn, None if winner < 0 else winner,
+            int(self._captured[index, 0]), int(self._captured[index, 1]),
+            last_move,
+        ]
+        return KubaGame.from_state(self._players[0], self._players[1],
+                                   tuple(state), bitboard=False)
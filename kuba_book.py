@@ -0,0 +1,259 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains an opening book for Kuba built from game records (see
+#   kuba_records.py). For every position of the first plies of the games it
+#   keeps how often each move was played, how often the player who made it
+#   went on to win and how many red marbles they had captured at the end.
+#
+#   Positions are keyed by their canonical KubaPosition (see
+#   kuba_symmetry.py), so symmetric positions share their statistics, and
+#   moves are stored as moves of the canonical position. Before the first
+#   move either player may move, so the starting position is keyed with the
+#   color that moves first as the color to move. The file is a header followed
+#   by fixed size entries sorted by key and move:
+#
+#       key (17 bytes), move (1 byte), games, wins, captured (4 bytes each)
+#
+#   The file is memory-mapped and searched with a binary search, so opening
+#   it does not read anything and worker processes share it through the
+#   page cache.
+#
+#   Usage: python kuba_book.py book.kbb games.kbr [more.kbr ...] --plies 12
+
+import argparse
+import collections
+import mmap
+import struct
+
+from KubaGame import KubaGame, index_to_move, move_to_index
+from kuba_position import KubaPosition
+from kuba_records import read_records
+from kuba_symmetry import canonicalize, inverse, transform_move
+
+MAGIC = b'KUBB'
+VERSION = 2             # 2 keys the starting position by the color to move
+
+_HEADER = struct.Struct('<4sBBQ')       # magic, version, plies, entry count
+_ENTRY = struct.Struct('<17sBIII')      # key, move, games, wins, captured
+_KEY_SIZE = 17
+
+
+class KubaBookMove(collections.namedtuple(
+        'KubaBookMove', ('move', 'games', 'wins', 'average_captured'))):
+    """
+    A move of the opening book. move is ((row, col), direction), games is the
+    number of games it was played in, wins how many of them the player who
+    made it won and average_captured the red marbles they had captured at the
+    end of the game on average.
+    """
+    __slots__ = ()
+
+    def get_win_rate(self):
+        """Returns the share of the games won by the player who made move"""
+        return self.wins / self.games
+
+
+def book_key(state, first_color, mover_color=None):
+    """
+    Returns (key, transform) of a state tuple returned by KubaGame.get_state,
+    where first_color is the color of the first player of the game. The key is
+    the same for symmetric positions and for games with the players passed in
+    the other order, and transform turns moves of the game into moves of the
+    book.
+
+    :param mover_color: Color of the player about to move. Only used before
+                        the first move, when the state has no turn yet.
+    """
+    if first_color == 'B':
+        # Number the players so the white player is always player 0
+        turn, winner, captured1, captured2 = state[6:10]
+        state = state[:6] + (None if turn is None else 1 - turn,
+                             None if winner is None else 1 - winner,
+                             captured2, captured1, state[10])
+    if state[6] is None and mover_color is not None:
+        state = state[:6] + (0 if mover_color == 'W' else 1,) + state[7:]
+    state, transform = canonicalize(state)
+    return KubaPosition.from_state(state).to_bytes(), transform
+
+
+def _game_key(game, player_name):
+    """
+    Used internally to return (key, transform) of a KubaGame where player_name
+    is about to move
+    """
+    return book_key(game.get_state(), game.get_players()[0][1],
+                    game.get_color(player_name))
+
+
+def collect_statistics(paths, plies):
+    """
+    Returns {(key, move number): [games, wins, captured]} for the first plies
+    moves of every game in the record files at paths, read one game at a
+    time. Move numbers are numbered like move_to_index.
+    """
+    statistics = collections.defaultdict(lambda: [0, 0, 0])
+    for path in paths:
+        for record in read_records(path):
+            first_color = record.player1_info[1]
+            game = KubaGame(record.player1_info, record.player2_info,
+                            bitboard=True)
+            name = (record.player1_info, record.player2_info)[record.first][0]
+            key, transform = _game_key(game, name)
+            opening = []
+            for ply, (move, game) in enumerate(record.replay()):
+                if ply < plies:
+                    book_move = transform_move(move, transform)
+                    opening.append((key, book_move, name))
+                if ply + 1 < plies:
+                    key, transform = book_key(game.get_state(), first_color)
+                name = game.get_current_turn()
+
+            winner = game.get_winner()
+            if winner is None and name is not None and not game.legal_moves():
+                winner = game.get_opponent(name)
+            for key, move, name in opening:
+                entry = statistics[key, move_to_index(move)]
+                entry[0] += 1
+                entry[1] += winner == name
+                entry[2] += game.get_captured(name)
+    return statistics
+
+
+def write_book(path, statistics, plies, min_games=1):
+    """
+    Writes the statistics returned by collect_statistics to the book file at
+    path, leaving out moves played in fewer than min_games games.
+    """
+    entries = sorted((key, move, games, wins, captured)
+                     for (key, move), (games, wins, captured)
+                     in statistics.items() if games >= min_games)
+    with open(path, 'wb') as output:
+        output.write(_HEADER.pack(MAGIC, VERSION, plies, len(entries)))
+        for entry in entries:
+            output.write(_ENTRY.pack(*entry))
+
+
+def build_book(path, record_paths, plies=12, min_games=1):
+    """
+    Builds the book file at path from the first plies moves of every game in
+    the record files at record_paths and returns the number of entries.
+    """
+    statistics = collect_statistics(record_paths, plies)
+    write_book(path, statistics, plies, min_games)
+    return sum(games >= min_games for games, _, _ in statistics.values())
+
+
+class KubaOpeningBook:
+    """
+    Looks up positions in an opening book file made by build_book. Use it as
+    a context manager or call close when done.
+    """
+    def __init__(self, path):
+        """
+        Opens the book file at path. Raises ValueError if it is not a book
+        file.
+        """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._plies, self._count = _HEADER.unpack_from(
+            self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError('{} is not a Kuba opening book'.format(path))
+        if version != VERSION:
+            self.close()
+            raise ValueError('unknown opening book version {}'.format(version))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """Unmaps and closes the file"""
+        self._map.close()
+        self._file.close()
+
+    def get_plies(self):
+        """Returns the number of moves of each game the book was built from"""
+        return self._plies
+
+    def lookup(self, game, player_name=None):
+        """
+        Returns a list of KubaBookMove for the position of game, a KubaGame,
+        with the most played move first. The list is empty if the position is
+        not in the book.
+
+        :param player_name: Player to find moves for. Defaults to the player
+                            whose turn it is, or the first player before the
+                            first move.
+        """
+        if player_name is None:
+            player_name = (game.get_current_turn()
+                           or game.get_players()[0][0])
+        key, transform = _game_key(game, player_name)
+        back = inverse(transform)
+        moves = []
+        index = self._find(key)
+        while index < self._count:
+            entry_key, move, games, wins, captured = _ENTRY.unpack_from(
+                self._map, _HEADER.size + _ENTRY.size * index)
+            if entry_key != key:
+                break
+            moves.append(KubaBookMove(
+                transform_move(index_to_move(move), back), games, wins,
+                captured / games))
+            index += 1
+        moves.sort(key=lambda book_move: -book_move.games)
+        return moves
+
+    def best_move(self, game, min_games=1, player_name=None):
+        """
+        Returns the move of the book with the best win rate among the moves
+        played in at least min_games games, or None if there is none.
+        player_name is the same as for lookup.
+        """
+        moves = [book_move for book_move in self.lookup(game, player_name)
+                 if book_move.games >= min_games]
+        if not moves:
+            return None
+        return max(moves, key=lambda book_move: (book_move.get_win_rate(),
+                                                 book_move.games)).move
+
+    def _find(self, key):
+        """
+        Used internally to return the index of the first entry whose key is
+        not less than key with a binary search
+        """
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = _HEADER.size + _ENTRY.size * middle
+            if self._map[offset:offset + _KEY_SIZE] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Builds a Kuba opening book from game records.')
+    parser.add_argument('output', help='book file to write')
+    parser.add_argument('records', nargs='+', help='game record files')
+    parser.add_argument('--plies', type=int, default=12,
+                        help='moves of each game to put in the book')
+    parser.add_argument('--min-games', type=int, default=1,
+                        help='leave out moves played in fewer games')
+    args = parser.parse_args()
+    count = build_book(args.output, args.records, args.plies, args.min_games)
+    print('Wrote', count, 'moves to', args.output)
+
+
+if __name__ == '__main__':
+    main()
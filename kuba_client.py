@@ -0,0 +1,241 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaClient, an asyncio client for KubaServer, and a load
+#   generator that plays many random games on a server at once and reports
+#   the move latency (p50 and p99) and throughput.
+#
+#   Usage: python kuba_client.py --games 1000 --concurrency 50 [--local]
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+from KubaGame import KubaGame
+from kuba_server import DEFAULT_PORT, KubaServer
+
+
+class KubaServerError(Exception):
+    """Raised when the server answers a request with an error"""
+
+
+class KubaClient:
+    """
+    Represents a connection to a KubaServer. Requests can be sent from many
+    tasks at once; their responses are matched up by id. Updates of
+    subscribed games are collected and returned by next_update.
+    """
+    def __init__(self, reader, writer):
+        """Creates a client on an open connection, see connect"""
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}              # request id -> future of the response
+        self._updates = asyncio.Queue()
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=DEFAULT_PORT):
+        """Returns a new client connected to the server at host and port"""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def close(self):
+        """Closes the connection"""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._receiver
+
+    async def request(self, op, **fields):
+        """
+        Sends a request and returns the response as a dictionary. Raises
+        KubaServerError if the server could not do it.
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        fields.update(id=request_id, op=op)
+        self._writer.write(json.dumps(fields).encode() + b'\n')
+        await self._writer.drain()
+        response = await future
+        if not response['ok']:
+            raise KubaServerError(response['error'])
+        return response
+
+    async def create(self, player1_info, player2_info):
+        """Creates a game and returns (game id, state)"""
+        response = await self.request(
+            'create', players=[list(player1_info), list(player2_info)])
+        return response['game'], response['state']
+
+    async def move(self, game, player_name, coordinates, direction):
+        """Makes a move and returns (whether it was made, new state)"""
+        response = await self.request(
+            'move', game=game, player=player_name, row=coordinates[0],
+            col=coordinates[1], direction=direction)
+        return response['made'], response['state']
+
+    async def state(self, game):
+        """Returns the state of a game"""
+        return (await self.request('state', game=game))['state']
+
+    async def hint(self, game, player_name=None):
+        """
+        Returns the best move ((row, col), direction) the server's hint
+        service finds, or None if there is none
+        """
+        fields = {} if player_name is None else {'player': player_name}
+        move = (await self.request('hint', game=game, **fields))['move']
+        if move is None:
+            return None
+        return (move[0], move[1]), move[2]
+
+    async def subscribe(self, game):
+        """Starts receiving the updates of a game and returns its state"""
+        return (await self.request('subscribe', game=game))['state']
+
+    async def unsubscribe(self, game):
+        """Stops receiving the updates of a game"""
+        await self.request('unsubscribe', game=game)
+
+    async def close_game(self, game):
+        """Removes a game from the server"""
+        await self.request('close', game=game)
+
+    async def next_update(self):
+        """Waits for the next update of a subscribed game and returns it"""
+        return await self._updates.get()
+
+    async def _receive(self):
+        """
+        Used internally to read messages from the server and hand them to the
+        waiting requests or the queue of updates
+        """
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if 'event' in message:
+                    self._updates.put_nowait(message)
+                else:
+                    future = self._pending.pop(message['id'], None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+        except ConnectionError:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection closed'))
+            self._pending.clear()
+
+
+def percentile(values, fraction):
+    """Returns the value below which fraction of the sorted values fall"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+async def run_load(host='127.0.0.1', port=DEFAULT_PORT, games=100,
+                   concurrency=10, max_moves=100, seed=0):
+    """
+    Plays games random games on the server, concurrency of them at a time on
+    their own connections, and returns a dictionary with the number of games
+    and moves, the elapsed seconds, moves per second and the p50 and p99 move
+    latency in milliseconds.
+
+    :param max_moves: Games are left after this many moves.
+    """
+    players = (('white', 'W'), ('black', 'B'))
+    first_moves = KubaGame(*players).legal_moves(players[0][0])
+    game_numbers = iter(range(games))
+    latencies = []
+    rand = random.Random(seed)
+
+    async def play(client, rand):
+        for _ in game_numbers:
+            game, state = await client.create(*players)
+            name, moves = players[0][0], first_moves
+            for _ in range(max_moves):
+                if state['winner'] is not None or not moves:
+                    break
+                (row, col), direction = rand.choice(moves)
+                start = time.perf_counter()
+                made, state = await client.move(game, name, (row, col),
+                                                direction)
+                latencies.append(time.perf_counter() - start)
+                if not made:
+                    raise KubaServerError('legal move was not made')
+                name = state['turn']
+                moves = [((row, col), direction)
+                         for row, col, direction in state['legal_moves']]
+            # Games left after max_moves have no winner and are never removed
+            # by the server on their own
+            await client.close_game(game)
+
+    clients = [await KubaClient.connect(host, port) for _ in range(concurrency)]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            play(client, random.Random(rand.getrandbits(64)))
+            for client in clients))
+    finally:
+        for client in clients:
+            await client.close()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'games': games,
+        'moves': len(latencies),
+        'seconds': elapsed,
+        'moves_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def _run_local(args):
+    """Used internally to run the load generator against its own server"""
+    server = KubaServer(args.host, 0)
+    await server.start()
+    try:
+        return await run_load(args.host, server.get_port(), args.games,
+                              args.concurrency, args.max_moves, args.seed)
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Plays random games on a Kuba server to measure it.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--max-moves', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--local', action='store_true',
+                        help='start a server in this process to test against')
+    args = parser.parse_args()
+    if args.local:
+        report = asyncio.run(_run_local(args))
+    else:
+        report = asyncio.run(run_load(args.host, args.port, args.games,
+                                      args.concurrency, args.max_moves,
+                                      args.seed))
+    print('{games} games, {moves} moves in {seconds:.2f} s: '
+          '{moves_per_second:.0f} moves/s, p50 {p50_ms:.2f} ms, '
+          'p99 {p99_ms:.2f} ms'.format(**report))
+
+
+if __name__ == '__main__':
+    main()
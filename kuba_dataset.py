@@ -0,0 +1,254 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Turns games of Kuba into training data for neural networks. Every
+#   position before a move becomes one sample, seen from the player to move:
+#
+#       planes    (8, 7, 7) uint8, the binary planes named in PLANES
+#       masks     (196,) bool, the legal moves numbered like move_to_index
+#       moves     int16, the move that was played
+#       outcomes  int8, 1 if the player to move won, -1 if they lost, else 0
+#       captured  (2,) int8, red marbles the player to move and the other
+#                 player had captured at the end of the game
+#
+#   KubaDatasetWriter streams games in and writes the samples to shards of
+#   shard_size samples, one .npy file per array and shard, so memory use does
+#   not grow with the number of games. The planes of a shard are built from
+#   the bitboards of its positions in a few vectorized steps instead of
+#   looping over the cells of every board. load_shards memory-maps them.
+#
+#   Usage: python kuba_dataset.py dataset/ games.kbr [more.kbr ...]
+#          python kuba_dataset.py dataset/ --self-play 1000
+
+import argparse
+import glob
+import os
+
+import numpy as np
+
+from KubaGame import KubaPlayout, index_to_move, move_to_index
+from kuba_records import KubaRecord, read_records
+from kuba_tournament import KubaRandomPlayer
+
+PLANES = ('own', 'opponent', 'red', 'empty',
+          'old_own', 'old_opponent', 'old_red',     # For the undo rule
+          'white_to_move')
+ARRAYS = ('planes', 'masks', 'moves', 'outcomes', 'captured')
+MOVE_COUNT = 196            # Moves are numbered like KubaGame.move_to_index
+
+_CELLS = np.arange(49, dtype=np.int64)
+
+
+def game_samples(record):
+    """
+    Returns (samples, outcomes, captured) for a KubaRecord: samples has one
+    (state, white_to_move, legal, move) per move of the game, where state is
+    the tuple returned by KubaGame.get_state before the move, legal the bytes
+    of the legal moves and move the number of the move played. outcomes and
+    captured are the targets of each sample. Raises ValueError if a move in
+    the record is not valid.
+    """
+    game = KubaPlayout(record.player1_info, record.player2_info)
+    names = [record.player1_info[0], record.player2_info[0]]
+    name = names[record.first]
+    samples, movers = [], []
+    for index in record.moves:
+        legal = bytes(move_to_index(move) for move in game.legal_moves(name))
+        samples.append((game.get_state(), game.get_color(name) == 'W', legal,
+                        index))
+        movers.append(name)
+        if not game.make_move(name, *index_to_move(index)):
+            raise ValueError(
+                'invalid move {} in record'.format(index_to_move(index)))
+        name = game.get_current_turn()
+
+    winner = game.get_winner()
+    if winner is None and name is not None and not game.legal_moves():
+        winner = game.get_opponent(name)    # The player to move is stuck
+    outcomes, captured = [], []
+    for name in movers:
+        outcomes.append(0 if winner is None else 1 if winner == name else -1)
+        captured.append((game.get_captured(name),
+                         game.get_captured(game.get_opponent(name))))
+    return samples, outcomes, captured
+
+
+def build_planes(states, white_to_move):
+    """
+    Returns the (N, 8, 7, 7) uint8 planes (see PLANES) of N positions, where
+    states is an (N, 6) array of the six bitboards of KubaGame.get_state and
+    white_to_move an (N,) bool array.
+    """
+    states = np.asarray(states, dtype=np.int64)
+    white_to_move = np.asarray(white_to_move, dtype=bool)
+    bits = ((states[:, :, None] >> _CELLS) & 1).astype(np.uint8)
+    white, black = bits[:, 0::3], bits[:, 1::3]     # Board and old board
+    swap = white_to_move[:, None, None]
+    planes = np.empty((len(states), len(PLANES), 49), dtype=np.uint8)
+    planes[:, [0, 4]] = np.where(swap, white, black)
+    planes[:, [1, 5]] = np.where(swap, black, white)
+    planes[:, [2, 6]] = bits[:, 2::3]
+    planes[:, 3] = 1 - (bits[:, 0] | bits[:, 1] | bits[:, 2])
+    planes[:, 7] = white_to_move[:, None]
+    return planes.reshape(len(states), len(PLANES), 7, 7)
+
+
+class KubaDatasetWriter:
+    """
+    Writes the samples of games to numbered shards in a directory. Use it as
+    a context manager or call close when done, which writes the last shard.
+    """
+    def __init__(self, directory, shard_size=65536, overwrite=False):
+        """
+        Creates directory if needed. Every shard but the last holds exactly
+        shard_size samples.
+
+        :param directory:  Directory to write the shards to.
+        :param shard_size: Samples in each shard.
+        :param overwrite:  Whether to delete the shards of an earlier dataset
+                           in directory, so load_shards only finds the new
+                           ones. Without it FileExistsError is raised if
+                           directory already holds shards.
+        """
+        os.makedirs(directory, exist_ok=True)
+        existing = glob.glob(os.path.join(directory, 'shard-*.npy'))
+        if existing and not overwrite:
+            raise FileExistsError('{} already holds {} shard files'.format(
+                directory, len(existing)))
+        for path in existing:
+            os.remove(path)
+        self._directory = directory
+        self._shard_size = shard_size
+        self._shards = 0
+        self._count = 0
+        self._pending = []  # (sample, outcome, captured) not yet written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Returns the number of samples added so far"""
+        return self._count
+
+    def add_game(self, record):
+        """Adds a sample for every move of the game of a KubaRecord"""
+        samples, outcomes, captured = game_samples(record)
+        for item in zip(samples, outcomes, captured):
+            self._pending.append(item)
+            self._count += 1
+            if len(self._pending) == self._shard_size:
+                self.flush()
+
+    def flush(self):
+        """Writes the samples added since the last shard as a new shard"""
+        if not self._pending:
+            return
+        samples, outcomes, captured = zip(*self._pending)
+        self._pending = []
+        states = [state[:6] for state, _, _, _ in samples]
+        white_to_move = [white for _, white, _, _ in samples]
+        masks = np.zeros((len(samples), MOVE_COUNT), dtype=bool)
+        for row, (_, _, legal, _) in enumerate(samples):
+            masks[row, np.frombuffer(legal, dtype=np.uint8)] = True
+        arrays = {
+            'planes': build_planes(states, white_to_move),
+            'masks': masks,
+            'moves': np.array([move for _, _, _, move in samples],
+                              dtype=np.int16),
+            'outcomes': np.array(outcomes, dtype=np.int8),
+            'captured': np.array(captured, dtype=np.int8),
+        }
+        for name, array in arrays.items():
+            np.save(self._shard_path(self._shards, name), array)
+        self._shards += 1
+
+    def close(self):
+        """Writes the last shard"""
+        self.flush()
+
+    def _shard_path(self, shard, name):
+        """Used internally to return the path of the file of name in shard"""
+        return os.path.join(self._directory,
+                            'shard-{:05d}-{}.npy'.format(shard, name))
+
+
+def load_shards(directory):
+    """
+    Generator that yields a dictionary {name: array} for every shard in
+    directory in order, with every name in ARRAYS. The arrays are
+    memory-mapped, so only the parts that are used are read.
+    """
+    for path in sorted(glob.glob(os.path.join(directory,
+                                              'shard-*-planes.npy'))):
+        prefix = path[:-len('planes.npy')]
+        yield {name: np.load(prefix + name + '.npy', mmap_mode='r')
+               for name in ARRAYS}
+
+
+def self_play_records(count, seed=0, max_moves=200):
+    """
+    Generator that yields a KubaRecord for each of count games played by two
+    KubaRandomPlayers. A game stops after max_moves moves.
+    """
+    for game_number in range(count):
+        players = {'white': KubaRandomPlayer(seed + 2 * game_number),
+                   'black': KubaRandomPlayer(seed + 2 * game_number + 1)}
+        game = KubaPlayout(('white', 'W'), ('black', 'B'))
+        first = game_number % 2
+        name = ('white', 'black')[first]
+        moves = []
+        while len(moves) < max_moves and game.get_winner() is None:
+            move = players[name].choose_move(game, name)
+            if move is None:
+                break
+            game.make_move(name, *move)
+            moves.append(move_to_index(move))
+            name = game.get_current_turn()
+        yield KubaRecord(('white', 'W'), ('black', 'B'), first, bytes(moves))
+
+
+def write_dataset(directory, records, shard_size=65536, overwrite=False):
+    """
+    Writes the samples of every KubaRecord in records, which may be a
+    generator, to shards in directory and returns the number of samples.
+    overwrite is passed to KubaDatasetWriter.
+    """
+    with KubaDatasetWriter(directory, shard_size, overwrite) as writer:
+        for record in records:
+            writer.add_game(record)
+    return len(writer)
+
+
+def _records(paths):
+    """Used internally to chain the records of the files at paths"""
+    for path in paths:
+        yield from read_records(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Writes Kuba games as NumPy training data.')
+    parser.add_argument('output', help='directory to write the shards to')
+    parser.add_argument('records', nargs='*', help='game record files')
+    parser.add_argument('--self-play', type=int, default=0, metavar='GAMES',
+                        help='also add games played by random players')
+    parser.add_argument('--shard-size', type=int, default=65536,
+                        help='samples in each shard')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='replace the shards already in output')
+    args = parser.parse_args()
+
+    def records():
+        yield from _records(args.records)
+        yield from self_play_records(args.self_play)
+
+    count = write_dataset(args.output, records(), args.shard_size,
+                          args.overwrite)
+    print('Wrote', count, 'samples to', args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,556 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Differential fuzzing of the faster ways of playing Kuba against KubaGame
+#   with a KubaBoard, which is the reference. Random move sequences are played
+#   from the starting position and from random positions, mostly legal moves
+#   with some invalid ones mixed in. After every move the return value of the
+#   move, every cell, the marble counts, the captured counts, the winner and
+#   the player to move of each engine are compared with the reference:
+#
+#       bitboard  KubaGame with a KubaBitBoard and make_move
+#       push      KubaGame with a KubaBitBoard, validate_moves and push, and
+#                 pop of every move at the end
+#       state     KubaGame with a KubaBoard rebuilt by from_state from
+#                 get_state before every move
+#       playout   KubaPlayout, the lean game for self-play
+#       batch     KubaBatch playing all sequences of the same length at once,
+#                 left out when NumPy is not installed unless it is asked for
+#
+#   Random positions often have a full row or column, so pushes that reach
+#   the edge of the board (the last = 5 and last = 1 cases of _move_right and
+#   _move_left) are tried often. Sequences that fail are shrunk to as few
+#   moves as still fail. The cases are spread over a pool of worker processes.
+#
+#   Observing a move reads all 49 cells, which takes longer than the move
+#   itself, so every engine times its moves on their own. The report has the
+#   moves per second of each engine both with and without the observations.
+#
+#   Usage: python kuba_fuzz.py --cases 100000 [--engines bitboard push]
+
+import argparse
+import collections
+import importlib.util
+import os
+import random
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from KubaGame import DIRECTIONS, KubaGame, KubaPlayout, move_to_index
+
+PLAYER_ORDERS = ((('white', 'W'), ('black', 'B')),
+                 (('black', 'B'), ('white', 'W')))
+_LINES = [[(row, col) for col in range(7)] for row in range(7)] + \
+         [[(row, col) for row in range(7)] for col in range(7)]
+
+
+class KubaFuzzCase(collections.namedtuple(
+        'KubaFuzzCase', ('seed', 'players', 'start', 'moves'))):
+    """
+    A sequence of moves to play. players is the (name, color) of both players
+    in the order they are passed to KubaGame, start the state (see
+    KubaGame.get_state) the moves start from or None for the starting
+    position, and moves a list of (name, (row, col), direction) that may be
+    invalid.
+    """
+    __slots__ = ()
+
+
+class KubaFuzzFailure(collections.namedtuple(
+        'KubaFuzzFailure', ('engine', 'case', 'step', 'expected', 'actual'))):
+    """
+    A case, shrunk to as few moves as still fail, on which engine differs
+    from the reference. step is the number of moves made before the first
+    observation that differs (0 is the start position) and expected and
+    actual are the two observations (see observe), or None past the end of a
+    trace.
+    """
+    __slots__ = ()
+
+
+KubaFuzzReport = collections.namedtuple(
+    'KubaFuzzReport', ('cases', 'steps', 'seconds', 'engine_seconds',
+                       'move_seconds', 'failures'))
+
+
+def observe(game, made=None):
+    """
+    Returns what the fuzzer compares after a move: (made, cells, marble
+    counts, captured counts in player order, winner, player to move), where
+    made is what make_move returned and cells is a string of the 49 cells
+    from get_marble
+    """
+    names = [name for name, _ in game.get_players()]
+    cells = ''.join(game.get_marble((row, col))
+                    for row in range(7) for col in range(7))
+    return (made, cells, tuple(game.get_marble_count()),
+            tuple(game.get_captured(name) for name in names),
+            game.get_winner(), game.get_current_turn())
+
+
+def random_state(rand, players):
+    """
+    Returns the state (see KubaGame.get_state) of a random position where
+    nobody has won yet. The marbles are scattered over the board after
+    filling up a row or column most of the time.
+    """
+    marbles = (['W'] * rand.randint(1, 8) + ['B'] * rand.randint(1, 8)
+               + ['R'] * rand.randint(0, 13))
+    rand.shuffle(marbles)
+    cells = [(row, col) for row in range(7) for col in range(7)]
+    rand.shuffle(cells)
+    if rand.random() < 0.7:
+        line = rand.choice(_LINES)[:rand.randint(5, 7)]
+        cells = line + [cell for cell in cells if cell not in line]
+    bits = {'W': 0, 'B': 0, 'R': 0}
+    for (row, col), marble in zip(cells, marbles):
+        bits[marble] |= 1 << (7 * row + col)
+    red = marbles.count('R')
+    captured = [rand.randint(0, min(6, 13 - red)) for _ in players]
+    board = (bits['W'], bits['B'], bits['R'])
+    return board + board + (rand.choice((None, 0, 1)), None,
+                            captured[0], captured[1], None)
+
+
+def _new_game(case, bitboard):
+    """Used internally to return a game at the start of case"""
+    if case.start is None:
+        return KubaGame(*case.players, bitboard=bitboard)
+    return KubaGame.from_state(*case.players, case.start, bitboard=bitboard)
+
+
+def _timed(timing, function, *args):
+    """
+    Used internally to call function with args and add the seconds it took to
+    timing['moves'] if timing is not None
+    """
+    if timing is None:
+        return function(*args)
+    start = time.perf_counter()
+    result = function(*args)
+    timing['moves'] = timing.get('moves', 0.0) + time.perf_counter() - start
+    return result
+
+
+def generate_case(seed, length=60, start_probability=0.3,
+                  legal_probability=0.9):
+    """
+    Returns the KubaFuzzCase decided by seed: length moves from the starting
+    position, or from a random position with start_probability. Each move is
+    a legal move with legal_probability, otherwise a random and most likely
+    invalid move of either player.
+    """
+    rand = random.Random(seed)
+    players = rand.choice(PLAYER_ORDERS)
+    start = None
+    if rand.random() < start_probability:
+        start = random_state(rand, players)
+    case = KubaFuzzCase(seed, players, start, [])
+    game = _new_game(case, bitboard=True)
+    names = [name for name, _ in players]
+    for _ in range(length):
+        name = game.get_current_turn() or rand.choice(names)
+        legal = game.legal_moves(name)
+        if legal and rand.random() < legal_probability:
+            coordinates, direction = rand.choice(legal)
+        else:
+            name = rand.choice(names)
+            coordinates = (rand.randint(-1, 7), rand.randint(-1, 7))
+            direction = rand.choice(DIRECTIONS + ('X',))
+        game.make_move(name, coordinates, direction)
+        case.moves.append((name, coordinates, direction))
+    return case
+
+
+def reference_engine(cases, timing=None):
+    """
+    Returns the trace of observations of KubaGame with a KubaBoard. Every
+    engine takes an optional dictionary timing to which it adds the seconds
+    spent making moves (but not observing them) under 'moves'.
+    """
+    traces = []
+    for case in cases:
+        game = _new_game(case, bitboard=False)
+        trace = [observe(game)]
+        for move in case.moves:
+            trace.append(observe(game, _timed(timing, game.make_move, *move)))
+        traces.append(trace)
+    return traces
+
+
+def bitboard_engine(cases, timing=None):
+    """Returns the traces of KubaGame with a KubaBitBoard"""
+    traces = []
+    for case in cases:
+        game = _new_game(case, bitboard=True)
+        trace = [observe(game)]
+        for move in case.moves:
+            trace.append(observe(game, _timed(timing, game.make_move, *move)))
+        traces.append(trace)
+    return traces
+
+
+def playout_engine(cases, timing=None):
+    """Returns the traces of KubaPlayout"""
+    traces = []
+    for case in cases:
+        game = KubaPlayout.from_state(
+            *case.players, _new_game(case, bitboard=True).get_state())
+        trace = [observe(game)]
+        for move in case.moves:
+            trace.append(observe(game, _timed(timing, game.make_move, *move)))
+        traces.append(trace)
+    return traces
+
+
+def _push_move(game, name, row, col, direction, claimed):
+    """
+    Used internally to make a move for push_engine. Returns whether it was
+    made. Before the first move make_move gives the turn to the first player
+    to try a move even if the move is invalid, but push has no such rule, so
+    claimed is the name of that player and the moves of the other are
+    rejected.
+    """
+    if claimed is not None and name != claimed:
+        return False
+    reason, = game.validate_moves([(row, col, direction)], name)
+    if reason is None:
+        game.push(((row, col), direction))
+    return reason is None
+
+
+def _pop_moves(game, count):
+    """Used internally to pop count moves made with push"""
+    for _ in range(count):
+        game.pop()
+
+
+def push_engine(cases, timing=None):
+    """
+    Returns the traces of KubaGame with a KubaBitBoard where moves are
+    checked with validate_moves and made in place with push. An extra
+    observation is added if popping every move does not give back the
+    position before the first push. The turn the first invalid move gives
+    to its player is kept here instead of in the game (see _push_move).
+    """
+    traces = []
+    for case in cases:
+        game = _new_game(case, bitboard=True)
+        trace = [observe(game)]
+        before, pushed, claimed = None, 0, None
+        for name, (row, col), direction in case.moves:
+            if before is None:
+                state = game.get_state()
+            made = _timed(timing, _push_move, game, name, row, col, direction,
+                          claimed)
+            if made:
+                pushed, claimed = pushed + 1, None
+                if before is None:
+                    before = state
+            observation = observe(game, made)
+            if game.get_current_turn() is None:
+                claimed = claimed or name
+                observation = observation[:-1] + (claimed,)
+            trace.append(observation)
+        if before is not None:
+            _timed(timing, _pop_moves, game, pushed)
+            if game.get_state() != before:
+                trace.append(('pop', game.get_state()))
+        traces.append(trace)
+    return traces
+
+
+def _rebuild_and_move(game, players, move):
+    """
+    Used internally to rebuild game from its state and make move for
+    state_engine. Returns (new game, what make_move returned).
+    """
+    game = KubaGame.from_state(*players, game.get_state(), bitboard=False)
+    return game, game.make_move(*move)
+
+
+def state_engine(cases, timing=None):
+    """
+    Returns the traces of KubaGame with a KubaBoard that is rebuilt from its
+    own get_state before every move
+    """
+    traces = []
+    for case in cases:
+        game = _new_game(case, bitboard=False)
+        trace = [observe(game)]
+        for move in case.moves:
+            game, made = _timed(timing, _rebuild_and_move, game,
+                                case.players, move)
+            trace.append(observe(game, made))
+        traces.append(trace)
+    return traces
+
+
+def batch_engine(cases, timing=None):
+    """
+    Returns the traces of KubaBatch, which plays every group of cases with
+    the same players and number of moves in lockstep
+    """
+    import numpy as np                  # Only the batch engine needs NumPy
+    from kuba_batch import KubaBatch
+
+    symbols = np.array(['X', 'W', 'B', 'R'])     # Like get_marble
+    traces = [None] * len(cases)
+    groups = collections.defaultdict(list)
+    for index, case in enumerate(cases):
+        groups[case.players, len(case.moves)].append(index)
+    for (players, length), indices in groups.items():
+        names = [name for name, _ in players]
+        start = KubaGame(*players).get_state()
+        batch = KubaBatch.from_states(*players, [
+            start if cases[index].start is None else cases[index].start
+            for index in indices])
+        group = [[] for _ in indices]
+
+        def add_observations(made):
+            boards = symbols[batch.get_boards().reshape(len(indices), 49)]
+            counts = batch.get_marble_counts()
+            captured = batch.get_captured()
+            for number in range(len(indices)):
+                winner = int(batch.get_winners()[number])
+                turn = int(batch.get_turns()[number])
+                group[number].append((
+                    None if made is None else bool(made[number]),
+                    ''.join(boards[number]),
+                    tuple(int(count) for count in counts[number]),
+                    tuple(int(count) for count in captured[number]),
+                    None if winner < 0 else names[winner],
+                    None if turn < 0 else names[turn]))
+
+        add_observations(None)
+        for step in range(length):
+            movers, moves = [], []
+            for index in indices:
+                name, (row, col), direction = cases[index].moves[step]
+                movers.append(names.index(name))
+                encodable = (row in range(7) and col in range(7)
+                             and direction in DIRECTIONS)
+                moves.append(move_to_index(((row, col), direction))
+                             if encodable else -1)
+            add_observations(_timed(timing, batch.make_moves, movers, moves))
+        for index, trace in zip(indices, group):
+            traces[index] = trace
+    return traces
+
+
+ENGINES = {
+    'bitboard': bitboard_engine,
+    'push': push_engine,
+    'state': state_engine,
+    'playout': playout_engine,
+    'batch': batch_engine,
+}
+
+
+def _run(engine, cases, timing):
+    """
+    Used internally to return the traces of engine, where an engine that
+    raises an exception on a case gets the trace [('error', repr(error))]
+    """
+    try:
+        return engine(cases, timing)
+    except Exception:
+        if len(cases) == 1:
+            raise
+    timing.clear()
+    traces = []
+    for case in cases:
+        try:
+            traces.extend(engine([case], timing))
+        except Exception as error:
+            traces.append([('error', repr(error))])
+    return traces
+
+
+def first_difference(expected, actual):
+    """Returns the first step where two traces differ or None if they match"""
+    for step, (want, got) in enumerate(zip(expected, actual)):
+        if want != got:
+            return step
+    if len(expected) != len(actual):
+        return min(len(expected), len(actual))
+    return None
+
+
+def _check(engine, case):
+    """
+    Used internally to return (step, expected, actual) where engine first
+    differs from the reference on case or None if it does not
+    """
+    expected, = reference_engine([case])
+    try:
+        actual, = engine([case])
+    except Exception as error:
+        actual = [('error', repr(error))]
+    step = first_difference(expected, actual)
+    if step is None:
+        return None
+    return (step, expected[step] if step < len(expected) else None,
+            actual[step] if step < len(actual) else None)
+
+
+def shrink(engine, case):
+    """
+    Returns a KubaFuzzFailure for the shortest version of case that engine
+    still fails on, found by cutting the moves after the first difference
+    and then leaving out one move at a time while it keeps failing. Returns
+    None if engine does not fail on case.
+    """
+    result = _check(engine, case)
+    if result is None:
+        return None
+    shorter = case._replace(moves=case.moves[:result[0]])
+    shorter_result = _check(engine, shorter)
+    if shorter_result is not None:
+        case, result = shorter, shorter_result
+    changed = True
+    while changed:
+        changed = False
+        for index in range(len(case.moves) - 1, -1, -1):
+            smaller = case._replace(
+                moves=case.moves[:index] + case.moves[index + 1:])
+            smaller_result = _check(engine, smaller)
+            if smaller_result is not None:
+                case, result, changed = smaller, smaller_result, True
+    engine_name = getattr(engine, '__name__', str(engine))
+    return KubaFuzzFailure(engine_name, case, *result)
+
+
+def fuzz_chunk(engines, seeds, length=60, max_failures=3):
+    """
+    Plays the cases of seeds on the reference and each engine, given as a
+    dictionary of name: function of a list of cases that returns their
+    traces (see reference_engine). Runs in the worker processes. Returns
+    (steps, engine_seconds, move_seconds, failures) where engine_seconds is
+    {name: seconds spent}, move_seconds is {name: seconds spent making moves}
+    and failures a list of at most max_failures shrunk KubaFuzzFailure per
+    engine.
+    """
+    cases = [generate_case(seed, length) for seed in seeds]
+    timing = {}
+    start = time.perf_counter()
+    expected = reference_engine(cases, timing)
+    seconds = {'reference': time.perf_counter() - start}
+    move_seconds = {'reference': timing.get('moves', 0.0)}
+    failures = []
+    for name, engine in engines.items():
+        timing = {}
+        start = time.perf_counter()
+        traces = _run(engine, cases, timing)
+        seconds[name] = time.perf_counter() - start
+        move_seconds[name] = timing.get('moves', 0.0)
+        failed = [case for case, want, got in zip(cases, expected, traces)
+                  if first_difference(want, got) is not None]
+        for case in failed[:max_failures]:
+            failure = shrink(engine, case)
+            if failure is not None:
+                failures.append(failure._replace(engine=name))
+    return (sum(len(case.moves) for case in cases), seconds, move_seconds,
+            failures)
+
+
+def _has_numpy():
+    """Used internally to check if NumPy, which batch_engine needs, is there"""
+    return importlib.util.find_spec('numpy') is not None
+
+
+def fuzz(engines=None, cases=10000, length=60, seed=0, workers=None,
+         chunk_size=200):
+    """
+    Plays cases random move sequences of length moves on the reference and
+    on engines and returns a KubaFuzzReport with the number of cases and
+    moves, the seconds taken, the seconds each engine took in total and
+    making moves only, and the failures found.
+
+    :param engines:    Names from ENGINES or a dictionary of name: function
+                       (picklable, e.g. a module level function, taking the
+                       same arguments as reference_engine). Defaults to every
+                       engine in ENGINES, without batch and with a warning if
+                       NumPy is not installed.
+    :param seed:       Case i is played from the seed seed * 1000003 + i.
+    :param workers:    Number of worker processes, defaults to the number of
+                       CPUs. With 1 everything runs in this process.
+    :param chunk_size: Cases handed to a worker at a time.
+    """
+    if engines is None:
+        engines = list(ENGINES)
+        if not _has_numpy():
+            warnings.warn('NumPy is not installed, skipping the batch engine')
+            engines.remove('batch')
+    if not isinstance(engines, dict):
+        engines = {name: ENGINES[name] for name in engines}
+    workers = workers or os.cpu_count() or 1
+    seeds = [seed * 1000003 + index for index in range(cases)]
+    chunks = [seeds[index:index + chunk_size]
+              for index in range(0, len(seeds), chunk_size)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [fuzz_chunk(engines, chunk, length) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                fuzz_chunk, [engines] * len(chunks), chunks,
+                [length] * len(chunks)))
+    seconds = time.perf_counter() - start
+    steps = 0
+    engine_seconds = collections.Counter()
+    move_seconds = collections.Counter()
+    failures = []
+    for chunk_steps, chunk_seconds, chunk_moves, chunk_failures in results:
+        steps += chunk_steps
+        engine_seconds.update(chunk_seconds)
+        move_seconds.update(chunk_moves)
+        failures.extend(chunk_failures)
+    return KubaFuzzReport(cases, steps, seconds, dict(engine_seconds),
+                          dict(move_seconds), failures)
+
+
+def format_failure(failure):
+    """Returns a failure as lines of Python that replay it"""
+    lines = ['{} differs after {} moves of case {}:'.format(
+                 failure.engine, failure.step, failure.case.seed),
+             '    players = {!r}'.format(failure.case.players),
+             '    start = {!r}'.format(failure.case.start),
+             '    moves = {!r}'.format(failure.case.moves),
+             '    expected {!r}'.format(failure.expected),
+             '    actual   {!r}'.format(failure.actual)]
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compares the fast Kuba engines with the reference.')
+    parser.add_argument('--cases', type=int, default=10000)
+    parser.add_argument('--length', type=int, default=60,
+                        help='moves in every case')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int,
+                        help='worker processes, defaults to the CPUs')
+    args = parser.parse_args()
+
+    report = fuzz(args.engines, args.cases, args.length, args.seed,
+                  args.workers)
+    print('{} cases, {} moves in {:.1f} s: {:.0f} moves/s'.format(
+        report.cases, report.steps, report.seconds,
+        report.steps / report.seconds))
+    print('{:>10} {:>12} {:>12}'.format('', 'moves/s', 'with observe'))
+    for name, seconds in sorted(report.engine_seconds.items()):
+        move_seconds = report.move_seconds[name]
+        print('{:>10} {:>12.0f} {:>12.0f}'.format(
+            name, report.steps / move_seconds if move_seconds else 0,
+            report.steps / seconds))
+    for failure in report.failures:
+        print(format_failure(failure))
+    sys.exit(1 if report.failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaHintService, an asyncio front end that answers many "what is
+#   the best move here?" requests at once. Requests that arrive within a
+#   short window are coalesced into one batch, the batch is handed to an
+#   evaluator in one call and every waiter gets its own move back. An
+#   evaluator is a function of a list of jobs (players, state, player_name),
+#   with the state from KubaGame.get_state, that returns a move or None for
+#   each job:
+#
+#       greedy_evaluator  tries every legal move of every position of the
+#                         batch at once with NumPy (see KubaBatch)
+#       search_evaluator  runs a KubaSearchPlayer on each position, meant to
+#                         be run on a process pool
+#
+#   The service counts the requests waiting and keeps histograms of the
+#   batch sizes and of the latency of the requests.
+#
+#   Usage: python kuba_hints.py [--port 8765] [--max-batch 64] [--max-wait 5]
+#          starts a KubaServer whose hint requests use the service.
+
+import argparse
+import asyncio
+import bisect
+import time
+
+import numpy as np
+
+from KubaGame import KubaGame, index_to_move
+from kuba_batch import KubaBatch
+from kuba_search import KubaSearchPlayer
+from kuba_server import DEFAULT_PORT, KubaServer
+
+# Upper bounds of the buckets of the histograms, the last bucket is for
+# everything larger
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+_WIN_SCORE = 100000
+
+
+def _white_first(players, state, player_name):
+    """
+    Used internally to return (state, mover) of a job with the players
+    numbered so the white player is player 0, where mover is the number of
+    player_name
+    """
+    mover = [name for name, _ in players].index(player_name)
+    if players[0][1] == 'B':
+        turn, winner, captured1, captured2 = state[6:10]
+        state = state[:6] + (None if turn is None else 1 - turn,
+                             None if winner is None else 1 - winner,
+                             captured2, captured1, state[10])
+        mover = 1 - mover
+    return state, mover
+
+
+def greedy_evaluator(jobs):
+    """
+    Returns the best move by a one ply lookahead for each job: a win first,
+    then the most red marbles captured and marbles left compared to the
+    other player, the lowest numbered move on ties. Every legal move of
+    every position is made in one vectorized step. The move is None where
+    there are no legal moves.
+    """
+    if not jobs:
+        return []
+    states, movers = zip(*(_white_first(*job) for job in jobs))
+    movers = np.array(movers, dtype=np.intp)
+    batch = KubaBatch.from_states(('white', 'W'), ('black', 'B'), states)
+    games, moves = np.nonzero(batch.legal_move_mask(movers))
+    results = [None] * len(jobs)
+    if not len(games):
+        return results
+
+    children = batch.take(games)
+    children.make_moves(movers[games], moves)
+    players = movers[games]
+    rows = np.arange(len(games))
+    captured = children.get_captured()
+    counts = children.get_marble_counts()
+    scores = (100 * (captured[rows, players] - captured[rows, 1 - players])
+              + 60 * (counts[rows, players] - counts[rows, 1 - players])
+              + _WIN_SCORE * (children.get_winners() == players))
+    # Best move of each game: sorted by game, then score, then move number
+    order = np.lexsort((moves, -scores, games))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = games[order][1:] != games[order][:-1]
+    for index in order[first]:
+        results[games[index]] = index_to_move(int(moves[index]))
+    return results
+
+
+def search_evaluator(jobs, time_limit_ms=100):
+    """
+    Returns the move a KubaSearchPlayer thinking time_limit_ms for each job
+    finds, or None where there are no legal moves
+    """
+    player = KubaSearchPlayer(time_limit_ms=time_limit_ms)
+    return [player.choose_move(KubaGame.from_state(players[0], players[1],
+                                                   state), player_name)
+            for players, state, player_name in jobs]
+
+
+class _Histogram:
+    """Counts values in buckets with the upper bounds bounds"""
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        """Adds value to the bucket it falls in"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def snapshot(self):
+        """
+        Returns {'buckets': [[bound, count], ...], 'count': n, 'sum': total}
+        where the bound of the last bucket is None
+        """
+        bounds = list(self.bounds) + [None]
+        return {'buckets': [list(pair) for pair in zip(bounds, self.counts)],
+                'count': sum(self.counts), 'sum': self.total}
+
+
+class KubaHintService:
+    """
+    Finds best moves for many positions by coalescing the requests that
+    arrive within max_wait_ms into batches of at most max_batch and handing
+    each batch to the evaluator. Use it as an async context manager or await
+    start and close.
+    """
+    def __init__(self, evaluator=greedy_evaluator, max_batch=64,
+                 max_wait_ms=5, executor=None, max_in_flight=1):
+        """
+        Creates a new hint service.
+
+        :param evaluator:     Function of a list of jobs (players, state,
+                              player_name) that returns a move for each.
+        :param max_batch:     Most requests evaluated in one batch.
+        :param max_wait_ms:   Longest time the first request of a batch waits
+                              for more requests to join it.
+        :param executor:      concurrent.futures executor the evaluator runs
+                              on, e.g. a ProcessPoolExecutor. Defaults to the
+                              default executor of the event loop.
+        :param max_in_flight: Batches that may be evaluated at the same time.
+        """
+        self._evaluator = evaluator
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._executor = executor
+        self._max_in_flight = max_in_flight
+        self._queue = None
+        self._task = None
+        self._in_flight = set()
+        self._requests = 0
+        self._batches = 0
+        self._max_queue_depth = 0
+        self._latencies = _Histogram(LATENCY_BUCKETS_MS)
+        self._batch_sizes = _Histogram(BATCH_SIZE_BUCKETS)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Starts collecting requests into batches"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.ensure_future(self._collect())
+
+    async def close(self):
+        """
+        Stops the service. Batches being evaluated are finished and requests
+        still waiting fail with ConnectionError.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(ConnectionError('hint service closed'))
+
+    def get_queue_depth(self):
+        """Returns the number of requests waiting to be put in a batch"""
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def get_stats(self):
+        """
+        Returns a dictionary with the number of requests and batches, the
+        current and largest queue depth, and the histograms (see
+        _Histogram.snapshot) of the latency in milliseconds and batch size.
+        """
+        return {
+            'requests': self._requests,
+            'batches': self._batches,
+            'queue_depth': self.get_queue_depth(),
+            'max_queue_depth': self._max_queue_depth,
+            'latency_ms': self._latencies.snapshot(),
+            'batch_size': self._batch_sizes.snapshot(),
+        }
+
+    async def best_move(self, game, player_name=None):
+        """
+        Returns the best move ((row, col), direction) the evaluator finds for
+        player_name in game, or None if there is none. The position is read
+        right away, so game may change while the request waits.
+
+        :param player_name: Defaults to the player whose turn it is. Has to be
+                            given before the first move of the game.
+        """
+        if self._task is None:
+            raise RuntimeError('the hint service is not started')
+        if player_name is None:
+            player_name = game.get_current_turn()
+        if player_name is None:
+            raise ValueError('player_name is needed before the first move')
+        job = (game.get_players(), game.get_state(), player_name)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future, time.perf_counter()))
+        self._requests += 1
+        self._max_queue_depth = max(self._max_queue_depth,
+                                    self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        """
+        Used internally to take requests off the queue in batches and start
+        evaluating each batch, with at most max_in_flight at once
+        """
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self._max_in_flight)
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self._max_wait
+                while len(batch) < self._max_batch:
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(
+                            self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await slots.acquire()
+                task = asyncio.ensure_future(self._evaluate(batch))
+                batch = []
+                self._in_flight.add(task)
+                task.add_done_callback(lambda task: (
+                    self._in_flight.discard(task), slots.release()))
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError('hint service closed'))
+            raise
+
+    async def _evaluate(self, batch):
+        """
+        Used internally to evaluate a batch on the executor and hand every
+        waiter its move
+        """
+        self._batches += 1
+        self._batch_sizes.observe(len(batch))
+        jobs = [job for job, _, _ in batch]
+        try:
+            moves = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._evaluator, jobs)
+        except Exception as error:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        end = time.perf_counter()
+        for (_, future, start), move in zip(batch, moves):
+            self._latencies.observe((end - start) * 1000)
+            if not future.done():
+                future.set_result(move)
+
+
+async def _serve(args):
+    """Used internally to run a KubaServer with a hint service"""
+    async with KubaHintService(max_batch=args.max_batch,
+                               max_wait_ms=args.max_wait) as hints:
+        server = KubaServer(args.host, args.port, hints=hints)
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Runs a Kuba game server that answers hint requests in '
+                    'batches.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch', type=int, default=64,
+                        help='most positions evaluated at once')
+    parser.add_argument('--max-wait', type=float, default=5,
+                        help='milliseconds a request waits for others')
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaMCTSPlayer, a computer player for KubaGame that uses Monte
+#   Carlo Tree Search. The tree lives in the main process and the random
+#   playouts of each batch of leaves are spread over a ProcessPoolExecutor.
+#   Leaves are sent to the workers as the flat tuples of KubaGame.get_state
+#   and played out with a KubaPlayout. Every playout has its own seed, so the chosen move only depends on the
+#   seed and not on the number of workers.
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from KubaGame import KubaPlayout
+
+_PLAYOUT = object()     # Marks a leaf whose result comes from a playout
+
+
+def _run_playouts(players, jobs, max_moves):
+    """
+    Plays random games to the end for every (state, seed) in jobs and returns
+    a list with the index of the winning player (0 or 1, by the order of
+    players) or None for games stopped after max_moves moves. A player who
+    has no legal moves loses. Runs in the worker processes.
+    """
+    results = []
+    for state, seed in jobs:
+        game = KubaPlayout.from_state(players[0], players[1], state)
+        rand = random.Random(seed)
+        names = [players[0][0], players[1][0]]
+        winner = None
+        for _ in range(max_moves):
+            winner = game.get_winner()
+            if winner is not None:
+                break
+            moves = game.legal_moves()
+            if not moves:
+                winner = game.get_opponent(game.get_current_turn())
+                break
+            game.make_move(game.get_current_turn(), *rand.choice(moves))
+        results.append(None if winner is None else names.index(winner))
+    return results
+
+
+class _Node:
+    """A node in the search tree, reached from its parent by move"""
+    __slots__ = ('move', 'parent', 'player', 'children', 'untried', 'visits',
+                 'wins', 'winner')
+
+    def __init__(self, move, parent, player):
+        self.move = move            # Move that leads from parent to this node
+        self.parent = parent
+        self.player = player        # Index of the player who made move
+        self.children = []
+        self.untried = None         # Moves not expanded yet, set on first visit
+        self.visits = 0
+        self.wins = 0.0             # Wins for player, draws count as half
+        self.winner = None          # Index of the winner if the game is over
+
+
+class KubaMCTSPlayer:
+    """
+    A computer player for KubaGame that picks moves with Monte Carlo Tree
+    Search. Each iteration selects a batch of leaves with UCT (a virtual loss
+    keeps the batch from picking the same leaf), plays them out in parallel
+    and backs the results up the tree. Use it as a context manager or call
+    close to shut down the worker processes.
+    """
+    def __init__(self, playouts=2000, batch_size=64, workers=None, seed=0,
+                 exploration=1.4, max_playout_moves=200):
+        """
+        Creates a new MCTS player.
+
+        :param playouts:          Number of playouts to run for each move.
+        :param batch_size:        Number of leaves played out at the same time.
+        :param workers:           Number of worker processes. Defaults to the
+                                  number of CPUs. With 1 the playouts run in
+                                  this process.
+        :param seed:              Seed that decides every random choice.
+        :param exploration:       UCT exploration constant.
+        :param max_playout_moves: Playouts longer than this count as a draw.
+        """
+        self._playouts = playouts
+        self._batch_size = batch_size
+        self._workers = workers
+        self._seed = seed
+        self._exploration = exploration
+        self._max_playout_moves = max_playout_moves
+        self._executor = None
+        self._stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def get_stats(self):
+        """
+        Returns a dictionary of statistics about the last call to choose_move:
+        playouts, elapsed milliseconds, playouts per second and tree nodes.
+        """
+        return dict(self._stats)
+
+    def choose_move(self, game, player_name=None):
+        """
+        Returns the most visited move ((row, col), direction) for player_name
+        after all playouts, or None if there are no legal moves.
+
+        :param game:        The KubaGame to find a move in. It is not changed.
+        :param player_name: Defaults to the player whose turn it is. Has to be
+                            given before the first move of the game.
+        """
+        start = time.perf_counter()
+        if player_name is None:
+            player_name = game.get_current_turn()
+        moves = game.legal_moves(player_name)
+        if not moves:
+            self._stats = {'playouts': 0, 'elapsed_ms': 0.0,
+                           'playouts_per_second': 0.0, 'nodes': 0}
+            return None
+
+        players = game.get_players()
+        names = [name for name, _ in players]
+        search_game = game.copy(bitboard=True)
+        rand = random.Random(self._seed)
+        root = _Node(None, None, 1 - names.index(player_name))
+        root.untried = list(moves)
+        rand.shuffle(root.untried)
+        nodes = 1
+        done = 0
+
+        while done < self._playouts:
+            batch_size = min(self._batch_size, self._playouts - done)
+            paths, jobs, known = [], [], []
+            for _ in range(batch_size):
+                path, new_nodes = self._select(root, search_game, names, rand)
+                nodes += new_nodes
+                paths.append(path)
+                leaf = path[-1]
+                if leaf.winner is not None:
+                    known.append(leaf.winner)
+                else:
+                    known.append(_PLAYOUT)
+                    jobs.append((search_game.get_state(), rand.getrandbits(64)))
+                for _ in range(len(path) - 1):
+                    search_game.pop()
+
+            results = iter(self._play(players, jobs))
+            for path, result in zip(paths, known):
+                if result is _PLAYOUT:
+                    result = next(results)
+                for node in path:
+                    if result is None:
+                        node.wins += 0.5
+                    elif result == node.player:
+                        node.wins += 1
+            done += batch_size
+
+        elapsed = time.perf_counter() - start
+        self._stats = {
+            'playouts': done,
+            'elapsed_ms': elapsed * 1000,
+            'playouts_per_second': done / elapsed if elapsed else 0.0,
+            'nodes': nodes,
+        }
+        best = max(root.children, key=lambda child: child.visits)
+        return best.move
+
+    def _select(self, root, game, names, rand):
+        """
+        Used internally to walk down the tree with UCT from root, pushing the
+        moves on game, and to expand one new leaf. Every node on the path gets
+        a visit right away as a virtual loss. Returns (path, new node count).
+        """
+        node = root
+        node.visits += 1
+        path = [node]
+        while True:
+            if node.winner is not None:
+                return path, 0
+            if node.untried is None:
+                node.untried = game.legal_moves()
+                rand.shuffle(node.untried)
+                if not node.untried and not node.children:
+                    # The player to move has no moves and loses
+                    node.winner = node.player
+                    return path, 0
+            if node.untried:
+                move = node.untried.pop()
+                game.push(move)
+                child = _Node(move, node, 1 - node.player)
+                winner = game.get_winner()
+                if winner is not None:
+                    child.winner = names.index(winner)
+                node.children.append(child)
+                child.visits += 1
+                path.append(child)
+                return path, 1
+            log_visits = math.log(node.visits)
+            exploration = self._exploration
+            node = max(node.children, key=lambda child: (
+                child.wins / child.visits
+                + exploration * math.sqrt(log_visits / child.visits)))
+            game.push(node.move)
+            node.visits += 1
+            path.append(node)
+
+    def _play(self, players, jobs):
+        """
+        Used internally to run the playouts for jobs, split into one chunk per
+        worker, and return their results in the same order as jobs.
+        """
+        if not jobs:
+            return []
+        if self._workers == 1:
+            return _run_playouts(players, jobs, self._max_playout_moves)
+        workers = self._workers or os.cpu_count() or 1
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        size = -(-len(jobs) // workers)
+        chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+        results = []
+        for chunk_results in self._executor.map(
+                _run_playouts, [players] * len(chunks), chunks,
+                [self._max_playout_moves] * len(chunks)):
+            results.extend(chunk_results)
+        return results
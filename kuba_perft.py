@@ -0,0 +1,322 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains a perft benchmark for KubaGame. Perft counts every position that
+#   can be reached in exactly depth moves, which checks the move generator
+#   against known counts and measures how fast it is. The benchmark also
+#   times make_move, _validate_move and copying boards on their own, for
+#   both the list and the bitboard board, and make_move of KubaPlayout, the
+#   lean game for self-play. Results are written as JSON so runs on
+#   different commits can be compared.
+#
+#   Usage: python kuba_perft.py --depth 3 --output perft.json
+#          python kuba_perft.py --baseline perft.json --threshold 0.1
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from KubaGame import KubaBoard, KubaGame, index_to_move
+
+PLAYERS = (('white', 'W'), ('black', 'B'))
+BACKENDS = {'list': False, 'bitboard': True}
+
+# Positions reached from the start by these moves (numbered like
+# move_to_index), with white moving first
+POSITIONS = {
+    'start': [],
+    'opening': [7, 24, 61, 19, 164, 141, 158, 174, 67, 177, 34, 19],
+    'middlegame': [
+        1, 24, 7, 54, 11, 48, 39, 27, 194, 17, 166, 27, 108, 169, 161, 143,
+        136, 80, 134, 52, 29, 20, 104, 145, 78, 149, 164, 170, 39, 142,
+    ],
+    'late': [
+        29, 27, 164, 170, 190, 142, 192, 23, 189, 51, 192, 82, 188, 76, 33,
+        172, 181, 144, 186, 141, 158, 145, 7, 27, 189, 19, 192, 85, 1, 149,
+        5, 52, 188, 47, 35, 48, 43, 110, 164, 170, 63, 181, 89, 115, 154, 55,
+        93, 72, 8, 68, 97, 66, 43, 169, 70, 185, 157, 189, 42, 47,
+    ],
+}
+
+# Known leaf counts at depth 1, 2, 3, ... for every position
+PERFT_COUNTS = {
+    'start': [8, 64, 640, 6384, 70804],
+    'opening': [9, 123, 1336, 17673, 204382],
+    'middlegame': [11, 140, 1543, 18705, 206797],
+    'late': [9, 113, 1149, 14067, 150340],
+}
+
+
+def make_position(name, bitboard=False):
+    """Returns a new KubaGame in the position called name in POSITIONS"""
+    game = KubaGame(PLAYERS[0], PLAYERS[1], bitboard=bitboard)
+    player = PLAYERS[0][0]
+    for index in POSITIONS[name]:
+        if not game.make_move(player, *index_to_move(index)):
+            raise ValueError('invalid move {} in {}'.format(index, name))
+        player = game.get_current_turn()
+    return game
+
+
+def perft(game, depth, player_name=None):
+    """
+    Returns the number of positions reached from game in exactly depth moves
+    using legal_moves, push and pop. A won game has no moves.
+
+    :param player_name: Player to move first. Defaults to the player whose
+                        turn it is and has to be given before the first move.
+    """
+    if depth == 0:
+        return 1
+    moves = game.legal_moves(player_name)
+    if depth == 1:
+        return len(moves)
+    count = 0
+    for move in moves:
+        game.push(move)
+        count += perft(game, depth - 1)
+        game.pop()
+    return count
+
+
+def perft_make_move(game, depth, player_name=None):
+    """
+    Returns the same count as perft but tries all 196 moves with make_move on
+    copies of game, so it does not depend on legal_moves at all.
+    """
+    if depth == 0:
+        return 1
+    if player_name is None:
+        player_name = game.get_current_turn()
+    count = 0
+    child = game.copy()
+    for index in range(196):
+        # A move that is not made leaves the copy as it was
+        if child.make_move(player_name, *index_to_move(index)):
+            count += perft_make_move(child, depth - 1)
+            child = game.copy()
+    return count
+
+
+def _rate(count, seconds):
+    """Used internally to turn a count and a duration into a rate"""
+    return count / seconds if seconds else 0.0
+
+
+def _sample_games(bitboard):
+    """
+    Used internally to return the games in every position of POSITIONS and
+    one move after it, to time the single operations on
+    """
+    games = []
+    for name in POSITIONS:
+        game = make_position(name, bitboard)
+        games.append(game)
+        player = game.get_current_turn() or PLAYERS[0][0]
+        for move in game.legal_moves(player):
+            child = game.copy()
+            child.make_move(player, *move)
+            games.append(child)
+    return games
+
+
+def time_operations(bitboard, repeat=3):
+    """
+    Returns {operation: calls per second} for make_move, _validate_move and
+    copying the board, each timed on its own over many positions. Every operation is timed repeat times and the fastest run is
+    kept.
+    """
+    games = _sample_games(bitboard)
+    moves = [index_to_move(index) for index in range(196)]
+    jobs = []
+    for game in games:
+        player = game.get_current_turn() or PLAYERS[0][0]
+        for move in game.legal_moves(player):
+            jobs.append((game, player, move))
+    board_class = type(games[0]._board)
+    best = {}
+
+    for _ in range(repeat):
+        copies = [(game.copy(), player, move) for game, player, move in jobs]
+        start = time.perf_counter()
+        for game, player, move in copies:
+            game.make_move(player, *move)
+        timings = {'make_move': (len(copies), time.perf_counter() - start)}
+
+        start = time.perf_counter()
+        calls = 0
+        for game in games:
+            player = game._player_info[game.get_current_turn() or PLAYERS[0][0]]
+            validate = game._validate_move
+            for (row, col), direction in moves:
+                validate(player, row, col, direction)
+            calls += len(moves)
+        timings['_validate_move'] = (calls, time.perf_counter() - start)
+
+        boards = [game._board for game in games] * 20
+        start = time.perf_counter()
+        if board_class is KubaBoard:
+            for board in boards:
+                KubaBoard(board.board)
+        else:
+            for board in boards:
+                board.copy()
+        timings['copy_board'] = (len(boards), time.perf_counter() - start)
+
+        for operation, (count, seconds) in timings.items():
+            best[operation] = max(best.get(operation, 0.0),
+                                  _rate(count, seconds))
+    return best
+
+
+def time_playout(repeat=3):
+    """
+    Returns {'make_move': calls per second} of KubaPlayout.make_move, timed
+    on the same moves as make_move in time_operations
+    """
+    jobs = []
+    for game in _sample_games(bitboard=True):
+        player = game.get_current_turn() or PLAYERS[0][0]
+        for move in game.legal_moves(player):
+            jobs.append((game, player, move))
+    best = 0.0
+    for _ in range(repeat):
+        copies = [(game.playout(), player, move)
+                  for game, player, move in jobs]
+        start = time.perf_counter()
+        for playout, player, move in copies:
+            playout.make_move(player, *move)
+        best = max(best, _rate(len(copies), time.perf_counter() - start))
+    return {'make_move': best}
+
+
+def run_benchmark(depth, positions=None, check_make_move=True):
+    """
+    Runs perft to depth from every position and times the single operations
+    for both kinds of board. Returns the results as a dictionary that can be
+    written as JSON.
+
+    :param positions:       Names of the positions to use, defaults to all.
+    :param check_make_move: Also count with perft_make_move and report a
+                            mismatch with perft.
+    """
+    results = {
+        'version': 1,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'depth': depth,
+        'perft': {},
+        'operations': {},
+        'mismatches': [],
+    }
+    for name in positions or POSITIONS:
+        results['perft'][name] = {}
+        for backend, bitboard in BACKENDS.items():
+            game = make_position(name, bitboard)
+            player = game.get_current_turn() or PLAYERS[0][0]
+            counts = []
+            nodes = 0
+            start = time.perf_counter()
+            for current in range(1, depth + 1):
+                counts.append(perft(game, current, player))
+                nodes += counts[-1]
+            seconds = time.perf_counter() - start
+            results['perft'][name][backend] = {
+                'counts': counts,
+                'nodes_per_second': _rate(nodes, seconds),
+            }
+            known = PERFT_COUNTS.get(name, [])[:depth]
+            if counts[:len(known)] != known:
+                results['mismatches'].append(
+                    '{} {}: perft {} != known {}'.format(
+                        name, backend, counts[:len(known)], known))
+            if check_make_move:
+                start = time.perf_counter()
+                other = [perft_make_move(game, current, player)
+                         for current in range(1, depth + 1)]
+                seconds = time.perf_counter() - start
+                results['perft'][name][backend]['make_move_nodes_per_second'] = (
+                    _rate(sum(other), seconds))
+                if other != counts:
+                    results['mismatches'].append(
+                        '{} {}: perft_make_move {} != perft {}'.format(
+                            name, backend, other, counts))
+    for backend, bitboard in BACKENDS.items():
+        results['operations'][backend] = time_operations(bitboard)
+    results['operations']['playout'] = time_playout()
+    return results
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Returns a list of problems found by comparing results to baseline, both
+    returned by run_benchmark: different perft counts and every rate that is
+    more than threshold (a fraction) slower than in baseline.
+    """
+    problems = list(results['mismatches'])
+    rates = []
+    for name, backends in results['perft'].items():
+        for backend, result in backends.items():
+            old = baseline['perft'].get(name, {}).get(backend)
+            if old is None:
+                continue
+            size = min(len(old['counts']), len(result['counts']))
+            if old['counts'][:size] != result['counts'][:size]:
+                problems.append('{} {}: counts {} != baseline {}'.format(
+                    name, backend, result['counts'][:size],
+                    old['counts'][:size]))
+            if old['counts'] == result['counts']:
+                for key in ('nodes_per_second', 'make_move_nodes_per_second'):
+                    if key in old and key in result:
+                        rates.append(('perft {} {} {}'.format(name, backend, key),
+                                      result[key], old[key]))
+    for backend, operations in results['operations'].items():
+        for operation, rate in operations.items():
+            old = baseline['operations'].get(backend, {}).get(operation)
+            if old is not None:
+                rates.append(('{} {}'.format(backend, operation), rate, old))
+    for label, rate, old in rates:
+        if rate < old * (1 - threshold):
+            problems.append('{}: {:.0f}/s is {:.1%} slower than {:.0f}/s'.format(
+                label, rate, 1 - rate / old, old))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the Kuba perft benchmark.')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--positions', nargs='+', choices=list(POSITIONS))
+    parser.add_argument('--output', help='JSON file to write the results to')
+    parser.add_argument('--baseline', help='JSON file of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slowdown that counts as a regression (0.1 = 10%%)')
+    parser.add_argument('--skip-make-move', action='store_true',
+                        help='do not count with make_move as well')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.depth, args.positions,
+                            not args.skip_make_move)
+    for name, backends in results['perft'].items():
+        for backend, result in backends.items():
+            print('{:>10} {:>8} {} {:>10.0f} nodes/s'.format(
+                name, backend, result['counts'], result['nodes_per_second']))
+    for backend, operations in results['operations'].items():
+        for operation, rate in operations.items():
+            print('{:>8} {:>14} {:>12.0f} /s'.format(backend, operation, rate))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    problems = list(results['mismatches'])
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            problems = compare(results, json.load(baseline), args.threshold)
+    for problem in problems:
+        print('REGRESSION:', problem)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaPosition, a small immutable snapshot of a game of Kuba for
+#   keeping millions of positions in memory, e.g. as dictionary keys or in
+#   sets. Everything is packed into one Python int:
+#
+#       bits   0 - 97   the board, 2 bits per cell (0 empty, 1 W, 2 B, 3 R)
+#       bits  98 - 111  the row or column of the last move before it was made
+#       bits 112 - 119  the last move numbered like move_to_index, plus 1
+#       bits 120 - 123  the player to move and the winner, plus 1
+#       bits 124 - 131  the red marbles captured by each player
+#
+#   The board before the last move only differs from the board in the row or
+#   column that was pushed, so storing that one line is enough to rebuild it.
+
+from KubaGame import KubaBitBoard, KubaGame, index_to_move, move_to_index
+
+_BOARD_MASK = (1 << 98) - 1
+_LINE_SHIFT = 98
+_MOVE_SHIFT = 112
+_TURN_SHIFT = 120
+_WINNER_SHIFT = 122
+_CAPTURED_SHIFTS = (124, 128)
+_BYTE_LENGTH = 17
+_CODES = {' ': 0, 'W': 1, 'B': 2, 'R': 3}
+_MARBLES = (' ', 'W', 'B', 'R')
+
+# _SPREAD[bits] puts the 7 bits of one row 2 bits apart, _GATHER undoes it
+_SPREAD = [sum(((bits >> i) & 1) << (2 * i) for i in range(7))
+           for bits in range(128)]
+_GATHER = {spread: bits for bits, spread in enumerate(_SPREAD)}
+_LOW_BITS = sum(1 << (2 * i) for i in range(49))
+
+
+def _pack_board(white, black, red):
+    """Used internally to turn three bitboards into a 98 bit packed board"""
+    packed = 0
+    for row in range(7):
+        shift = 7 * row
+        packed |= (_SPREAD[(white >> shift) & 0x7F]
+                   | _SPREAD[(black >> shift) & 0x7F] << 1
+                   | _SPREAD[(red >> shift) & 0x7F] * 3) << (2 * shift)
+    return packed
+
+
+def _unpack_board(packed):
+    """Used internally to turn a packed board into (white, black, red)"""
+    low = packed & _LOW_BITS
+    high = (packed >> 1) & _LOW_BITS
+    bitboards = []
+    for cells in (low & ~high, high & ~low, low & high):
+        bits = 0
+        for row in range(7):
+            bits |= _GATHER[(cells >> (14 * row)) & 0x3FFF] << (7 * row)
+        bitboards.append(bits)
+    return tuple(bitboards)
+
+
+def _line_cells(move):
+    """
+    Used internally to return the cell indices of the row or column pushed by
+    the move numbered move
+    """
+    (row, col), direction = index_to_move(move)
+    if direction in ('L', 'R'):
+        return [7 * row + c for c in range(7)]
+    return [7 * r + col for r in range(7)]
+
+
+class KubaPosition:
+    """
+    Represents the state of a KubaGame without the player names, like the
+    tuple returned by KubaGame.get_state but packed into a single int. Players
+    are referred to by their index: 0 for the first player passed to KubaGame
+    and 1 for the second. Positions can not be changed, compare equal when
+    their games are in the same state and can be used as dictionary keys.
+    """
+    __slots__ = ('_bits',)
+
+    def __init__(self, bits):
+        """
+        Creates a position from the int returned by get_bits. Use from_game
+        to create a position for a game.
+        """
+        object.__setattr__(self, '_bits', bits)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('KubaPosition can not be changed')
+
+    def __eq__(self, other):
+        if not isinstance(other, KubaPosition):
+            return NotImplemented
+        return self._bits == other._bits
+
+    def __hash__(self):
+        return hash(self._bits)
+
+    def __repr__(self):
+        return 'KubaPosition({:#x})'.format(self._bits)
+
+    def __reduce__(self):
+        return KubaPosition, (self._bits,)
+
+    @classmethod
+    def from_game(cls, game):
+        """Returns the position of game, a KubaGame"""
+        return cls.from_state(game.get_state())
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Returns the position for a state tuple returned by KubaGame.get_state.
+        Raises ValueError if the board before the last move can not be stored,
+        which only happens if the state was not made by a game.
+        """
+        (white, black, red, old_white, old_black, old_red,
+         turn, winner, captured1, captured2, last_move) = state
+        board = _pack_board(white, black, red)
+        old_board = _pack_board(old_white, old_black, old_red)
+        bits = board
+        if last_move is not None:
+            move = move_to_index(((last_move[0], last_move[1]), last_move[2]))
+            line = 0
+            for index, cell in enumerate(_line_cells(move)):
+                code = (old_board >> (2 * cell)) & 3
+                line |= code << (2 * index)
+                old_board &= ~(3 << (2 * cell))
+                old_board |= ((board >> (2 * cell)) & 3) << (2 * cell)
+            bits |= line << _LINE_SHIFT | (move + 1) << _MOVE_SHIFT
+        if old_board != board:
+            raise ValueError('the old board differs by more than the last move')
+        bits |= (0 if turn is None else turn + 1) << _TURN_SHIFT
+        bits |= (0 if winner is None else winner + 1) << _WINNER_SHIFT
+        bits |= captured1 << _CAPTURED_SHIFTS[0]
+        bits |= captured2 << _CAPTURED_SHIFTS[1]
+        return cls(bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Returns the position stored in data by to_bytes"""
+        return cls(int.from_bytes(data, 'little'))
+
+    def to_bytes(self):
+        """Returns the position as 17 bytes"""
+        return self._bits.to_bytes(_BYTE_LENGTH, 'little')
+
+    def get_bits(self):
+        """Returns the int the whole position is packed into"""
+        return self._bits
+
+    def get_board_bits(self):
+        """Returns the 98 bit packed board, 2 bits per cell"""
+        return self._bits & _BOARD_MASK
+
+    def get_marble(self, coordinates):
+        """
+        Returns the marble ('W', 'B', 'R' or ' ') at coordinates (row, col)
+        """
+        row, col = coordinates
+        return _MARBLES[(self._bits >> (2 * (7 * row + col))) & 3]
+
+    def get_turn(self):
+        """Returns the index of the player to move, None before the first move"""
+        turn = (self._bits >> _TURN_SHIFT) & 3
+        return None if turn == 0 else turn - 1
+
+    def get_winner(self):
+        """Returns the index of the winner, None if there is none yet"""
+        winner = (self._bits >> _WINNER_SHIFT) & 3
+        return None if winner == 0 else winner - 1
+
+    def get_captured(self, player):
+        """Returns the red marbles captured by the player with index player"""
+        return (self._bits >> _CAPTURED_SHIFTS[player]) & 0xF
+
+    def get_last_move(self):
+        """
+        Returns the last move ((row, col), direction), None if the board is
+        still the starting board
+        """
+        move = (self._bits >> _MOVE_SHIFT) & 0xFF
+        return None if move == 0 else index_to_move(move - 1)
+
+    def get_old_board_bits(self):
+        """Returns the packed board before the last move"""
+        board = self._bits & _BOARD_MASK
+        move = (self._bits >> _MOVE_SHIFT) & 0xFF
+        if move == 0:
+            return board
+        line = self._bits >> _LINE_SHIFT
+        for index, cell in enumerate(_line_cells(move - 1)):
+            board &= ~(3 << (2 * cell))
+            board |= ((line >> (2 * index)) & 3) << (2 * cell)
+        return board
+
+    def to_state(self):
+        """Returns the position as a state tuple like KubaGame.get_state"""
+        last_move = self.get_last_move()
+        if last_move is not None:
+            (row, col), direction = last_move
+            last_move = (row, col, direction)
+        return (_unpack_board(self._bits & _BOARD_MASK)
+                + _unpack_board(self.get_old_board_bits())
+                + (self.get_turn(), self.get_winner(),
+                   self.get_captured(0), self.get_captured(1), last_move))
+
+    def to_game(self, player1_info, player2_info, bitboard=True):
+        """
+        Returns a new KubaGame in this position for the two players, passed
+        in the same order as to the game the position came from.
+        """
+        return KubaGame.from_state(player1_info, player2_info, self.to_state(),
+                                   bitboard=bitboard)
+
+    def to_board(self):
+        """Returns the board as a KubaBitBoard"""
+        board = KubaBitBoard.__new__(KubaBitBoard)
+        (board._white, board._black,
+         board._red) = _unpack_board(self._bits & _BOARD_MASK)
+        return board
@@ -0,0 +1,293 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains a compact binary file format for complete games of Kuba. A file
+#   starts with the bytes b'KUBA' and a version byte, followed by one record
+#   per game:
+#
+#       name length (1 byte), name (UTF-8), color (1 byte)   for player 1
+#       name length (1 byte), name (UTF-8), color (1 byte)   for player 2
+#       first mover (1 byte, 0 for player 1 or 1 for player 2)
+#       move count (varint, 7 bits per byte)
+#       moves (1 byte each, numbered like KubaGame.move_to_index)
+#
+#   KubaRecordWriter appends records as games finish and read_records is a
+#   generator that reads them one at a time, so files of any size can be
+#   scanned without loading them into memory.
+#
+#   Next to a record file the writer keeps an index file (the path with
+#   '.idx' added) holding the length of the record file when it was last
+#   flushed. After a crash only the records past that length are read again
+#   to find where the last complete record ends.
+
+import collections
+import struct
+import zlib
+
+from KubaGame import KubaGame, index_to_move, move_to_index
+
+MAGIC = b'KUBA'
+VERSION = 1
+INDEX_EVERY = 1 << 20   # Bytes written between updates of the index file
+_CHUNK = 1 << 16        # Bytes read from a record file at a time
+_INDEX = struct.Struct('<QI')   # Length, CRC-32 of the bytes just before it
+_CHECKED = 16           # Bytes before the length covered by the CRC-32
+
+
+class KubaRecord(collections.namedtuple(
+        'KubaRecord', ('player1_info', 'player2_info', 'first', 'moves'))):
+    """
+    A game read from a record file. player1_info and player2_info are the
+    (name, color) tuples the game was created with, first is the index (0 or
+    1) of the player who moved first and moves are the bytes of the moves.
+    """
+    __slots__ = ()
+
+    def get_moves(self):
+        """Returns the list of moves ((row, col), direction) of the game"""
+        return [index_to_move(index) for index in self.moves]
+
+    def replay(self, bitboard=True):
+        """
+        Generator that plays the game move by move with make_move and yields
+        (move, game) after every move. The same KubaGame is yielded every time.
+        Raises ValueError if a move in the record is not valid.
+        """
+        game = KubaGame(self.player1_info, self.player2_info, bitboard=bitboard)
+        names = [self.player1_info[0], self.player2_info[0]]
+        name = names[self.first]
+        for index in self.moves:
+            move = index_to_move(index)
+            if not game.make_move(name, *move):
+                raise ValueError('invalid move {} in record'.format(move))
+            yield move, game
+            name = game.get_current_turn()
+
+    def final_game(self, bitboard=True):
+        """Returns a KubaGame with every move of the record made"""
+        game = KubaGame(self.player1_info, self.player2_info, bitboard=bitboard)
+        for _, game in self.replay(bitboard):
+            pass
+        return game
+
+
+class KubaRecordWriter:
+    """
+    Appends games to a record file. Use it as a context manager or call close
+    when done so the last records are written out.
+    """
+    def __init__(self, path):
+        """
+        Opens the record file at path for appending. The file header is
+        written if the file is new or empty. A record at the end of the file
+        that was cut off by a crash is removed first, so the new records do
+        not start in the middle of it. Raises ValueError if the file is not a
+        record file.
+        """
+        end = _complete_length(path)
+        if end is not None:
+            with open(path, 'r+b') as record_file:
+                record_file.truncate(end)
+        self._path = path
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC + bytes((VERSION,)))
+        self._unindexed = 0     # Bytes written since the index was updated
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, player1_info, player2_info, moves, first=0):
+        """
+        Appends one game to the file.
+
+        :param player1_info: tuple (name, color) of player 1, like KubaGame.
+        :param player2_info: tuple (name, color) of player 2.
+        :param moves:        The moves of the game in order, either as moves
+                             ((row, col), direction) or as move numbers.
+        :param first:        Index (0 or 1) of the player who moved first.
+        """
+        data = bytearray()
+        for name, color in (player1_info, player2_info):
+            encoded = name.encode('utf-8')
+            if len(encoded) > 255:
+                raise ValueError('player name is too long: {!r}'.format(name))
+            data.append(len(encoded))
+            data += encoded
+            data += color.encode('ascii')
+        data.append(first)
+        moves = [move if isinstance(move, int) else move_to_index(move)
+                 for move in moves]
+        count = len(moves)
+        while count >= 0x80:
+            data.append(0x80 | (count & 0x7F))
+            count >>= 7
+        data.append(count)
+        data += bytes(moves)
+        self._file.write(data)
+        self._unindexed += len(data)
+        if self._unindexed >= INDEX_EVERY:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every record appended so far to the file and then updates the
+        index file
+        """
+        self._file.flush()
+        _write_index(self._path, self._file.tell())
+        self._unindexed = 0
+
+    def close(self):
+        """Writes out the remaining records and closes the file"""
+        if not self._file.closed:
+            self.flush()
+        self._file.close()
+
+
+def read_records(path):
+    """
+    Generator that yields a KubaRecord for every game in the record file at
+    path, reading the file as it goes. A record at the end of the file that
+    was cut off (for example by a crash while writing) is skipped. Raises
+    ValueError if the file is not a record file.
+    """
+    with open(path, 'rb') as record_file:
+        header = record_file.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC or len(header) <= len(MAGIC):
+            raise ValueError('{} is not a Kuba record file'.format(path))
+        if header[-1] != VERSION:
+            raise ValueError('unknown record file version {}'.format(header[-1]))
+        for record, _ in _read_records(record_file, len(header)):
+            yield record
+
+
+def _complete_length(path):
+    """
+    Used internally to return the length of the record file at path up to
+    the end of its last complete record, 0 if even the header was cut off, or
+    None if there is no file. Only the records past the length in the index
+    file are read, or every record if the index does not fit the file.
+    """
+    try:
+        record_file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with record_file:
+        header = record_file.read(len(MAGIC) + 1)
+        if len(header) < len(MAGIC) + 1 and MAGIC.startswith(header[:4]):
+            return 0
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a Kuba record file'.format(path))
+        if header[-1] != VERSION:
+            raise ValueError('unknown record file version {}'.format(header[-1]))
+        end = _read_index(path, record_file) or len(header)
+        record_file.seek(end)
+        for _, end in _read_records(record_file, end):
+            pass
+        return end
+
+
+def _index_path(path):
+    """Used internally to return the path of the index file of path"""
+    return path + '.idx'
+
+
+def _checksum(record_file, length):
+    """
+    Used internally to return the CRC-32 of the bytes of record_file just
+    before length, so an index left from another file is not trusted
+    """
+    start = max(length - _CHECKED, 0)
+    record_file.seek(start)
+    return zlib.crc32(record_file.read(length - start))
+
+
+def _write_index(path, length):
+    """Used internally to store length in the index file of path"""
+    with open(path, 'rb') as record_file:
+        checksum = _checksum(record_file, length)
+    with open(_index_path(path), 'wb') as index_file:
+        index_file.write(_INDEX.pack(length, checksum))
+
+
+def _read_index(path, record_file):
+    """
+    Used internally to return the length stored in the index file of path,
+    or None if there is no index or it does not match record_file
+    """
+    try:
+        with open(_index_path(path), 'rb') as index_file:
+            data = index_file.read()
+    except FileNotFoundError:
+        return None
+    if len(data) != _INDEX.size:
+        return None
+    length, checksum = _INDEX.unpack(data)
+    record_file.seek(0, 2)
+    if length > record_file.tell() or \
+            _checksum(record_file, length) != checksum:
+        return None
+    return length
+
+
+def _read_records(record_file, position):
+    """
+    Used internally to read the records of record_file from position, where
+    record_file must be, in chunks of _CHUNK bytes. Generator that yields
+    (record, end) for every complete record, end being the position just
+    after it.
+    """
+    data = b''
+    offset = 0      # Index in data of the next record
+    while True:
+        parsed = _parse_record(data, offset)
+        if parsed is None:
+            chunk = record_file.read(_CHUNK)
+            if not chunk:
+                return      # The end of the file or a cut off record
+            position += offset
+            data = data[offset:] + chunk
+            offset = 0
+            continue
+        record, offset = parsed
+        yield record, position + offset
+
+
+def _parse_record(data, offset):
+    """
+    Used internally to parse the record starting at offset in data. Returns
+    (record, offset just after it) or None if data ends before the record.
+    """
+    players = []
+    for _ in range(2):
+        if offset >= len(data):
+            return None
+        end = offset + data[offset] + 2
+        if end > len(data):
+            return None
+        players.append((data[offset + 1:end - 1].decode('utf-8'),
+                        chr(data[end - 1])))
+        offset = end
+    if offset >= len(data):
+        return None
+    first = data[offset]
+    offset += 1
+    count, shift = 0, 0
+    while True:
+        if offset >= len(data):
+            return None
+        byte = data[offset]
+        offset += 1
+        count |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            break
+    end = offset + count
+    if end > len(data):
+        return None
+    return KubaRecord(players[0], players[1], first, data[offset:end]), end
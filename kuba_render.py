@@ -0,0 +1,229 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Draws Kuba boards on a terminal. render_board builds the same picture as
+#   KubaBoard.display as one string from cell strings that are made once, so
+#   a board is a single write instead of one print per cell.
+#
+#   For watching games live, KubaBoardView draws a board at a fixed place on
+#   the screen: the first frame is drawn in full and after that only cursor
+#   moves and the cells that changed are sent. KubaTiledView lays out many
+#   views on one terminal and collects all of their changes into a single
+#   write per refresh.
+#
+#   Usage: python kuba_render.py --games 24 --fps 10
+#          watches random games being played.
+
+import argparse
+import random
+import shutil
+import sys
+import time
+
+BLACK_BACKGROUND = '\33[40m'
+WHITE_BACKGROUND = '\33[47m'
+RED_BACKGROUND = '\33[41m'
+RESET = '\033[0m'
+CLEAR_SCREEN = '\033[2J'
+
+FRAME_WIDTH = 20        # Columns of a colored frame, see render_board
+FRAME_HEIGHT = 11       # Lines of a colored frame
+
+_PLAIN_CELLS = {'W': 'W', 'B': 'B', 'R': 'R', ' ': ' '}
+_COLORED_CELLS = {
+    'W': WHITE_BACKGROUND + 'W' + RESET,
+    'B': BLACK_BACKGROUND + 'B' + RESET,
+    'R': RED_BACKGROUND + 'R' + RESET,
+    ' ': ' ',
+}
+_RULE = '   ' + '-' * 16
+_BOX_HEADER = '  | 0 1 2 3 4 5 6 |'
+_PLAIN_HEADER = '  0 1 2 3 4 5 6'
+
+
+def _grid(board):
+    """Used internally to return the 7x7 grid of a board or of a grid"""
+    return getattr(board, 'board', board)
+
+
+def _frame_lines(grid, cells):
+    """
+    Used internally to return the lines of the boxed frame of grid drawn with
+    the cell strings cells
+    """
+    lines = [_RULE, _BOX_HEADER, _RULE]
+    for index, row in enumerate(grid):
+        lines.append('{} | {} {} {} {} {} {} {} | '.format(
+            index, *[cells[marble] for marble in row]))
+    lines.append(_RULE)
+    return lines
+
+
+def render_board(board, colored=False):
+    """
+    Returns the picture of board (a KubaBoard, KubaBitBoard or 7x7 grid) that
+    KubaBoard.display prints, as one string ending with a newline
+    """
+    grid = _grid(board)
+    if colored:
+        lines = _frame_lines(grid, _COLORED_CELLS)
+    else:
+        lines = [_PLAIN_HEADER]
+        for index, row in enumerate(grid):
+            lines.append('{} {} {} {} {} {} {} {} '.format(index, *row))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def _move_cursor(line, column):
+    """Used internally to return the escape code that moves the cursor"""
+    return '\033[{};{}H'.format(line + 1, column + 1)
+
+
+class KubaBoardView:
+    """
+    Draws a board in a box with a title line above it at a fixed place of
+    the terminal. Every draw returns only what changed since the last one.
+    """
+    def __init__(self, top=0, left=0, colored=True):
+        """
+        Creates a view whose title line is at line top and column left of the
+        terminal, both counted from 0
+        """
+        self._top = top
+        self._left = left
+        self._cells = _COLORED_CELLS if colored else _PLAIN_CELLS
+        self._last = None       # Rows drawn last, None to draw everything
+        self._title = None
+
+    def invalidate(self):
+        """Makes the next draw draw everything, e.g. after a clear screen"""
+        self._last = None
+        self._title = None
+
+    def draw(self, board, title=''):
+        """
+        Returns the escape codes and text that bring the view up to date with
+        board (a KubaBoard, KubaBitBoard or 7x7 grid) and title, which is cut
+        to the width of the frame. Returns '' if nothing changed.
+        """
+        grid = _grid(board)
+        top, left, cells = self._top, self._left, self._cells
+        parts = []
+        title = title[:FRAME_WIDTH].ljust(FRAME_WIDTH)
+        if title != self._title:
+            parts.append(_move_cursor(top, left) + title)
+            self._title = title
+        last = self._last
+        if last is None:
+            for index, line in enumerate(_frame_lines(grid, cells), 1):
+                parts.append(_move_cursor(top + index, left) + line)
+        else:
+            # A push changes a single row or column, so most rows are skipped
+            # after one comparison
+            for row in range(7):
+                new_row, old_row = grid[row], last[row]
+                if new_row == old_row:
+                    continue
+                for col in range(7):
+                    if new_row[col] != old_row[col]:
+                        parts.append(
+                            _move_cursor(top + 4 + row, left + 4 + 2 * col)
+                            + cells[new_row[col]])
+        self._last = [list(row) for row in grid]
+        return ''.join(parts)
+
+
+class KubaTiledView:
+    """
+    Shows count boards side by side and in rows on one terminal. update
+    collects the changes of each board and flush writes them all at once.
+    """
+    def __init__(self, count, columns=None, colored=True, gap=2):
+        """
+        Creates views for count boards.
+
+        :param columns: Boards per row. Defaults to as many as fit in the
+                        width of the terminal.
+        :param gap:     Empty columns between two boards.
+        """
+        if columns is None:
+            width = shutil.get_terminal_size().columns
+            columns = max(1, (width + gap) // (FRAME_WIDTH + gap))
+        self._views = [
+            KubaBoardView(top=index // columns * (FRAME_HEIGHT + 1),
+                          left=index % columns * (FRAME_WIDTH + gap),
+                          colored=colored)
+            for index in range(count)]
+        self._height = -(-count // columns) * (FRAME_HEIGHT + 1)
+        self._pending = [CLEAR_SCREEN]
+
+    def update(self, index, board, title=''):
+        """Queues the changes of the board with number index"""
+        changes = self._views[index].draw(board, title)
+        if changes:
+            self._pending.append(changes)
+
+    def clear(self):
+        """Makes the next flush clear the screen and draw every board again"""
+        self._pending = [CLEAR_SCREEN]
+        for view in self._views:
+            view.invalidate()
+
+    def flush(self, output=None):
+        """
+        Writes everything queued to output (standard output by default) in
+        one write, leaving the cursor below the boards. Returns the number of
+        characters written.
+        """
+        if not self._pending:
+            return 0
+        if output is None:
+            output = sys.stdout
+        self._pending.append(_move_cursor(self._height, 0))
+        data = ''.join(self._pending)
+        self._pending = []
+        output.write(data)
+        output.flush()
+        return len(data)
+
+
+def main():
+    from KubaGame import KubaGame      # Only needed to play the games
+
+    parser = argparse.ArgumentParser(
+        description='Watches random games of Kuba being played.')
+    parser.add_argument('--games', type=int, default=12)
+    parser.add_argument('--fps', type=float, default=10,
+                        help='screen refreshes per second')
+    parser.add_argument('--moves', type=int, default=200,
+                        help='moves after which a game starts over')
+    args = parser.parse_args()
+    rand = random.Random(0)
+    tiles = KubaTiledView(args.games)
+
+    def new_game():
+        return KubaGame(('white', 'W'), ('black', 'B'), bitboard=True), 0
+
+    games = [new_game() for _ in range(args.games)]
+    try:
+        while True:
+            for index, (game, moves) in enumerate(games):
+                name = game.get_current_turn() or 'white'
+                legal = game.legal_moves(name)
+                if not legal or game.get_winner() or moves >= args.moves:
+                    game, moves = games[index] = new_game()
+                    continue
+                game.make_move(name, *rand.choice(legal))
+                games[index] = (game, moves + 1)
+                tiles.update(index, game._board, '#{} move {} {}-{}'.format(
+                    index, moves + 1, game.get_captured('white'),
+                    game.get_captured('black')))
+            tiles.flush()
+            time.sleep(1 / args.fps)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
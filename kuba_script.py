@@ -0,0 +1,182 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Replays move scripts of Kuba without a board on the screen, used by
+#   play_kuba.py --batch. A script holds any number of games, each started by
+#   a game line with the two players followed by one move per line in the
+#   same order play_kuba.py asks for them:
+#
+#       # Comments and empty lines are skipped
+#       game ann W bob B
+#       ann 6 5 F
+#       bob 6 0 R
+#       end
+#
+#   A game ends at end, at the next game line or at the end of the stream.
+#   Moves are made with make_move on a bitboard game; lines that can not be
+#   read or that make_move rejects are reported with their line number and
+#   the reason (see kuba_stats), and the replay goes on with the next line.
+
+import collections
+import json
+import sys
+
+from KubaGame import KubaGame
+
+
+class KubaScriptResult(collections.namedtuple(
+        'KubaScriptResult', ('source', 'line', 'players', 'moves', 'invalid',
+                             'winner', 'captured', 'marbles'))):
+    """
+    The result of replaying one game of a script. source and line tell where
+    the game starts, players is the list of (name, color), moves the number
+    of moves made and invalid a list of (line number, text, reason) for the
+    lines that were not made. winner is the name of the winner or None,
+    captured {name: red marbles captured} and marbles the (W, B, R) counts at
+    the end. Lines outside of any game are reported in a result whose
+    players is None.
+    """
+    __slots__ = ()
+
+    def to_dict(self):
+        """Returns the result as a dictionary that can be written as JSON"""
+        result = self._asdict()
+        result['players'] = (None if self.players is None
+                             else [list(player) for player in self.players])
+        result['invalid'] = [
+            {'line': number, 'text': text, 'reason': reason}
+            for number, text, reason in self.invalid]
+        result['marbles'] = (None if self.marbles is None
+                             else list(self.marbles))
+        return result
+
+
+def _parse_move(fields, names):
+    """
+    Used internally to return (name, (row, col), direction) from the fields
+    of a move line. Raises ValueError with the reason if it can not be read.
+    """
+    if len(fields) != 4:
+        raise ValueError('expected: name row col direction')
+    name, row, col, direction = fields
+    if name not in names:
+        raise ValueError('unknown player {}'.format(name))
+    try:
+        coordinates = (int(row), int(col))
+    except ValueError:
+        raise ValueError('coordinates are not integers') from None
+    return name, coordinates, direction.upper()
+
+
+def replay_script(lines, source='<stdin>'):
+    """
+    Generator that replays the games of a script, given as an iterable of
+    lines such as an open file, and yields a KubaScriptResult as each game
+    ends. Only one game is kept in memory at a time.
+    """
+    game = start = None
+    invalid = []
+    moves = 0
+    for number, text in enumerate(lines, 1):
+        text = text.strip()
+        fields = text.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        keyword = fields[0].lower()
+        if keyword in ('game', 'end'):
+            if game is not None or invalid:
+                yield _result(source, start, game, moves, invalid)
+            game, invalid, moves = None, [], 0
+            if keyword == 'end':
+                continue
+            start = number
+            if (len(fields) != 5 or {fields[2].upper(), fields[4].upper()}
+                    != {'W', 'B'} or fields[1] == fields[3]):
+                invalid.append((number, text, 'expected: game name W|B '
+                                'name W|B with different names and colors'))
+                continue
+            game = KubaGame((fields[1], fields[2].upper()),
+                            (fields[3], fields[4].upper()), bitboard=True)
+            continue
+
+        if game is None:
+            if not invalid:
+                start = number
+            invalid.append((number, text, 'move outside of a game'))
+            continue
+        try:
+            name, coordinates, direction = _parse_move(
+                fields, dict(game.get_players()))
+        except ValueError as error:
+            invalid.append((number, text, str(error)))
+            continue
+        if game.make_move(name, coordinates, direction):
+            moves += 1
+        else:
+            # make_move changes nothing but the turn before the first move,
+            # so checking again gives the reason it was rejected
+            reason, = game.validate_moves(
+                [(coordinates[0], coordinates[1], direction)], name)
+            invalid.append((number, text, reason))
+    if game is not None or invalid:
+        yield _result(source, start, game, moves, invalid)
+
+
+def _result(source, start, game, moves, invalid):
+    """Used internally to return the KubaScriptResult of a game"""
+    if game is None:
+        return KubaScriptResult(source, start, None, moves, invalid, None,
+                                None, None)
+    players = game.get_players()
+    return KubaScriptResult(
+        source, start, players, moves, invalid, game.get_winner(),
+        {name: game.get_captured(name) for name, _ in players},
+        game.get_marble_count())
+
+
+def format_result(result):
+    """Returns a short human readable summary of a KubaScriptResult"""
+    if result.players is None:
+        header = '{}:{}: lines outside of a game'.format(result.source,
+                                                         result.line)
+    else:
+        (name1, color1), (name2, color2) = result.players
+        header = ('{}:{}: {} ({}) vs {} ({}), {} moves, winner {}, captured '
+                  '{}-{}').format(
+            result.source, result.line, name1, color1, name2, color2,
+            result.moves, result.winner or 'none', result.captured[name1],
+            result.captured[name2])
+    lines = [header]
+    for number, text, reason in result.invalid:
+        lines.append('  line {}: {!r}: {}'.format(number, text, reason))
+    return '\n'.join(lines)
+
+
+def run_scripts(paths, output=sys.stdout, as_json=False):
+    """
+    Replays the scripts at paths ('-' is standard input) and writes a summary
+    of every game to output, or one JSON object per game if as_json. Returns
+    the number of invalid lines.
+    """
+    invalid = 0
+    for path in paths:
+        if path == '-':
+            results = replay_script(sys.stdin, '<stdin>')
+            invalid += _write_results(results, output, as_json)
+        else:
+            with open(path) as script:
+                invalid += _write_results(replay_script(script, path),
+                                          output, as_json)
+    return invalid
+
+
+def _write_results(results, output, as_json):
+    """Used internally to write results and return their invalid lines"""
+    invalid = 0
+    for result in results:
+        if as_json:
+            output.write(json.dumps(result.to_dict()) + '\n')
+        else:
+            output.write(format_result(result) + '\n')
+        invalid += len(result.invalid)
+    return invalid
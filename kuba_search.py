@@ -0,0 +1,334 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaSearchPlayer, a computer opponent for KubaGame. It picks a
+#   move with a negamax search with alpha-beta pruning, iterative deepening, a
+#   transposition table and move ordering, and never thinks for longer than a
+#   fixed number of milliseconds per move. Positions in an endgame tablebase
+#   (see kuba_tablebase.py) are looked up instead of searched, and symmetric
+#   positions can share transposition table entries (see kuba_symmetry.py).
+#   Opening moves can be taken from an opening book (see kuba_book.py). The
+#   transposition table can be shared between processes (see
+#   kuba_shared_table.py).
+
+import random
+import time
+
+from kuba_symmetry import IDENTITY, canonical_position, inverse, transform_move
+
+WIN_SCORE = 100000      # Score of a won position, less the plies to get there
+_WON = WIN_SCORE // 2   # Scores past this are won or lost positions
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the time for the move has run out"""
+
+
+class KubaSearchPlayer:
+    """
+    A computer player for KubaGame. The search runs on a private copy of the
+    game using a KubaBitBoard and in place push/pop, so the game passed to
+    choose_move is never changed. Statistics about the last search are kept
+    and can be read with get_stats.
+    """
+    def __init__(self, time_limit_ms=1000, max_depth=64, table_size=1 << 20,
+                 tablebase=None, symmetry=False, book=None, book_min_games=1,
+                 table=None, seed=None):
+        """
+        Creates a new search player.
+
+        :param time_limit_ms: Milliseconds the player may think about a move.
+        :param max_depth:     Deepest iteration of the iterative deepening.
+        :param table_size:    Maximum number of positions kept in the
+                              transposition table before it is cleared. Not
+                              used with table.
+        :param tablebase:     A KubaTablebase to look up endgame positions in.
+        :param symmetry:      If True, positions that are the same up to
+                              turning, mirroring or swapping colors share one
+                              transposition table entry. Each key takes longer
+                              to work out but the table holds several times
+                              more positions.
+        :param book:          A KubaOpeningBook to take moves from while the
+                              position is in the book.
+        :param book_min_games: Book moves played in fewer games are ignored.
+        :param table:         A KubaSharedTable to use as the transposition
+                              table instead of a dictionary of this player.
+        :param seed:          If given, moves that are otherwise equal are
+                              searched in an order decided by seed, so
+                              searches sharing a table look at different moves
+                              first.
+        """
+        self._time_limit_ms = time_limit_ms
+        self._max_depth = max_depth
+        self._table_size = table_size
+        self._tablebase = tablebase
+        self._symmetry = symmetry
+        self._book = book
+        self._book_min_games = book_min_games
+        # position key -> (depth, score, flag, move)
+        self._table = {} if table is None else table
+        self._shared_table = table is not None
+        self._random = None if seed is None else random.Random(seed)
+        self._history = {}      # move -> how often it caused a cutoff
+        self._stats = {}
+        self._deadline = 0
+        self._nodes = 0
+        self._probes = 0
+        self._hits = 0
+        self._tablebase_hits = 0
+
+    def get_stats(self):
+        """
+        Returns a dictionary of statistics about the last call to choose_move:
+        nodes searched, elapsed milliseconds, nodes per second, the deepest
+        completed iteration, its score, the transposition table hit rate and
+        the number of positions looked up in the tablebase and whether the
+        move came from the opening book.
+        """
+        return dict(self._stats)
+
+    def choose_move(self, game, player_name=None):
+        """
+        Returns the best move ((row, col), direction) found for player_name in
+        the time limit, or None if there are no legal moves.
+
+        :param game:        The KubaGame to find a move in. It is not changed.
+        :param player_name: Defaults to the player whose turn it is. Has to be
+                            given before the first move of the game.
+        """
+        start = time.perf_counter()
+        self._deadline = start + self._time_limit_ms / 1000
+        self._nodes = self._probes = self._hits = self._tablebase_hits = 0
+        if not self._shared_table and len(self._table) > self._table_size:
+            self._table.clear()
+
+        if player_name is None:
+            player_name = game.get_current_turn()
+        moves = game.legal_moves(player_name)
+        best_move, best_score, depth_reached = None, 0, 0
+        result = book_move = None
+        if moves and self._book is not None:
+            book_move = self._book.best_move(game, self._book_min_games,
+                                            player_name)
+            if book_move not in moves:
+                book_move = None
+        if moves and book_move is None and self._tablebase is not None:
+            result = self._tablebase.probe(game)
+        if book_move is not None:
+            best_move = book_move       # Played without thinking
+        elif result is not None:
+            # The game is solved, so there is nothing to search
+            self._tablebase_hits += 1
+            best_move = result.move
+            best_score = self._tablebase_score(result, 0)
+        elif moves:
+            best_move = moves[0]
+            search_game = game.copy(bitboard=True)
+            for depth in range(1, self._max_depth + 1):
+                try:
+                    score, move = self._search_root(search_game, moves, depth)
+                except _SearchTimeout:
+                    break
+                best_move, best_score, depth_reached = move, score, depth
+                if abs(score) >= WIN_SCORE - self._max_depth:
+                    break       # A forced win or loss was found
+
+        elapsed = time.perf_counter() - start
+        probes = max(self._probes, 1)
+        self._stats = {
+            'nodes': self._nodes,
+            'elapsed_ms': elapsed * 1000,
+            'nodes_per_second': self._nodes / elapsed if elapsed else 0.0,
+            'depth': depth_reached,
+            'score': best_score,
+            'tt_probes': self._probes,
+            'tt_hits': self._hits,
+            'tt_hit_rate': self._hits / probes,
+            'tablebase_hits': self._tablebase_hits,
+            'book': book_move is not None,
+        }
+        return best_move
+
+    def _search_root(self, game, moves, depth):
+        """
+        Used internally to search every move at the root to depth and return
+        (score, best move). The best move of the last iteration goes first.
+        """
+        key, transform = self._position_key(game)
+        entry = self._table.get(key)
+        moves = self._order_moves(
+            moves, self._table_move(entry, transform) if entry else None)
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move = moves[0]
+        for move in moves:
+            game.push(move)
+            try:
+                score = -self._negamax(game, depth - 1, -beta, -alpha, 1)
+            finally:
+                game.pop()
+            if score > alpha:
+                alpha, best_move = score, move
+        self._table[key] = (depth, self._to_table(alpha, 0), 0,
+                            self._stored_move(best_move, transform))
+        return alpha, best_move
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """
+        Used internally to return the score of game for the player whose turn
+        it is, searched depth plies deep with an alpha-beta window.
+        """
+        self._nodes += 1
+        if not self._nodes & 63 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+        if game.get_winner() is not None:
+            return ply - WIN_SCORE      # The player who just moved has won
+        if self._tablebase is not None:
+            result = self._tablebase.probe(game)
+            if result is not None:
+                self._tablebase_hits += 1
+                return self._tablebase_score(result, ply)
+
+        key, transform = self._position_key(game)
+        self._probes += 1
+        entry = self._table.get(key)
+        table_move = None
+        if entry is not None:
+            self._hits += 1
+            entry_depth, score, flag, _ = entry
+            score = self._from_table(score, ply)
+            table_move = self._table_move(entry, transform)
+            if entry_depth >= depth:
+                if flag == 0:
+                    return score
+                if flag < 0 and score <= alpha:
+                    return score
+                if flag > 0 and score >= beta:
+                    return score
+
+        if depth == 0:
+            return self._evaluate(game)
+        moves = game.legal_moves()
+        if not moves:
+            return ply - WIN_SCORE      # A player with no moves has lost
+
+        original_alpha = alpha
+        best_score, best_move = -WIN_SCORE - 1, None
+        for move in self._order_moves(moves, table_move):
+            game.push(move)
+            try:
+                score = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.pop()
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self._history[move] = self._history.get(move, 0) + depth * depth
+                break
+
+        if best_score <= original_alpha:
+            flag = -1           # Upper bound
+        elif best_score >= beta:
+            flag = 1            # Lower bound
+        else:
+            flag = 0            # Exact
+        self._table[key] = (depth, self._to_table(best_score, ply), flag,
+                            self._stored_move(best_move, transform))
+        return best_score
+
+    def _position_key(self, game):
+        """
+        Used internally to return (key, transform) of game for the
+        transposition table. Without symmetry the key is position_key and the
+        transform is IDENTITY. With it the key is the same for all symmetric
+        positions and moves in the table are stored as moves of the canonical
+        position, which transform turns game into.
+        """
+        if not self._symmetry:
+            return game.position_key(), IDENTITY
+        position, transform = canonical_position(game)
+        return position.get_bits(), transform
+
+    @staticmethod
+    def _stored_move(move, transform):
+        """Used internally to turn a move of game into a move for the table"""
+        if transform == IDENTITY or move is None:
+            return move
+        return transform_move(move, transform)
+
+    @staticmethod
+    def _table_move(entry, transform):
+        """Used internally to turn the move of a table entry into a move"""
+        move = entry[3]
+        if transform == IDENTITY or move is None:
+            return move
+        return transform_move(move, inverse(transform))
+
+    @staticmethod
+    def _to_table(score, ply):
+        """
+        Used internally to turn a score of a position ply plies from the root
+        into a score for the table. Won and lost scores count the plies from
+        the position instead of from the root, so they stay right when the
+        position is reached at another ply.
+        """
+        if score > _WON:
+            return score + ply
+        if score < -_WON:
+            return score - ply
+        return score
+
+    @staticmethod
+    def _from_table(score, ply):
+        """
+        Used internally to turn a score from the table into a score of a
+        position ply plies from the root, the reverse of _to_table
+        """
+        if score > _WON:
+            return score - ply
+        if score < -_WON:
+            return score + ply
+        return score
+
+    @staticmethod
+    def _tablebase_score(result, ply):
+        """
+        Used internally to turn a KubaTablebaseResult of a position ply plies
+        from the root into a score on the same scale as won positions.
+        """
+        if result.score == 0:
+            return 0
+        if result.score > 0:
+            return WIN_SCORE - ply - result.plies
+        return ply + result.plies - WIN_SCORE
+
+    def _order_moves(self, moves, first=None):
+        """
+        Used internally to sort moves so the move from the transposition
+        table comes first, followed by moves that caused the most cutoffs.
+        """
+        history = self._history
+        if self._random is not None:
+            moves = list(moves)
+            self._random.shuffle(moves)
+        ordered = sorted(moves, key=lambda move: -history.get(move, 0))
+        if first is not None and first in ordered:
+            ordered.remove(first)
+            ordered.insert(0, first)
+        return ordered
+
+    def _evaluate(self, game):
+        """
+        Used internally to score a position for the player whose turn it is
+        from captured red marbles and the marbles left for each player.
+        """
+        name = game.get_current_turn()
+        opponent = game.get_opponent(name)
+        white, black, _ = game.get_marble_count()
+        if game.get_color(name) == 'W':
+            marbles = white - black
+        else:
+            marbles = black - white
+        captured = game.get_captured(name) - game.get_captured(opponent)
+        return 100 * captured + 60 * marbles
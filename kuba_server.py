@@ -0,0 +1,364 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaServer, an asyncio server that hosts many games of Kuba at
+#   once in a single process. Clients connect over TCP and send one JSON
+#   object per line; every request gets one JSON object per line back:
+#
+#       {"id": 1, "op": "create", "players": [["ann", "W"], ["bob", "B"]]}
+#       {"id": 1, "ok": true, "game": 1, "state": {...}}
+#
+#   Requests (besides id and op):
+#       create       players: two [name, color] pairs
+#       move         game, player, row, col, direction
+#       state        game
+#       subscribe    game, then an {"event": "update"} is pushed after every
+#                    move of the game
+#       unsubscribe  game
+#       close        game, removes the game; its spectators get an
+#                    {"event": "closed"}
+#       hint         game, optionally player (defaults to the player to
+#                    move); answered with "move": [row, col, direction] or
+#                    null by the hint service (see kuba_hints.py)
+#
+#   Failed requests get {"id": ..., "ok": false, "error": "..."}. Every
+#   connection has a bounded queue of outgoing messages. A client that stops
+#   reading stops having its requests read, and updates that do not fit in a
+#   spectator's queue are skipped (each update has the full state). A game
+#   that has a winner stays until it is closed or until finished_ttl seconds
+#   after the winning move, when it is removed like by close.
+#
+#   Usage: python kuba_server.py [--host 127.0.0.1] [--port 8765]
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+
+from KubaGame import KubaGame
+
+DEFAULT_PORT = 8765
+FINISHED_TTL = 600      # Seconds a game with a winner is kept if not closed
+
+
+def game_state(game, moves):
+    """
+    Returns the state of game as a dictionary that can be sent as JSON, moves
+    being the number of moves made so far.
+    """
+    turn = game.get_current_turn()
+    return {
+        'board': [''.join(row) for row in game._board.board],
+        'players': [list(info) for info in game.get_players()],
+        'turn': turn,
+        'winner': game.get_winner(),
+        'captured': {name: game.get_captured(name)
+                     for name, _ in game.get_players()},
+        'marbles': list(game.get_marble_count()),
+        'moves': moves,
+        'legal_moves': [[row, col, direction] for (row, col), direction
+                        in game.legal_moves(turn)] if turn else [],
+    }
+
+
+class _HostedGame:
+    """A game on the server with its spectators"""
+    __slots__ = ('game', 'moves', 'subscribers')
+
+    def __init__(self, game):
+        self.game = game
+        self.moves = 0
+        self.subscribers = set()        # _Connection objects
+
+
+class _Connection:
+    """A client connection and the queue of messages waiting to be sent"""
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.subscriptions = set()      # Game ids
+        self.dropped = 0                # Updates skipped because of a full queue
+
+    async def send(self, message):
+        """Waits until there is room in the queue, then queues message"""
+        await self.queue.put(message)
+
+    def try_send(self, message):
+        """Queues message if there is room and returns whether there was"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+
+class KubaServer:
+    """
+    Represents a server hosting any number of games of Kuba for any number of
+    clients. All requests are handled on one event loop and a move is made
+    and sent to the spectators without awaiting anything, so no lock is
+    needed for clients to see every game change in the same order.
+    """
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, queue_size=256,
+                 hints=None, finished_ttl=FINISHED_TTL):
+        """
+        Creates a new server. It does not listen until start is awaited.
+
+        :param host:       Address to listen on.
+        :param port:       Port to listen on, 0 picks a free port.
+        :param queue_size: Messages that may wait to be sent to one client.
+        :param hints:      A started KubaHintService that answers hint
+                           requests. Without it they fail.
+        :param finished_ttl: Seconds a game with a winner is kept after the
+                           winning move unless it is closed first.
+        """
+        self._host = host
+        self._port = port
+        self._queue_size = queue_size
+        self._hints = hints
+        self._games = {}                # game id -> _HostedGame
+        self._finished_ttl = finished_ttl
+        self._finished = collections.deque()    # (expiry time, game id)
+        self._game_ids = itertools.count(1)
+        self._server = None
+        self._connections = set()
+        self._tasks = set()             # Tasks serving the connected clients
+        self._handlers = {
+            'create': self._create,
+            'move': self._move,
+            'state': self._state,
+            'subscribe': self._subscribe,
+            'unsubscribe': self._unsubscribe,
+            'close': self._close,
+            'hint': self._hint,
+        }
+
+    async def start(self):
+        """Starts listening for clients"""
+        self._server = await asyncio.start_server(
+            self._serve_client, self._host, self._port)
+        self._port = self._server.sockets[0].getsockname()[1]
+
+    def get_port(self):
+        """Returns the port the server listens on"""
+        return self._port
+
+    def get_game_count(self):
+        """Returns the number of games on the server"""
+        return len(self._games)
+
+    async def serve_forever(self):
+        """Starts the server if needed and serves clients until cancelled"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stops listening and disconnects every client"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for connection in list(self._connections):
+            connection.writer.close()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _serve_client(self, reader, writer):
+        """
+        Used internally to read the requests of one client and answer them.
+        A second task sends the queued messages.
+        """
+        connection = _Connection(writer, self._queue_size)
+        self._connections.add(connection)
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        sender = asyncio.ensure_future(self._send_messages(connection))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break       # Lost connection or a line over the limit
+                if not line:
+                    break
+                await connection.send(await self._answer(connection, line))
+        finally:
+            for game_id in connection.subscriptions:
+                hosted = self._games.get(game_id)
+                if hosted is not None:
+                    hosted.subscribers.discard(connection)
+            self._connections.discard(connection)
+            try:
+                connection.queue.put_nowait(None)   # Send what is queued
+            except asyncio.QueueFull:
+                sender.cancel()                     # The client is not reading
+            try:
+                await sender
+            except asyncio.CancelledError:
+                pass
+            self._tasks.discard(task)
+
+    async def _send_messages(self, connection):
+        """
+        Used internally to write the queued messages of a connection until
+        None is queued. Waits for the socket to drain so a slow client only
+        fills its own queue.
+        """
+        writer = connection.writer
+        try:
+            while True:
+                message = await connection.queue.get()
+                if message is None:
+                    break
+                writer.write(json.dumps(message).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, connection, line):
+        """Used internally to return the response to one request line"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'id': None, 'ok': False, 'error': 'invalid JSON'}
+        if not isinstance(request, dict):
+            return {'id': None, 'ok': False, 'error': 'request is not an object'}
+        self._expire_finished()
+        op = request.get('op')
+        handler = self._handlers.get(op) if isinstance(op, str) else None
+        if handler is None:
+            response = {'ok': False, 'error': 'unknown op'}
+        else:
+            try:
+                response = await handler(connection, request)
+            except (KeyError, TypeError, ValueError) as error:
+                response = {'ok': False, 'error': 'bad request: {}'.format(error)}
+        response['id'] = request.get('id')
+        return response
+
+    def _get_game(self, request):
+        """Used internally to return the hosted game of a request"""
+        hosted = self._games.get(request['game'])
+        if hosted is None:
+            raise KeyError('no game {}'.format(request['game']))
+        return hosted
+
+    async def _create(self, connection, request):
+        """Used internally to create a game"""
+        (name1, color1), (name2, color2) = request['players']
+        if {color1, color2} != {'W', 'B'} or name1 == name2:
+            raise ValueError('players need different names and colors W and B')
+        game = KubaGame((str(name1), color1), (str(name2), color2),
+                        bitboard=True)
+        game_id = next(self._game_ids)
+        self._games[game_id] = _HostedGame(game)
+        return {'ok': True, 'game': game_id, 'state': game_state(game, 0)}
+
+    async def _move(self, connection, request):
+        """
+        Used internally to make a move and push the new state to the
+        spectators of the game
+        """
+        hosted = self._get_game(request)
+        player = request['player']
+        if player not in dict(hosted.game.get_players()):
+            raise ValueError('no player {}'.format(player))
+        made = hosted.game.make_move(
+            player, (int(request['row']), int(request['col'])),
+            str(request['direction']))
+        if made:
+            hosted.moves += 1
+        state = game_state(hosted.game, hosted.moves)
+        if made:
+            update = {'event': 'update', 'game': request['game'],
+                      'state': state}
+            for subscriber in hosted.subscribers:
+                subscriber.try_send(update)
+            if hosted.game.get_winner() is not None:
+                self._finished.append((
+                    asyncio.get_running_loop().time() + self._finished_ttl,
+                    request['game']))
+        return {'ok': True, 'made': made, 'state': state}
+
+    async def _state(self, connection, request):
+        """Used internally to return the state of a game"""
+        hosted = self._get_game(request)
+        return {'ok': True, 'state': game_state(hosted.game, hosted.moves)}
+
+    async def _subscribe(self, connection, request):
+        """Used internally to send the updates of a game to connection"""
+        hosted = self._get_game(request)
+        hosted.subscribers.add(connection)
+        connection.subscriptions.add(request['game'])
+        return {'ok': True, 'state': game_state(hosted.game, hosted.moves)}
+
+    async def _unsubscribe(self, connection, request):
+        """Used internally to stop sending the updates of a game"""
+        hosted = self._get_game(request)
+        hosted.subscribers.discard(connection)
+        connection.subscriptions.discard(request['game'])
+        return {'ok': True}
+
+    async def _close(self, connection, request):
+        """Used internally to remove a game and tell its spectators"""
+        self._get_game(request)
+        self._remove_game(request['game'])
+        return {'ok': True}
+
+    def _remove_game(self, game_id):
+        """Used internally to remove a game and tell its spectators"""
+        hosted = self._games.pop(game_id)
+        closed = {'event': 'closed', 'game': game_id}
+        for subscriber in hosted.subscribers:
+            subscriber.subscriptions.discard(game_id)
+            subscriber.try_send(closed)
+        hosted.subscribers.clear()
+
+    def _expire_finished(self):
+        """
+        Used internally to remove the games whose winner was found more than
+        finished_ttl seconds ago, so finished games that are never closed do
+        not pile up
+        """
+        now = asyncio.get_running_loop().time()
+        finished = self._finished
+        while finished and finished[0][0] <= now:
+            _, game_id = finished.popleft()
+            if game_id in self._games:      # Not closed already
+                self._remove_game(game_id)
+
+    async def _hint(self, connection, request):
+        """Used internally to ask the hint service for the best move"""
+        if self._hints is None:
+            raise ValueError('hints are not enabled')
+        hosted = self._get_game(request)
+        player = request.get('player')
+        if player is not None and player not in dict(
+                hosted.game.get_players()):
+            raise ValueError('no player {}'.format(player))
+        move = await self._hints.best_move(hosted.game, player)
+        if move is None:
+            return {'ok': True, 'move': None}
+        (row, col), direction = move
+        return {'ok': True, 'move': [row, col, direction]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs a Kuba game server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    server = KubaServer(args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
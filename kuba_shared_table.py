@@ -0,0 +1,318 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaSharedTable, a transposition table for KubaSearchPlayer that
+#   lives in multiprocessing.shared_memory, so the searches of several worker
+#   processes share what they find, and KubaParallelSearchPlayer, which runs
+#   such searches of the same position on a pool of processes (lazy SMP).
+#
+#   The table has a fixed size chosen when it is created. It is an array of
+#   buckets of two 16 byte entries:
+#
+#       key ^ data (8 bytes), data (8 bytes)
+#
+#   where data packs the move, depth, bound, generation and score. The first
+#   entry of a bucket keeps the deepest result of the current search and the
+#   second is always replaced. No locks are taken: an entry that was being
+#   written by another process while it was read fails the key ^ data check
+#   and is treated as missing.
+#
+#   Usage: python kuba_shared_table.py --workers 4 --time 1000
+
+import argparse
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from KubaGame import KubaGame, index_to_move, move_to_index
+from kuba_search import KubaSearchPlayer
+
+_HEADER = struct.Struct('<QQ')      # bucket count, generation
+_BUCKET = struct.Struct('<QQQQ')    # two entries of (key ^ data, data)
+_ENTRY = struct.Struct('<QQ')
+_MASK_64 = (1 << 64) - 1
+_NO_MOVE = 255
+_VALID = 1 << 26                    # Set in the data of every used entry
+_SCORE_OFFSET = 1 << 31
+
+_ATTACHED = {}      # name -> KubaSharedTable attached in this process
+
+
+def _fold(key):
+    """Used internally to fold a key of any size into 64 bits"""
+    folded = key & _MASK_64
+    key >>= 64
+    while key:
+        folded ^= key & _MASK_64
+        key >>= 64
+    return folded
+
+
+def _attach(name):
+    """
+    Returns the KubaSharedTable for the shared memory block name, attaching
+    to it once per process. Used to unpickle tables in worker processes.
+    """
+    table = _ATTACHED.get(name)
+    if table is None:
+        table = _ATTACHED[name] = KubaSharedTable(name=name)
+    return table
+
+
+class KubaSharedTable:
+    """
+    A transposition table in shared memory that can be used in place of the
+    dictionary of KubaSearchPlayer: get(key) returns (depth, score, flag,
+    move) or None and table[key] = (depth, score, flag, move) stores an
+    entry. Pickling a table (e.g. to pass it to a worker process) attaches
+    the other process to the same memory. The process that created it should
+    use it as a context manager or call close and unlink when done.
+    """
+    def __init__(self, megabytes=64, name=None):
+        """
+        Creates a new table of about megabytes of shared memory, or attaches
+        to the existing table in the shared memory block name.
+        """
+        if name is None:
+            buckets = max(1, ((megabytes << 20) - _HEADER.size)
+                          // _BUCKET.size)
+            self._memory = shared_memory.SharedMemory(
+                create=True, size=_HEADER.size + buckets * _BUCKET.size)
+            _HEADER.pack_into(self._memory.buf, 0, buckets, 0)
+            self._owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._buffer = self._memory.buf
+        self._buckets = _HEADER.unpack_from(self._buffer, 0)[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __reduce__(self):
+        return _attach, (self._memory.name,)
+
+    def get_name(self):
+        """Returns the name of the shared memory block"""
+        return self._memory.name
+
+    def get_capacity(self):
+        """Returns the number of entries the table can hold"""
+        return 2 * self._buckets
+
+    def close(self):
+        """Detaches this process from the shared memory"""
+        self._buffer = None
+        self._memory.close()
+
+    def unlink(self):
+        """Frees the shared memory once every process has closed it"""
+        self._memory.unlink()
+
+    def new_search(self):
+        """
+        Starts a new generation. Entries stored by earlier searches can be
+        replaced by any entry of the new search.
+        """
+        _, generation = _HEADER.unpack_from(self._buffer, 0)
+        _HEADER.pack_into(self._buffer, 0, self._buckets,
+                          (generation + 1) & 0xFF)
+
+    def clear(self):
+        """Removes every entry"""
+        size = _BUCKET.size * 4096
+        for offset in range(_HEADER.size, len(self._buffer), size):
+            end = min(offset + size, len(self._buffer))
+            self._buffer[offset:end] = bytes(end - offset)
+
+    def get(self, key):
+        """
+        Returns the entry (depth, score, flag, move) stored for key, where key
+        is an int such as KubaGame.position_key, or None if there is none.
+        """
+        key = _fold(key)
+        check0, data0, check1, data1 = _BUCKET.unpack_from(
+            self._buffer, _HEADER.size + key % self._buckets * _BUCKET.size)
+        if data0 & _VALID and check0 ^ data0 == key:
+            return self._decode(data0)
+        if data1 & _VALID and check1 ^ data1 == key:
+            return self._decode(data1)
+        return None
+
+    def __setitem__(self, key, entry):
+        key = _fold(key)
+        depth, score, flag, move = entry
+        generation = _HEADER.unpack_from(self._buffer, 0)[1]
+        data = ((_NO_MOVE if move is None else move_to_index(move))
+                | min(depth, 0xFF) << 8 | (flag + 1) << 16
+                | generation << 18 | _VALID
+                | (score + _SCORE_OFFSET) << 32)
+        offset = _HEADER.size + key % self._buckets * _BUCKET.size
+        check0, data0, _, _ = _BUCKET.unpack_from(self._buffer, offset)
+        # The first entry is only replaced by an entry at least as deep, by
+        # the same position or once it is left over from an earlier search
+        if (not data0 & _VALID or check0 ^ data0 == key
+                or depth >= data0 >> 8 & 0xFF
+                or data0 >> 18 & 0xFF != generation):
+            _ENTRY.pack_into(self._buffer, offset, key ^ data, data)
+        else:
+            _ENTRY.pack_into(self._buffer, offset + _ENTRY.size,
+                             key ^ data, data)
+
+    @staticmethod
+    def _decode(data):
+        """Used internally to turn the data of an entry into a tuple"""
+        move = data & 0xFF
+        return (data >> 8 & 0xFF, (data >> 32) - _SCORE_OFFSET,
+                (data >> 16 & 3) - 1,
+                None if move == _NO_MOVE else index_to_move(move))
+
+
+def _run_search(table, players, state, player_name, time_limit_ms, max_depth,
+                seed):
+    """
+    Searches the game in state with a KubaSearchPlayer that uses table and
+    returns (move, stats). Runs in the worker processes.
+    """
+    game = KubaGame.from_state(players[0], players[1], state)
+    player = KubaSearchPlayer(time_limit_ms=time_limit_ms,
+                              max_depth=max_depth, table=table, seed=seed)
+    move = player.choose_move(game, player_name)
+    return move, player.get_stats()
+
+
+class KubaParallelSearchPlayer:
+    """
+    A computer player for KubaGame that runs one KubaSearchPlayer per worker
+    process on the same position, all sharing one KubaSharedTable. The
+    helpers order moves that are otherwise equal differently, so they fill
+    the table with results the others can reuse, and the move of the deepest
+    completed search is played. Use it as a context manager or call close to
+    shut down the worker processes and free the table.
+    """
+    def __init__(self, time_limit_ms=1000, workers=None, megabytes=64,
+                 max_depth=64, seed=0):
+        """
+        Creates a new parallel search player.
+
+        :param time_limit_ms: Milliseconds the player may think about a move.
+        :param workers:       Number of worker processes. Defaults to the
+                              number of CPUs. With 1 the search runs in this
+                              process.
+        :param megabytes:     Size of the shared transposition table.
+        :param max_depth:     Deepest iteration of the iterative deepening.
+        :param seed:          Seed of the move order of the helper searches.
+        """
+        self._time_limit_ms = time_limit_ms
+        self._workers = workers or os.cpu_count() or 1
+        self._max_depth = max_depth
+        self._seed = seed
+        self._table = KubaSharedTable(megabytes)
+        self._executor = None
+        self._stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts down the worker processes and frees the table"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._table is not None:
+            self._table.close()
+            self._table.unlink()
+            self._table = None
+
+    def get_stats(self):
+        """
+        Returns a dictionary of statistics about the last call to choose_move:
+        nodes searched by all workers, elapsed milliseconds, nodes per second,
+        the depth and score of the search whose move was played, the
+        transposition table hit rate and the number of workers.
+        """
+        return dict(self._stats)
+
+    def choose_move(self, game, player_name=None):
+        """
+        Returns the best move ((row, col), direction) found for player_name in
+        the time limit, or None if there are no legal moves.
+
+        :param game:        The KubaGame to find a move in. It is not changed.
+        :param player_name: Defaults to the player whose turn it is. Has to be
+                            given before the first move of the game.
+        """
+        start = time.perf_counter()
+        if player_name is None:
+            player_name = game.get_current_turn()
+        if not game.legal_moves(player_name):
+            self._stats = {'nodes': 0, 'elapsed_ms': 0.0,
+                           'nodes_per_second': 0.0, 'depth': 0, 'score': 0,
+                           'tt_hit_rate': 0.0, 'workers': self._workers}
+            return None
+
+        self._table.new_search()
+        jobs = [(self._table, game.get_players(), game.get_state(),
+                 player_name, self._time_limit_ms, self._max_depth,
+                 None if index == 0 else self._seed + index)
+                for index in range(self._workers)]
+        if self._workers == 1:
+            results = [_run_search(*jobs[0])]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            futures = [self._executor.submit(_run_search, *job)
+                       for job in jobs]
+            results = [future.result() for future in futures]
+
+        # The main search (index 0) wins ties
+        move, stats = max(results, key=lambda result: result[1]['depth'])
+        elapsed = time.perf_counter() - start
+        nodes = sum(result[1]['nodes'] for result in results)
+        probes = sum(result[1]['tt_probes'] for result in results)
+        hits = sum(result[1]['tt_hits'] for result in results)
+        self._stats = {
+            'nodes': nodes,
+            'elapsed_ms': elapsed * 1000,
+            'nodes_per_second': nodes / elapsed if elapsed else 0.0,
+            'depth': stats['depth'],
+            'score': stats['score'],
+            'tt_hit_rate': hits / max(probes, 1),
+            'workers': self._workers,
+        }
+        return move
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Searches the starting position of Kuba on several '
+                    'processes that share one transposition table.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--time', type=int, default=1000,
+                        help='milliseconds to think')
+    parser.add_argument('--megabytes', type=int, default=64,
+                        help='size of the shared transposition table')
+    args = parser.parse_args()
+    game = KubaGame(('white', 'W'), ('black', 'B'), bitboard=True)
+    with KubaParallelSearchPlayer(args.time, args.workers,
+                                  args.megabytes) as player:
+        move = player.choose_move(game, 'white')
+        stats = player.get_stats()
+    print('Best move:', move)
+    for name, value in stats.items():
+        print('{:>18}: {}'.format(name, value))
+
+
+if __name__ == '__main__':
+    main()
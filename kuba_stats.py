@@ -0,0 +1,118 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaStats, which collects counters and timings from games of
+#   Kuba when instrumentation is turned on with KubaGame.enable_stats. One
+#   KubaStats can be shared by many games. Its numbers can be read as a
+#   dictionary or as Prometheus text.
+
+import threading
+
+# Reasons _validate_move and make_move reject a move
+WRONG_TURN = 'wrong_turn'
+GAME_OVER = 'game_over'
+OUT_OF_RANGE = 'out_of_range'
+WRONG_COLOR = 'wrong_color'
+BLOCKED = 'blocked'
+OWN_MARBLE = 'own_marble_push_off'
+BAD_DIRECTION = 'bad_direction'
+UNDO = 'undo_rule'
+REJECTION_REASONS = (WRONG_TURN, GAME_OVER, OUT_OF_RANGE, WRONG_COLOR, BLOCKED,
+                     OWN_MARBLE, BAD_DIRECTION, UNDO)
+
+_HELP = {
+    'make_move': 'Time spent in KubaGame.make_move',
+    'validate_move': 'Time spent in KubaGame._validate_move',
+    'moves_made': 'Moves made by make_move',
+    'board_allocations': 'Boards created by make_move',
+}
+
+
+class KubaStats:
+    """
+    Holds the counters and timings of instrumented games: the number of
+    calls and the total and longest time of make_move and _validate_move,
+    the number of moves made and boards created, and the number of moves
+    rejected for each reason in REJECTION_REASONS. It is safe to share
+    between threads.
+    """
+    def __init__(self):
+        """Creates a KubaStats with every number at zero"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Sets every counter and timing back to zero"""
+        with self._lock:
+            self._counters = {
+                'moves_made': 0,
+                'board_allocations': 0,
+            }
+            # name -> [calls, total seconds, longest call in seconds]
+            self._timings = {
+                'make_move': [0, 0.0, 0.0],
+                'validate_move': [0, 0.0, 0.0],
+            }
+            self._rejections = dict.fromkeys(REJECTION_REASONS, 0)
+
+    def increment(self, name, amount=1):
+        """Adds amount to the counter called name"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        """Adds one call that took seconds to the timing called name"""
+        with self._lock:
+            timing = self._timings.setdefault(name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+
+    def reject(self, reason):
+        """Counts one move rejected for reason"""
+        with self._lock:
+            self._rejections[reason] = self._rejections.get(reason, 0) + 1
+
+    def snapshot(self):
+        """
+        Returns a dictionary of every number with the keys counters, timings
+        (calls, total_seconds and max_seconds for each) and rejections.
+        """
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'timings': {
+                    name: {'calls': calls, 'total_seconds': total,
+                           'max_seconds': longest}
+                    for name, (calls, total, longest) in self._timings.items()
+                },
+                'rejections': dict(self._rejections),
+            }
+
+    def to_prometheus(self, prefix='kuba'):
+        """
+        Returns every number in the Prometheus text exposition format, with
+        every metric name starting with prefix.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, timing in snapshot['timings'].items():
+            metric = '{}_{}_seconds'.format(prefix, name)
+            lines.append('# HELP {} {}'.format(metric, _HELP.get(name, name)))
+            lines.append('# TYPE {} summary'.format(metric))
+            lines.append('{}_count {}'.format(metric, timing['calls']))
+            lines.append('{}_sum {!r}'.format(metric, timing['total_seconds']))
+            lines.append('# TYPE {}_max gauge'.format(metric))
+            lines.append('{}_max {!r}'.format(metric, timing['max_seconds']))
+        for name, value in snapshot['counters'].items():
+            metric = '{}_{}_total'.format(prefix, name)
+            lines.append('# HELP {} {}'.format(metric, _HELP.get(name, name)))
+            lines.append('# TYPE {} counter'.format(metric))
+            lines.append('{} {}'.format(metric, value))
+        metric = '{}_rejected_moves_total'.format(prefix)
+        lines.append('# HELP {} Moves rejected by make_move'.format(metric))
+        lines.append('# TYPE {} counter'.format(metric))
+        for reason, value in snapshot['rejections'].items():
+            lines.append('{}{{reason="{}"}} {}'.format(metric, reason, value))
+        return '\n'.join(lines) + '\n'
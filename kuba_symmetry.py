@@ -0,0 +1,174 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains the symmetries of Kuba. The rules do not change when the board
+#   is turned or mirrored, or when the white and black marbles trade places
+#   together with the players who own them, so every position belongs to a
+#   group of up to 16 positions that play exactly the same. A transform is a
+#   number 0-15:
+#
+#       bits 0 - 2  how the board is turned or mirrored (see _GEOMETRIC)
+#       bit  3      whether white and black are swapped
+#
+#   canonicalize picks the smallest state of the group, so positions that
+#   only differ by a symmetry share one entry in a cache. transform_move maps
+#   moves into the canonical position and, with the inverse transform, back.
+
+from kuba_position import KubaPosition
+
+IDENTITY = 0
+TRANSFORMS = tuple(range(16))
+SWAP_COLORS = 8
+
+# (row, col) -> (row, col) for each way to turn or mirror the board
+_GEOMETRIC = (
+    lambda row, col: (row, col),            # Unchanged
+    lambda row, col: (col, 6 - row),        # Quarter turn clockwise
+    lambda row, col: (6 - row, 6 - col),    # Half turn
+    lambda row, col: (6 - col, row),        # Quarter turn counterclockwise
+    lambda row, col: (row, 6 - col),        # Mirrored left to right
+    lambda row, col: (6 - row, col),        # Mirrored top to bottom
+    lambda row, col: (col, row),            # Mirrored along the diagonal
+    lambda row, col: (6 - col, 6 - row),    # Mirrored along the antidiagonal
+)
+_STEPS = {'L': (0, -1), 'R': (0, 1), 'F': (-1, 0), 'B': (1, 0)}
+
+
+def _build_row_tables():
+    """
+    Returns [geometric][row][bits] = the bitboard of the 7 bits of a row of a
+    bitboard after turning or mirroring the board
+    """
+    tables = []
+    for transform in _GEOMETRIC:
+        rows = []
+        for row in range(7):
+            cells = []
+            for col in range(7):
+                new_row, new_col = transform(row, col)
+                cells.append(1 << (7 * new_row + new_col))
+            rows.append([sum(cell for col, cell in enumerate(cells)
+                             if bits >> col & 1) for bits in range(128)])
+        tables.append(rows)
+    return tables
+
+
+def _build_direction_tables():
+    """Returns [geometric][direction] = the direction after the transform"""
+    tables = []
+    for transform in _GEOMETRIC:
+        origin = transform(3, 3)
+        table = {}
+        for direction, (step_row, step_col) in _STEPS.items():
+            row, col = transform(3 + step_row, 3 + step_col)
+            step = (row - origin[0], col - origin[1])
+            table[direction] = next(
+                name for name, other in _STEPS.items() if other == step)
+        tables.append(table)
+    return tables
+
+
+_ROW_TABLES = _build_row_tables()
+_DIRECTION_TABLES = _build_direction_tables()
+_INVERSE = [
+    next(other for other in range(8)
+         if all(_GEOMETRIC[other](*transform(row, col)) == (row, col)
+                for row in range(7) for col in range(7)))
+    for transform in _GEOMETRIC
+]
+
+
+def inverse(transform):
+    """Returns the transform that undoes transform"""
+    return _INVERSE[transform & 7] | (transform & SWAP_COLORS)
+
+
+def transform_coordinates(coordinates, transform):
+    """Returns the coordinates (row, col) after transform"""
+    return _GEOMETRIC[transform & 7](coordinates[0], coordinates[1])
+
+
+def transform_direction(direction, transform):
+    """Returns the direction ('L', 'R', 'F' or 'B') after transform"""
+    return _DIRECTION_TABLES[transform & 7][direction]
+
+
+def transform_move(move, transform):
+    """
+    Returns the move ((row, col), direction) after transform. Making the new
+    move in the transformed position gives the transformed result of making
+    move in the original position.
+    """
+    coordinates, direction = move
+    return (transform_coordinates(coordinates, transform),
+            transform_direction(direction, transform))
+
+
+def transform_bits(bits, transform):
+    """Returns a 49 bit bitboard (see KubaBitBoard) turned or mirrored"""
+    rows = _ROW_TABLES[transform & 7]
+    return (rows[0][bits & 0x7F] | rows[1][bits >> 7 & 0x7F]
+            | rows[2][bits >> 14 & 0x7F] | rows[3][bits >> 21 & 0x7F]
+            | rows[4][bits >> 28 & 0x7F] | rows[5][bits >> 35 & 0x7F]
+            | rows[6][bits >> 42 & 0x7F])
+
+
+def transform_state(state, transform):
+    """
+    Returns the state tuple returned by KubaGame.get_state after transform.
+    When the colors are swapped the players trade places too: the turn,
+    winner and captured counts move to the other player, so the player who
+    owned the white marbles owns the black ones and still has to move.
+    """
+    boards = [transform_bits(bits, transform) for bits in state[:6]]
+    turn, winner, captured1, captured2, last_move = state[6:]
+    if last_move is not None:
+        (row, col), direction = transform_move(
+            ((last_move[0], last_move[1]), last_move[2]), transform)
+        last_move = (row, col, direction)
+    if transform & SWAP_COLORS:
+        boards[0], boards[1] = boards[1], boards[0]
+        boards[3], boards[4] = boards[4], boards[3]
+        turn = None if turn is None else 1 - turn
+        winner = None if winner is None else 1 - winner
+        captured1, captured2 = captured2, captured1
+    return tuple(boards) + (turn, winner, captured1, captured2, last_move)
+
+
+def canonicalize(state):
+    """
+    Returns (canonical state, transform) where transform turns state into the
+    canonical state. Every state of a group of symmetric states has the same
+    canonical state.
+    """
+    white, black, red = state[:3]
+    # Most states are told apart by the board alone, so only the transforms
+    # that give the smallest board are worked out in full.
+    boards = {}
+    for transform in range(8):
+        boards[transform] = (transform_bits(white, transform),
+                             transform_bits(black, transform),
+                             transform_bits(red, transform))
+        boards[transform | SWAP_COLORS] = (boards[transform][1],
+                                           boards[transform][0],
+                                           boards[transform][2])
+    smallest = min(boards.values())
+    best, best_transform = None, IDENTITY
+    for transform in TRANSFORMS:
+        if boards[transform] != smallest:
+            continue
+        candidate = transform_state(state, transform)
+        if best is None or candidate < best:
+            best, best_transform = candidate, transform
+    return best, best_transform
+
+
+def canonical_position(game):
+    """
+    Returns (KubaPosition, transform) for the canonical state of game, a
+    KubaGame. The position can be used as a key that is the same for every
+    symmetric position; a move m of the canonical position is the move
+    transform_move(m, inverse(transform)) in game.
+    """
+    state, transform = canonicalize(game.get_state())
+    return KubaPosition.from_state(state), transform
@@ -0,0 +1,463 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains an endgame tablebase for Kuba: every position with only a few
+#   white, black and red marbles left is solved by retrograde analysis and
+#   stored in a file that is memory-mapped for lookups. A position is stored
+#   as three numbers:
+#
+#       best     the value of the position
+#       move     the move (numbered like move_to_index) that reaches best
+#       second   the value when move is not allowed
+#
+#   A value is 0 for a draw, otherwise 1 plus the number of plies until the
+#   game ends with best play by both sides. An odd number of plies is a win
+#   for the player to move and an even number a loss. Because of the rule
+#   against undoing a move at most one move is not allowed in a position, so
+#   best and second are enough to know the value of the position no matter
+#   what the board before the last move was.
+#
+#   Positions are grouped into blocks by the number of white, black and red
+#   marbles on the board and the red marbles captured by the white player.
+#   All 13 red marbles are either on the board or captured, so that also
+#   decides the red marbles captured by the black player. A move that pushes
+#   a marble off of the board leads to a block with fewer marbles, so blocks
+#   are solved from the fewest marbles up and blocks with the same number of
+#   marbles are solved in parallel.
+#
+#   The file starts with a header and a table of the blocks, followed by the
+#   entries of each block. The entry of a position is at
+#
+#       block offset + 5 * (2 * board index + player to move)
+#
+#   where the board index numbers the ways to place the marbles of the block
+#   (see _board_index) and the player to move is 0 for white and 1 for black.
+#
+#   Usage: python kuba_tablebase.py kuba.kbt --white 1 --black 1 --red 1
+
+import argparse
+import collections
+import itertools
+import math
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from KubaGame import KubaBitBoard, index_to_move, move_to_index
+
+MAGIC = b'KUBT'
+VERSION = 1
+RED_MARBLES = 13        # Red marbles at the start of a game
+CAPTURES_TO_WIN = 7
+
+_HEADER = struct.Struct('<4sBBBBH')     # magic, version, limits, block count
+_BLOCK = struct.Struct('<BBBBQ')        # white, black, red, captured, offset
+_ENTRY = struct.Struct('<HBH')          # best, move, second
+_NO_MOVE = 255
+_STEPS = {'R': (0, 1), 'L': (0, -1), 'B': (1, 0), 'F': (-1, 0)}
+_OPPOSITE = {'R': 'L', 'L': 'R', 'B': 'F', 'F': 'B'}
+_COMB = [[math.comb(n, k) for k in range(50)] for n in range(50)]
+
+
+class KubaTablebaseResult(collections.namedtuple(
+        'KubaTablebaseResult', ('score', 'plies', 'move'))):
+    """
+    The result of probing a position. score is 1 if the player to move wins,
+    -1 if they lose and 0 if the game is a draw with best play. plies is the
+    number of moves until the game ends (None for a draw) and move is the best
+    move ((row, col), direction) or None if the player has no legal moves.
+    """
+    __slots__ = ()
+
+
+def block_keys(max_white, max_black, max_red):
+    """
+    Returns the keys (white, black, red, captured) of every block of a
+    tablebase with at most max_white white, max_black black and max_red red
+    marbles, where captured is the red marbles captured by the white player.
+    Positions without white, black or red marbles are not stored because the
+    game is already over.
+    """
+    keys = []
+    for white in range(1, max_white + 1):
+        for black in range(1, max_black + 1):
+            for red in range(1, max_red + 1):
+                captured = RED_MARBLES - red
+                low = max(0, captured - (CAPTURES_TO_WIN - 1))
+                high = min(CAPTURES_TO_WIN - 1, captured)
+                for white_captured in range(low, high + 1):
+                    keys.append((white, black, red, white_captured))
+    return keys
+
+
+def board_count(white, black, red):
+    """Returns the number of ways to place the marbles on the 49 cells"""
+    return (_COMB[49][white] * _COMB[49 - white][black]
+            * _COMB[49 - white - black][red])
+
+
+def _rank(bits, taken):
+    """
+    Used internally to number the set of cells in bits among the cells that
+    are not in taken, in colex order.
+    """
+    rank, count = 0, 0
+    while bits:
+        bit = bits & -bits
+        bits ^= bit
+        count += 1
+        cell = bit.bit_length() - 1 - (taken & (bit - 1)).bit_count()
+        rank += _COMB[cell][count]
+    return rank
+
+
+def _board_index(white, black, red, counts):
+    """
+    Used internally to return the index of the board with the white, black and
+    red bitboards among all boards with counts (W, B, R) marbles
+    """
+    white_count, black_count, red_count = counts
+    index = _rank(white, 0) * _COMB[49 - white_count][black_count]
+    index += _rank(black, white)
+    index *= _COMB[49 - white_count - black_count][red_count]
+    return index + _rank(red, white | black)
+
+
+def _boards(white_count, black_count, red_count):
+    """
+    Used internally as a generator of (white, black, red) for every way to
+    place the marbles on the board
+    """
+    for whites in itertools.combinations(range(49), white_count):
+        white = sum(1 << cell for cell in whites)
+        cells = [cell for cell in range(49) if not white >> cell & 1]
+        for blacks in itertools.combinations(cells, black_count):
+            black = sum(1 << cell for cell in blacks)
+            rest = [cell for cell in cells if not black >> cell & 1]
+            for reds in itertools.combinations(rest, red_count):
+                yield white, black, sum(1 << cell for cell in reds)
+
+
+def _bitboard(white, black, red):
+    """Used internally to return a KubaBitBoard with the three bitboards"""
+    board = KubaBitBoard.__new__(KubaBitBoard)
+    board._white, board._black, board._red = white, black, red
+    return board
+
+
+def _reverse_move(before, after, row, col, direction, color):
+    """
+    Used internally to return the number of the move of color that turns the
+    board after back into before, where after is before with the marble at
+    (row, col) pushed in direction and nothing pushed off. Returns _NO_MOVE
+    if color can not make that move.
+    """
+    occupied = before._white | before._black | before._red
+    step_row, step_col = _STEPS[direction]
+    # Walk to the last marble of the pushed run; it ended up one cell further
+    while True:
+        row, col = row + step_row, col + step_col
+        if not occupied >> (7 * row + col) & 1:
+            break
+    back = _OPPOSITE[direction]
+    if not after.can_push(row, col, back, color):
+        return _NO_MOVE
+    return move_to_index(((row, col), back))
+
+
+def _preference(value):
+    """
+    Used internally to order values from the point of view of the player to
+    move: quick wins first, then draws, then slow losses.
+    """
+    if value == 0:
+        return 0
+    plies = value - 1
+    if plies % 2:
+        return (1 << 20) - plies
+    return plies - (1 << 20)
+
+
+class KubaTablebase:
+    """
+    Looks up positions in a tablebase file made by build_tablebase. The file
+    is memory-mapped, so opening it is instant and every probe only reads one
+    entry. Use it as a context manager or call close when done.
+    """
+    def __init__(self, path):
+        """
+        Opens the tablebase file at path. Raises ValueError if it is not a
+        tablebase file.
+        """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, *limits, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError('{} is not a Kuba tablebase file'.format(path))
+        if version != VERSION:
+            self.close()
+            raise ValueError('unknown tablebase version {}'.format(version))
+        self._limits = tuple(limits)
+        self._blocks = {}
+        for slot in range(count):
+            *key, offset = _BLOCK.unpack_from(
+                self._map, _HEADER.size + slot * _BLOCK.size)
+            self._blocks[tuple(key)] = offset
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmaps and closes the file"""
+        self._map.close()
+        self._file.close()
+
+    def get_limits(self):
+        """Returns the most (W, B, R) marbles of the positions in the file"""
+        return self._limits
+
+    def probe(self, game):
+        """
+        Returns a KubaTablebaseResult for the player whose turn it is in game,
+        a KubaGame, or None if the position is not in the tablebase (too many
+        marbles, the game is over or nobody has moved yet).
+        """
+        if game.get_winner() is not None or game.get_current_turn() is None:
+            return None
+        counts = game.get_marble_count()
+        for count, limit in zip(counts, self._limits):
+            if count > limit:
+                return None
+        (white, black, red, old_white, old_black, old_red,
+         turn, _, captured1, captured2, last_move) = game.get_state()
+        colors = [color for _, color in game.get_players()]
+        color = colors[turn]
+        captured = captured1 if colors[0] == 'W' else captured2
+        offset = self._blocks.get(counts + (captured,))
+        if offset is None:
+            return None
+
+        board = _bitboard(white, black, red)
+        forbidden = _NO_MOVE
+        if last_move is not None:
+            old_board = _bitboard(old_white, old_black, old_red)
+            if old_board.get_marble_count() == counts:
+                row, col, direction = last_move
+                forbidden = _reverse_move(old_board, board, row, col,
+                                          direction, color)
+        index = 2 * _board_index(white, black, red, counts) + (color == 'B')
+        best, move, second = self._entry(offset, index)
+        is_forbidden = move == forbidden and move != _NO_MOVE
+        value = second if is_forbidden else best
+        if value == 0:
+            score, plies = 0, None
+        else:
+            plies = value - 1
+            score = 1 if plies % 2 else -1
+        if is_forbidden:
+            move = self._find_move(game, value)
+        else:
+            move = None if move == _NO_MOVE else index_to_move(move)
+        return KubaTablebaseResult(score, plies, move)
+
+    def _entry(self, offset, index):
+        """Used internally to return (best, move, second) of an entry"""
+        return _ENTRY.unpack_from(self._map, offset + _ENTRY.size * index)
+
+    def _value(self, key, white, black, red, color):
+        """
+        Used internally to return the value of a position of the block key
+        when every move is allowed, as in the position right after a marble
+        was pushed off.
+        """
+        index = 2 * _board_index(white, black, red, key[:3]) + (color == 'B')
+        return self._entry(self._blocks[key], index)[0]
+
+    def _find_move(self, game, value):
+        """
+        Used internally to find a legal move of game that keeps value when the
+        best move stored in the file is the one undo move that is not allowed.
+        """
+        for move in game.legal_moves():
+            child = game.copy(bitboard=True)
+            child.push(move)
+            if child.get_winner() is not None:
+                child_value = 1
+            else:
+                result = self.probe(child)
+                if result is None or result.score == 0:
+                    child_value = 0
+                else:
+                    child_value = result.plies + 1
+            if (child_value + 1 if child_value else 0) == value:
+                return move
+        return None
+
+
+def _solve_block(path, key):
+    """
+    Solves every position of the block key and returns its entries as bytes.
+    The blocks with fewer marbles are read from the tablebase file at path.
+    Runs in the worker processes.
+    """
+    white_count, black_count, red_count, white_captured = key
+    counts = (white_count, black_count, red_count)
+    captured = {'W': white_captured,
+                'B': RED_MARBLES - red_count - white_captured}
+    lower = KubaTablebase(path)
+    size = 2 * board_count(*counts)
+    # For every position a flat list of move, child, move, child, ... where
+    # child is 256 * position + the move not allowed there for a position of
+    # this block, or -1 - value for a position whose value is already known.
+    children = [None] * size
+    parents = [[] for _ in range(size)]
+    for white, black, red in _boards(*counts):
+        board = _bitboard(white, black, red)
+        index = 2 * _board_index(white, black, red, counts)
+        for turn, color in enumerate('WB'):
+            opponent = 'B' if color == 'W' else 'W'
+            flat = []
+            for move in board.candidate_moves(color):
+                (row, col), direction = move
+                child = board.copy()
+                fallen = child.push(row, col, direction)[0]
+                if fallen is None:
+                    child_index = 2 * _board_index(
+                        child._white, child._black, child._red, counts)
+                    child_index += 1 - turn
+                    reverse = _reverse_move(board, child, row, col, direction,
+                                            opponent)
+                    code = 256 * child_index + reverse
+                    parents[child_index].append(index + turn)
+                elif (fallen == 'R' and captured[color] == CAPTURES_TO_WIN - 1
+                      or fallen == opponent
+                      and counts['WB'.index(opponent)] == 1):
+                    code = -2       # The opponent has lost right away
+                else:
+                    child_key = (white_count - (fallen == 'W'),
+                                 black_count - (fallen == 'B'),
+                                 red_count - (fallen == 'R'),
+                                 white_captured + (fallen == 'R'
+                                                   and color == 'W'))
+                    code = -1 - lower._value(child_key, child._white,
+                                             child._black, child._red,
+                                             opponent)
+                flat += (move_to_index(move), code)
+            children[index + turn] = flat
+    lower.close()
+
+    best = [0] * size
+    moves = [_NO_MOVE] * size
+    second = [0] * size
+    dirty = range(size)
+    while dirty:
+        # Every changed position is worked out from the values of the last
+        # round only, so a position is solved in the round of its distance.
+        updates = []
+        for position in dirty:
+            flat = children[position]
+            best_value, best_key, best_move = 1, -(1 << 30), _NO_MOVE
+            second_value, second_key = 1, -(1 << 30)
+            for slot in range(0, len(flat), 2):
+                code = flat[slot + 1]
+                if code < 0:
+                    value = -1 - code
+                else:
+                    child, reverse = divmod(code, 256)
+                    if reverse == moves[child]:
+                        value = second[child]
+                    else:
+                        value = best[child]
+                if value:
+                    value += 1
+                preference = _preference(value)
+                if preference > best_key:
+                    second_value, second_key = best_value, best_key
+                    best_value, best_key = value, preference
+                    best_move = flat[slot]
+                elif preference > second_key:
+                    second_value, second_key = value, preference
+            if (best_value != best[position] or best_move != moves[position]
+                    or second_value != second[position]):
+                updates.append((position, best_value, best_move, second_value))
+        changed = set()
+        for position, best_value, best_move, second_value in updates:
+            best[position] = best_value
+            moves[position] = best_move
+            second[position] = second_value
+            changed.update(parents[position])
+        dirty = sorted(changed)
+
+    if max(best + second) > 0xFFFF:
+        raise ValueError('a position of block {} is too long'.format(key))
+    data = bytearray(_ENTRY.size * size)
+    for position in range(size):
+        _ENTRY.pack_into(data, _ENTRY.size * position, best[position],
+                         moves[position], second[position])
+    return bytes(data)
+
+
+def build_tablebase(path, max_white=1, max_black=1, max_red=1, workers=None):
+    """
+    Solves every position with at most max_white white, max_black black and
+    max_red red marbles and writes the tablebase file at path. The number of
+    positions grows very quickly with the number of marbles: with one marble
+    of each color there are about 221 thousand.
+
+    :param workers: Number of worker processes, defaults to the number of
+                    CPUs.
+    """
+    keys = block_keys(max_white, max_black, max_red)
+    offset = _HEADER.size + _BLOCK.size * len(keys)
+    offsets = {}
+    for key in keys:
+        offsets[key] = offset
+        offset += _ENTRY.size * 2 * board_count(*key[:3])
+    with open(path, 'wb') as output:
+        output.write(_HEADER.pack(MAGIC, VERSION, max_white, max_black,
+                                  max_red, len(keys)))
+        for key in keys:
+            output.write(_BLOCK.pack(*key, offsets[key]))
+        output.truncate(offset)
+
+    levels = collections.defaultdict(list)
+    for key in keys:
+        levels[sum(key[:3])].append(key)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) \
+            as executor, open(path, 'r+b') as output:
+        for level in sorted(levels):
+            futures = {executor.submit(_solve_block, path, key): key
+                       for key in levels[level]}
+            for future in as_completed(futures):
+                output.seek(offsets[futures[future]])
+                output.write(future.result())
+            output.flush()      # The next level reads these blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Builds a Kuba endgame tablebase.')
+    parser.add_argument('output', help='tablebase file to write')
+    parser.add_argument('--white', type=int, default=1,
+                        help='most white marbles')
+    parser.add_argument('--black', type=int, default=1,
+                        help='most black marbles')
+    parser.add_argument('--red', type=int, default=1, help='most red marbles')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build_tablebase(args.output, args.white, args.black, args.red,
+                    workers=args.workers)
+    print('Wrote', args.output, 'in',
+          round(time.perf_counter() - start, 1), 'seconds')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Games shared by the unittests of the computer players and the
+#               server. Holds no tests itself.
+
+from KubaGame import KubaGame
+
+# The easiest win of test_KubaGame.py up to the last move: after these moves
+# ann can capture her 7th red marble by pushing (2, 4) forward
+SEVEN_CAPTURES_MOVES = [
+    ('ann', (0, 0), 'R'), ('bob', (6, 0), 'R'), ('ann', (0, 1), 'R'),
+    ('bob', (6, 2), 'L'), ('ann', (0, 3), 'B'), ('bob', (6, 0), 'F'),
+    ('ann', (1, 3), 'B'), ('bob', (4, 0), 'B'), ('ann', (2, 3), 'B'),
+    ('bob', (6, 0), 'F'), ('ann', (3, 3), 'B'), ('bob', (4, 0), 'B'),
+    ('ann', (4, 3), 'B'), ('bob', (6, 0), 'F'), ('ann', (5, 3), 'B'),
+    ('bob', (4, 0), 'B'), ('ann', (5, 6), 'L'), ('bob', (6, 0), 'F'),
+    ('ann', (5, 4), 'F'), ('bob', (4, 0), 'B'), ('ann', (4, 4), 'F'),
+    ('bob', (6, 0), 'F'), ('ann', (3, 4), 'F'), ('bob', (4, 0), 'B'),
+]
+SEVEN_CAPTURES_WIN = ('ann', (2, 4), 'F')
+
+
+def seven_captures_game(moves=len(SEVEN_CAPTURES_MOVES)):
+    """
+    Returns a KubaGame of ann ('W') and bob ('B') with the first moves of
+    SEVEN_CAPTURES_MOVES made. Raises ValueError if a move is not made.
+    """
+    game = KubaGame(('ann', 'W'), ('bob', 'B'))
+    for move in SEVEN_CAPTURES_MOVES[:moves]:
+        if not game.make_move(*move):
+            raise ValueError('move {} was not made'.format(move))
+    return game
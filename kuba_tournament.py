@@ -0,0 +1,383 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description :
+#   Contains KubaTournament, which plays a league of games of Kuba between
+#   computer players on a pool of worker processes. Every pair of entrants
+#   plays the same number of games with colors and the first move swapped
+#   fairly. Each finished game is appended to a JSON lines file right away, so
+#   a tournament can be stopped and resumed and survives crashed workers.
+#   Elo ratings with confidence intervals are computed from the results.
+#
+#   Usage: python kuba_tournament.py results.jsonl random search:100 mcts:200
+
+import argparse
+import functools
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from KubaGame import KubaGame
+from kuba_mcts import KubaMCTSPlayer
+from kuba_search import KubaSearchPlayer
+
+MAX_REPETITIONS = 3     # A game is a draw when a position occurs this often
+
+
+class KubaRandomPlayer:
+    """A computer player for KubaGame that picks a random legal move"""
+    def __init__(self, seed=None):
+        """Creates a random player whose choices are decided by seed"""
+        self._random = random.Random(seed)
+
+    def choose_move(self, game, player_name=None):
+        """
+        Returns a random legal move ((row, col), direction) for player_name or
+        None if there are none. Defaults to the player whose turn it is.
+        """
+        moves = game.legal_moves(player_name)
+        if not moves:
+            return None
+        return self._random.choice(moves)
+
+
+def make_random_player(seed):
+    """Returns a KubaRandomPlayer, an entrant factory for KubaTournament"""
+    return KubaRandomPlayer(seed)
+
+
+def make_search_player(seed, time_limit_ms=100):
+    """Returns a KubaSearchPlayer, an entrant factory for KubaTournament"""
+    return KubaSearchPlayer(time_limit_ms=time_limit_ms, seed=seed)
+
+
+def make_mcts_player(seed, playouts=200):
+    """Returns a KubaMCTSPlayer, an entrant factory for KubaTournament"""
+    return KubaMCTSPlayer(playouts=playouts, workers=1, seed=seed)
+
+
+# Entrant factories that can be picked on the command line as name or name:n
+FACTORIES = {
+    'random': (make_random_player, None),
+    'search': (make_search_player, 'time_limit_ms'),
+    'mcts': (make_mcts_player, 'playouts'),
+}
+
+
+def play_game(white, black, first, seed, max_moves):
+    """
+    Plays one game and returns its record as a dictionary. Runs in the worker
+    processes.
+
+    :param white:     Factory (a function of a seed) of the white player.
+    :param black:     Factory of the black player.
+    :param first:     Color ('W' or 'B') of the player that moves first.
+    :param seed:      Seed passed to both factories.
+    :param max_moves: The game is a draw after this many moves.
+    """
+    game = KubaGame(('white', 'W'), ('black', 'B'), bitboard=True)
+    game.set_draw_policy(repetitions=MAX_REPETITIONS, max_moves=max_moves)
+    players = {'white': white(seed), 'black': black(seed + 1)}
+    name = 'white' if first == 'W' else 'black'
+    latencies = []
+    reason = 'move_cap'
+    winner = None
+    try:
+        while len(latencies) < max_moves:
+            start = time.perf_counter()
+            move = players[name].choose_move(game, name)
+            latencies.append(round((time.perf_counter() - start) * 1000, 3))
+            if move is None:
+                winner, reason = game.get_opponent(name), 'no_moves'
+                break
+            if not game.make_move(name, *move):
+                winner, reason = game.get_opponent(name), 'illegal_move'
+                break
+            if game.get_winner() is not None:
+                winner = game.get_winner()
+                reason = 'captures' if game.get_captured(name) == 7 else 'pushed_off'
+                break
+            if game.is_draw():
+                if game.get_repetitions() >= MAX_REPETITIONS:
+                    reason = 'repetition'
+                break
+            name = game.get_current_turn()
+    finally:
+        for player in players.values():
+            if hasattr(player, 'close'):
+                player.close()
+    return {
+        'winner_color': None if winner is None else game.get_color(winner),
+        'reason': reason,
+        'captured': {'W': game.get_captured('white'),
+                     'B': game.get_captured('black')},
+        'moves': len(latencies),
+        'latency_ms': latencies,
+    }
+
+
+def load_results(path):
+    """
+    Returns the list of game records in the JSON lines file at path. A line
+    that was cut off by a crash is skipped. Returns [] if there is no file.
+    """
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path) as results_file:
+        for line in results_file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def _bradley_terry(labels, games, iterations=200):
+    """
+    Returns {label: elo} fitted to games, a list of (label_a, label_b,
+    score_a) where score_a is 1, 0.5 or 0. Every pair gets one virtual draw
+    so players that never won still get a finite rating. The ratings average
+    to zero.
+    """
+    wins = {label: 0.0 for label in labels}
+    counts = {}
+    for a, b in itertools.combinations(labels, 2):
+        wins[a] += 0.5
+        wins[b] += 0.5
+        counts[a, b] = counts[b, a] = 1
+    for a, b, score in games:
+        wins[a] += score
+        wins[b] += 1 - score
+        counts[a, b] += 1
+        counts[b, a] += 1
+    strength = {label: 1.0 for label in labels}
+    for _ in range(iterations):
+        for label in labels:
+            total = sum(counts[label, other] / (strength[label] + strength[other])
+                        for other in labels if other != label)
+            if total:
+                strength[label] = wins[label] / total
+    elo = {label: 400 * math.log10(strength[label]) for label in labels}
+    mean = sum(elo.values()) / len(elo)
+    return {label: value - mean for label, value in elo.items()}
+
+
+def compute_elo(records, bootstrap=200, seed=0):
+    """
+    Returns {label: (elo, low, high)} for every entrant in records where low
+    and high are a 95% confidence interval found by resampling the games.
+    Games of an entrant against itself and failed games are left out.
+    """
+    games = []
+    labels = set()
+    for record in records:
+        if record.get('error') or record['white'] == record['black']:
+            continue
+        labels.update((record['white'], record['black']))
+        color = record['winner_color']
+        score = 0.5 if color is None else (1.0 if color == 'W' else 0.0)
+        games.append((record['white'], record['black'], score))
+    labels = sorted(labels)
+    if len(labels) < 2:
+        return {label: (0.0, 0.0, 0.0) for label in labels}
+
+    elo = _bradley_terry(labels, games)
+    rand = random.Random(seed)
+    samples = {label: [] for label in labels}
+    for _ in range(bootstrap):
+        resampled = [rand.choice(games) for _ in games]
+        for label, value in _bradley_terry(labels, resampled, 50).items():
+            samples[label].append(value)
+    result = {}
+    for label in labels:
+        values = sorted(samples[label]) or [elo[label]]
+        low = values[int(0.025 * (len(values) - 1))]
+        high = values[int(0.975 * (len(values) - 1))]
+        result[label] = (elo[label], low, high)
+    return result
+
+
+class KubaTournament:
+    """
+    Represents a league where every pair of entrants plays games_per_pair
+    games. Entrants are (label, factory) tuples where factory is a function
+    that takes a seed and returns an object with a choose_move(game,
+    player_name) method, like the make_*_player functions. Factories have to
+    be picklable (module level functions or functools.partial of them).
+    """
+    def __init__(self, entrants, games_per_pair, output_path, workers=None,
+                 max_moves=300, seed=0, max_retries=2):
+        """
+        Creates a new tournament.
+
+        :param entrants:       List of (label, factory) tuples.
+        :param games_per_pair: Games each pair of entrants plays.
+        :param output_path:    JSON lines file the results are appended to.
+        :param workers:        Number of worker processes, defaults to the
+                               number of CPUs.
+        :param max_moves:      Games longer than this are draws.
+        :param seed:           Seed the seed of every game is made from.
+        :param max_retries:    Times a game is retried after its worker dies
+                               before it is recorded as an error.
+        """
+        self._entrants = dict(entrants)
+        self._labels = [label for label, _ in entrants]
+        self._games_per_pair = games_per_pair
+        self._output_path = output_path
+        self._workers = workers or os.cpu_count() or 1
+        self._max_moves = max_moves
+        self._seed = seed
+        self._max_retries = max_retries
+
+    def schedule(self):
+        """
+        Returns the list of games to play as dictionaries with the keys game,
+        white, black, first and seed. Each pair swaps colors every game and
+        the color that moves first every two games.
+        """
+        games = []
+        for a, b in itertools.combinations(self._labels, 2):
+            for index in range(self._games_per_pair):
+                white, black = (a, b) if index % 2 == 0 else (b, a)
+                games.append({
+                    'game': len(games),
+                    'white': white,
+                    'black': black,
+                    'first': 'W' if index % 4 < 2 else 'B',
+                    'seed': self._seed * 1000003 + 2 * len(games),
+                })
+        return games
+
+    def run(self):
+        """
+        Plays every scheduled game that is not finished in the output file
+        yet, including games recorded with an error, and returns the last
+        record of every game in the file.
+        """
+        finished = {record['game'] for record in load_results(self._output_path)
+                    if not record.get('error')}
+        pending = [game for game in self.schedule() if game['game'] not in finished]
+        retries = {}
+        suspects = set()    # Games running when a worker died, run alone
+        cut_off = False
+        if os.path.exists(self._output_path):
+            with open(self._output_path, 'rb') as output:
+                output.seek(0, os.SEEK_END)
+                if output.tell():
+                    output.seek(-1, os.SEEK_END)
+                    cut_off = output.read(1) != b'\n'
+        with open(self._output_path, 'a') as output:
+            if cut_off:         # Start after the record that was cut off
+                output.write('\n')
+            while pending:
+                pending = self._run_pool(pending, output, retries, suspects)
+        latest = {record['game']: record
+                  for record in load_results(self._output_path)}
+        return [latest[game] for game in sorted(latest)]
+
+    def _run_pool(self, games, output, retries, suspects):
+        """
+        Used internally to play games on a new process pool, writing each
+        record as soon as it is done. Only as many games as there are workers
+        are handed to the pool at a time. When a worker dies, the games that
+        were running are added to suspects and played again without a retry
+        being counted. Suspects are run alone, so when a worker dies running
+        one, a retry is counted for that game only. Returns the games that
+        have to be played again because a worker process died.
+        """
+        waiting = list(reversed(games))
+        unfinished = []
+        crashed = []            # Games running when the pool broke
+        running = {}
+        broken = False
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            while running or waiting and not broken:
+                while waiting and not broken and len(running) < self._workers:
+                    alone = waiting[-1]['game'] in suspects
+                    if running and (alone or any(
+                            game['game'] in suspects
+                            for game in running.values())):
+                        break
+                    game = waiting.pop()
+                    try:
+                        future = executor.submit(
+                            play_game, self._entrants[game['white']],
+                            self._entrants[game['black']], game['first'],
+                            game['seed'], self._max_moves)
+                    except BrokenProcessPool:
+                        waiting.append(game)
+                        broken = True
+                        break
+                    running[future] = game
+                    if alone:
+                        break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    game = running.pop(future)
+                    try:
+                        record = dict(game, **future.result())
+                    except BrokenProcessPool:
+                        broken = True
+                        crashed.append(game)
+                        continue
+                    except Exception as error:
+                        record = dict(game, error=repr(error))
+                    suspects.discard(game['game'])
+                    output.write(json.dumps(record) + '\n')
+                    output.flush()
+        if len(crashed) == 1:
+            game = crashed[0]
+            retries[game['game']] = retries.get(game['game'], 0) + 1
+            if retries[game['game']] <= self._max_retries:
+                unfinished.append(game)
+            else:
+                output.write(json.dumps(dict(game, error='worker died')) + '\n')
+                output.flush()
+        else:
+            suspects.update(game['game'] for game in crashed)
+            unfinished.extend(crashed)
+        # Games never handed to a broken pool are played again without a retry
+        unfinished.extend(waiting)
+        return sorted(unfinished, key=lambda game: game['game'])
+
+
+def _parse_entrant(text):
+    """Used internally to turn 'name' or 'name:n' into (label, factory)"""
+    name, _, value = text.partition(':')
+    factory, parameter = FACTORIES[name]
+    if value:
+        factory = functools.partial(factory, **{parameter: int(value)})
+    return text, factory
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays a Kuba tournament.')
+    parser.add_argument('output', help='JSON lines file for the results')
+    parser.add_argument('entrants', nargs='+',
+                        help='random, search[:time_ms] or mcts[:playouts]')
+    parser.add_argument('--games', type=int, default=100,
+                        help='games per pair of entrants')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-moves', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tournament = KubaTournament(
+        [_parse_entrant(text) for text in args.entrants], args.games,
+        args.output, workers=args.workers, max_moves=args.max_moves,
+        seed=args.seed)
+    records = tournament.run()
+    ratings = compute_elo(records)
+    print(len(records), 'games')
+    for label, (elo, low, high) in sorted(ratings.items(),
+                                          key=lambda item: -item[1][0]):
+        print('{:>16} {:7.1f} [{:7.1f}, {:7.1f}]'.format(label, elo, low, high))
+
+
+if __name__ == '__main__':
+    main()
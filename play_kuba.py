@@ -1,13 +1,63 @@
+import argparse
+import os
+import sys
+
 from KubaGame import KubaGame
+from kuba_book import KubaOpeningBook
+from kuba_script import run_scripts
+from kuba_search import KubaSearchPlayer
+from kuba_tablebase import KubaTablebase
+
+COMPUTER_TIME_MS = 1000     # Milliseconds the computer may think per move
+TABLEBASE_PATH = 'kuba.kbt' # Endgame tablebase, used if it exists
+BOOK_PATH = 'kuba.kbb'      # Opening book for hints, used if it exists
+HINTS = 3                   # Book moves shown as hints
+
+parser = argparse.ArgumentParser(
+    description='Plays a game of Kuba in the terminal, or replays move '
+                'scripts without a board with --batch (see kuba_script.py).')
+parser.add_argument('--batch', nargs='*', metavar='SCRIPT',
+                    help='script files to replay, standard input if none '
+                         'are given or for -')
+parser.add_argument('--json', action='store_true',
+                    help='with --batch, print one JSON object per game')
+args = parser.parse_args()
+if args.batch is not None:
+    invalid_lines = run_scripts(args.batch or ['-'], sys.stdout, args.json)
+    sys.exit(1 if invalid_lines else 0)
 
 p1_name = input('Player 1 Name: ').strip()
 p1_color = input('Player 1 color (W or B): ').upper()
 p2_name = input('Player 2 Name: ').strip()
 p2_color = input('Player 2 color (W or B): ').upper()
+p2_computer = input('Should the computer play for ' + p2_name + '? (y/N): ')
+book = None
+if os.path.exists(BOOK_PATH):
+    book = KubaOpeningBook(BOOK_PATH)
+computer = None
+if p2_computer.strip().upper() == 'Y':
+    tablebase = None
+    if os.path.exists(TABLEBASE_PATH):
+        tablebase = KubaTablebase(TABLEBASE_PATH)
+    computer = KubaSearchPlayer(time_limit_ms=COMPUTER_TIME_MS,
+                                tablebase=tablebase, book=book)
 
 game = KubaGame((p1_name, p1_color), (p2_name, p2_color))
 game._board.display(colored=True)
 
+def print_hints():
+    if book is None:
+        return
+    # Before the first move either player may start, so show both
+    names = [game.get_current_turn()] if game.get_current_turn() else [
+        p1_name, p2_name]
+    for name in names:
+        for book_move in book.lookup(game, name)[:HINTS]:
+            coord, direction = book_move.move
+            print('Book move for', name, *coord, direction, 'played in',
+                  book_move.games, 'games, won',
+                  round(100 * book_move.get_win_rate()), '%')
+
 def get_name():
     name = input('name: ').strip()
     names = (p1_name, p2_name)
@@ -41,9 +91,27 @@ def get_direction():
 
 captured_sum = 0
 while game.get_winner() == None:
-        name = get_name()
-        coord = get_coordinates()
-        direction = get_direction()
+        if computer is not None and game.get_current_turn() == p2_name:
+            name = p2_name
+            best_move = computer.choose_move(game)
+            if best_move is None:
+                print(p2_name, 'has no legal moves left')
+                break
+            coord, direction = best_move
+            stats = computer.get_stats()
+            print(p2_name, 'pushes', *coord, direction)
+            if stats['book']:
+                print('The move is from the opening book')
+            else:
+                print('Searched to depth', stats['depth'], 'at',
+                      int(stats['nodes_per_second']),
+                      'nodes/s with a TT hit rate of',
+                      round(stats['tt_hit_rate'], 2))
+        else:
+            print_hints()
+            name = get_name()
+            coord = get_coordinates()
+            direction = get_direction()
         move = game.make_move(name, coord, direction)
         if not move:
             print('move not valid')
@@ -2,8 +2,11 @@
 # Date        : 2021-06-09
 # Description : Unittests for the KubaGame.py file. Run using make test.
 
+import copy
+import random
 import unittest
-from KubaGame import KubaGame, KubaBoard, KubaPlayer
+from KubaGame import (KubaGame, KubaBoard, KubaBitBoard, KubaPlayer,
+                      KubaPlayout, DIRECTIONS)
 
 class testKubaBoard(unittest.TestCase):
     def test_clone(self):
@@ -33,6 +36,76 @@ class testKubaBoard(unittest.TestCase):
         self.assertEqual(board.get_marble((6, 0)), 'B')
         self.assertEqual(board.get_marble((5, 1)), 'B')
 
+    def test_push(self):
+        board = KubaBoard()
+        self.assertIsNone(board.push(3, 1, 'R')[0])
+        self.assertEqual(board.board[3], [' ', ' ', 'R', 'R', 'R', 'R', 'R'])
+        fallen, hash_change, undo = board.push(3, 2, 'R')
+        self.assertEqual(fallen, 'R')
+        self.assertEqual(board.board[3], [' ', ' ', ' ', 'R', 'R', 'R', 'R'])
+        board.undo_push(undo)
+        self.assertEqual(board.board[3], [' ', ' ', 'R', 'R', 'R', 'R', 'R'])
+        self.assertEqual(board.push(0, 0, 'B')[0], None)
+        self.assertEqual([row[0] for row in board.board],
+                [' ', 'W', 'W', ' ', ' ', 'B', 'B'])
+
+    def test_same_position_and_hash(self):
+        for board_class in (KubaBoard, KubaBitBoard):
+            board, other = board_class(), board_class()
+            self.assertTrue(board.same_position(other))
+            # Boards stay hashable and compare by identity
+            self.assertNotEqual(board, other)
+            self.assertEqual(len({board, other}), 2)
+            other.push(3, 1, 'R')
+            self.assertFalse(board.same_position(other))
+
+class TestKubaBitBoard(unittest.TestCase):
+    def test_clone(self):
+        board = KubaBoard()
+        self.assertEqual(KubaBitBoard().board, board.board)
+        self.assertEqual(KubaBitBoard(board.board).board, board.board)
+        original_board = [ ['R' for _ in range(7)] for _ in range(7) ]
+        self.assertEqual(KubaBitBoard(original_board).board, original_board)
+
+    def test_marble_count(self):
+        self.assertEqual(KubaBitBoard().get_marble_count(), (8, 8, 13))
+
+    def test_get_marble(self):
+        board = KubaBitBoard()
+        self.assertEqual(board.get_marble((0, 0)), 'W')
+        self.assertEqual(board.get_marble((3, 0)), 'X')
+        self.assertEqual(board.get_marble((3, 1)), 'R')
+        self.assertEqual(board.get_marble((6, 0)), 'B')
+        self.assertEqual(board.get_marble((-1, 0)), 'B')
+        with self.assertRaises(IndexError):
+            board.get_marble((7, 0))
+
+    def test_push(self):
+        board = KubaBitBoard()
+        self.assertIsNone(board.push(3, 1, 'R')[0])
+        self.assertEqual(board.board[3], [' ', ' ', 'R', 'R', 'R', 'R', 'R'])
+        self.assertEqual(board.push(3, 2, 'R')[0], 'R')
+        self.assertEqual(board.board[3], [' ', ' ', ' ', 'R', 'R', 'R', 'R'])
+        fallen, hash_change, undo = board.push(6, 6, 'F')
+        self.assertIsNone(fallen)
+        self.assertEqual(board.get_marble((5, 6)), 'W')
+        self.assertEqual(board.get_marble((4, 6)), 'W')
+        self.assertEqual(board.get_marble((6, 6)), 'X')
+        before = board.zobrist_hash() ^ hash_change
+        board.undo_push(undo)
+        self.assertEqual(board.zobrist_hash(), before)
+        self.assertEqual(board.get_marble((6, 6)), 'W')
+
+    def test_can_push(self):
+        board = KubaBitBoard()
+        self.assertTrue(board.can_push(0, 0, 'R', 'W'))
+        self.assertFalse(board.can_push(0, 1, 'R', 'W'))   # blocked
+        self.assertFalse(board.can_push(0, 0, 'R', 'B'))   # not their marble
+        self.assertFalse(board.can_push(6, 5, 'L', 'W'))   # blocked
+        self.assertFalse(board.can_push(5, 6, 'F', 'W'))   # blocked
+        self.assertFalse(board.can_push(1, 0, 'B', 'W'))   # blocked
+        self.assertFalse(board.can_push(0, 0, 'X', 'W'))   # bad direction
+
 class TestKubaPlayer(unittest.TestCase):
     def test_player(self):
         p1 = KubaPlayer(('ethan', 'B'))
@@ -42,6 +115,41 @@ class TestKubaPlayer(unittest.TestCase):
         self.assertIsNone(p1.increment_captured_count())
         self.assertEqual(p1.get_captured_count(), 1)
 
+class TestKubaPlayout(unittest.TestCase):
+    def test_matches_game(self):
+        rand = random.Random(11)
+        for _ in range(30):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+            playout = game.playout()
+            for _ in range(200):
+                name = game.get_current_turn() or rand.choice(('ann', 'bob'))
+                legal = game.legal_moves(name)
+                self.assertEqual(playout.legal_moves(name), legal)
+                if legal and rand.random() < 0.8:
+                    coordinates, direction = rand.choice(legal)
+                else:
+                    name = rand.choice(('ann', 'bob'))
+                    coordinates = (rand.randrange(-1, 8),
+                                   rand.randrange(-1, 8))
+                    direction = rand.choice('LRFBX')
+                self.assertEqual(game.make_move(name, coordinates, direction),
+                        playout.make_move(name, coordinates, direction))
+                self.assertEqual(playout.get_state(), game.get_state())
+                self.assertEqual(playout.get_winner(), game.get_winner())
+                self.assertEqual(playout.get_current_turn(),
+                        game.get_current_turn())
+                self.assertEqual(playout.get_marble_count(),
+                        game.get_marble_count())
+
+    def test_state_round_trip(self):
+        playout = KubaPlayout(('ann', 'W'), ('bob', 'B'))
+        self.assertTrue(playout.make_move('bob', (6, 0), 'R'))
+        self.assertFalse(playout.make_move('bob', (6, 1), 'R'))
+        self.assertEqual(playout.get_marble((6, 0)), 'X')
+        game = KubaGame.from_state(*playout.get_players(), playout.get_state())
+        self.assertEqual(game.get_current_turn(), 'ann')
+        self.assertEqual(game.playout().get_state(), playout.get_state())
+
 class TestKubaGame(unittest.TestCase):
 
     def test_readme_example(self):
@@ -242,6 +350,402 @@ class TestKubaGame(unittest.TestCase):
         self.assertTrue(game.make_move('ann', (3,6), 'L'))
         self.assertFalse(game.make_move('bob', (3,0), 'R'))
 
+    def test_bitboard_matches_board(self):
+        rand = random.Random(7)
+        for _ in range(50):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'))
+            fast_game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+            for _ in range(300):
+                name = rand.choice(('ann', 'bob'))
+                coordinates = (rand.randrange(-1, 8), rand.randrange(-1, 8))
+                direction = rand.choice('LRFB')
+                self.assertEqual(game.make_move(name, coordinates, direction),
+                        fast_game.make_move(name, coordinates, direction))
+                self.assertEqual(game._board.board, fast_game._board.board)
+                self.assertEqual(game.get_marble_count(),
+                        fast_game.get_marble_count())
+                self.assertEqual(game.get_captured('ann'),
+                        fast_game.get_captured('ann'))
+                self.assertEqual(game.get_winner(), fast_game.get_winner())
+                self.assertEqual(game.get_current_turn(),
+                        fast_game.get_current_turn())
+
+    def test_legal_moves_start(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertEqual(game.legal_moves(), [])
+        moves = game.legal_moves('ann')
+        self.assertIn(((0, 0), 'R'), moves)
+        self.assertIn(((6, 6), 'F'), moves)
+        self.assertNotIn(((0, 1), 'R'), moves)
+        self.assertEqual(len(moves), 8)
+        self.assertEqual(moves, KubaGame(('ann', 'W'), ('bob', 'B'),
+                bitboard=True).legal_moves('ann'))
+        self.assertIsNone(game.get_current_turn())
+        self.assertTrue(game.make_move('ann', (0, 0), 'R'))
+        self.assertEqual(game.legal_moves('ann'), [])
+
+    def test_legal_moves_cant_undo(self):
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            self.assertTrue(game.make_move('ann', (0,0), 'B'))
+            self.assertTrue(game.make_move('bob', (6,0), 'F'))
+            self.assertTrue(game.make_move('ann', (1,0), 'B'))
+            self.assertTrue(game.make_move('bob', (5,0), 'F'))
+            self.assertNotIn(((1, 0), 'B'), game.legal_moves())
+            self.assertIn(((6, 6), 'F'), game.legal_moves())
+
+    def test_legal_moves_match_make_move(self):
+        rand = random.Random(11)
+        for bitboard in (False, True):
+            for _ in range(2):
+                game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+                name = 'ann'
+                for _ in range(20):
+                    expected = []
+                    for row in range(7):
+                        for col in range(7):
+                            for direction in DIRECTIONS:
+                                trial = copy.deepcopy(game)
+                                if trial.make_move(name, (row, col), direction):
+                                    expected.append(((row, col), direction))
+                    moves = game.legal_moves(name)
+                    self.assertEqual(moves, expected)
+                    if not moves:
+                        break
+                    self.assertTrue(game.make_move(name, *rand.choice(moves)))
+                    name = game.get_current_turn()
+
+    def test_validate_moves(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        moves = [(6, 6, 'F'), (6, 6, 'L'), (6, 5, 'F'), (0, 6, 'L'),
+                 (7, 0, 'R'), (3, 3, 'R'), (6, 6, 'X')]
+        self.assertEqual(game.validate_moves(moves), ['wrong_turn'] * 7)
+        self.assertEqual(game.validate_moves(moves, 'ann'), [
+            None, None, None, 'wrong_color', 'out_of_range', 'wrong_color',
+            'bad_direction'])
+        # The rows of a NumPy array holding numbers and letters are strings
+        self.assertEqual(game.validate_moves(
+            [tuple(str(value) for value in move) for move in moves]
+            + [('6.0', '6', 'F'), ('', '6', 'F')], 'ann'), [
+            None, None, None, 'wrong_color', 'out_of_range', 'wrong_color',
+            'bad_direction', 'out_of_range', 'out_of_range'])
+        game.make_move('ann', (0, 0), 'B')
+        game.make_move('bob', (6, 0), 'F')
+        game.make_move('ann', (1, 0), 'B')
+        game.make_move('bob', (5, 0), 'F')
+        self.assertEqual(game.validate_moves([(1, 0, 'B'), (6, 6, 'F')]),
+                         ['undo_rule', None])
+        self.assertEqual(game.validate_moves([(6, 6, 'F')], 'bob'),
+                         ['wrong_turn'])
+
+        rand = random.Random(19)
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            for _ in range(40):
+                name = game.get_current_turn() or 'ann'
+                moves = [(rand.randrange(-1, 8), rand.randrange(-1, 8),
+                          rand.choice('LRFBX')) for _ in range(30)]
+                moves += [(row, col, direction) for (row, col), direction
+                          in game.legal_moves(name)]
+                moves.append((game._last_move or (0, 0, 'R'))[:2] + ('L',))
+                results = game.validate_moves(moves, name)
+                for move, result in zip(moves, results):
+                    other = game.copy()
+                    stats = other.enable_stats()
+                    accepted = other.make_move(name, move[:2], move[2])
+                    self.assertEqual(accepted, result is None)
+                    if not accepted:
+                        self.assertEqual(stats.snapshot()['rejections'][result],
+                                         1)
+                legal = [move for move, result in zip(moves, results)
+                         if result is None]
+                if not legal:
+                    break
+                move = rand.choice(legal)
+                game.make_move(name, move[:2], move[2])
+
+        # A marble with an empty cell behind it is not blocked
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            game.make_move('ann', (6, 5), 'F')
+            game.make_move('bob', (6, 0), 'F')
+            ann = game._player_info['ann']
+            self.assertIsNone(game._rejection_reason(ann, 5, 5, 'F'))
+            self.assertEqual(game._rejection_reason(ann, 4, 5, 'F'), 'blocked')
+
+    def test_zobrist_hash_is_incremental(self):
+        rand = random.Random(5)
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            name = 'ann'
+            for _ in range(60):
+                moves = game.legal_moves(name)
+                if not moves:
+                    break
+                self.assertTrue(game.make_move(name, *rand.choice(moves)))
+                self.assertEqual(game._hash, game._board.zobrist_hash())
+                self.assertEqual(game._old_hash, game._old_board.zobrist_hash())
+                self.assertEqual(game._hash,
+                        KubaBoard(game._board.board).zobrist_hash())
+                name = game.get_current_turn()
+
+    def test_undo_rule_with_hash_collision(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertTrue(game.make_move('ann', (0, 0), 'R'))
+        # Pretend the board after bob's move collides with the old board
+        trial = copy.deepcopy(game)
+        self.assertTrue(trial.make_move('bob', (6, 0), 'R'))
+        game._old_hash = trial._hash
+        self.assertTrue(game.make_move('bob', (6, 0), 'R'))
+
+    def test_position_key(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        other = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+        self.assertEqual(game.position_key(), other.position_key())
+        self.assertTrue(game.make_move('ann', (0, 0), 'R'))
+        self.assertNotEqual(game.position_key(), other.position_key())
+        self.assertTrue(other.make_move('ann', (0, 0), 'R'))
+        self.assertEqual(game.position_key(), other.position_key())
+
+        # Same board but a different player to move
+        other._turn = 'ann'
+        self.assertNotEqual(game.position_key(), other.position_key())
+
+    def test_push_and_pop(self):
+        rand = random.Random(3)
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            reference = KubaGame(('ann', 'W'), ('bob', 'B'))
+            self.assertTrue(game.make_move('bob', (6, 0), 'R'))
+            self.assertTrue(reference.make_move('bob', (6, 0), 'R'))
+            states = []
+            for _ in range(80):
+                moves = game.legal_moves()
+                if not moves:
+                    break
+                states.append((copy.deepcopy(game._board.board),
+                        copy.deepcopy(game._old_board.board), game._hash,
+                        game._old_hash, game._turn, game._winner,
+                        game.get_captured('ann'), game.get_captured('bob')))
+                move = rand.choice(moves)
+                self.assertTrue(reference.make_move(game.get_current_turn(), *move))
+                game.push(move)
+                self.assertEqual(game._board.board, reference._board.board)
+                self.assertEqual(game._old_board.board,
+                        reference._old_board.board)
+                self.assertEqual(game.position_key(), reference.position_key())
+                self.assertEqual(game.get_winner(), reference.get_winner())
+                self.assertEqual(game.get_captured('ann'),
+                        reference.get_captured('ann'))
+                self.assertEqual(game.legal_moves(), reference.legal_moves())
+            while states:
+                game.pop()
+                state = states.pop()
+                self.assertEqual((game._board.board, game._old_board.board,
+                        game._hash, game._old_hash, game._turn, game._winner,
+                        game.get_captured('ann'), game.get_captured('bob')),
+                        state)
+
+    def test_push_first_move(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        game.push(((6, 0), 'R'))
+        self.assertEqual(game.get_current_turn(), 'ann')
+        self.assertEqual(game.pop(), ((6, 0), 'R'))
+        self.assertIsNone(game.get_current_turn())
+        self.assertEqual(game._board.board, KubaBoard().board)
+
+    def test_state_round_trip(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertTrue(game.make_move('ann', (0, 0), 'R'))
+        self.assertTrue(game.make_move('bob', (6, 0), 'R'))
+        state = game.get_state()
+        self.assertEqual(state[6:], (0, None, 0, 0, (6, 0, 'R')))
+        for bitboard in (False, True):
+            other = KubaGame.from_state(('ann', 'W'), ('bob', 'B'), state,
+                    bitboard=bitboard)
+            self.assertEqual(other._board.board, game._board.board)
+            self.assertEqual(other._old_board.board, game._old_board.board)
+            self.assertEqual(other.position_key(), game.position_key())
+            self.assertEqual(other.legal_moves(), game.legal_moves())
+            self.assertEqual(other.get_state(), state)
+            other.push(other.legal_moves()[0])
+            self.assertEqual(game.get_state(), state)
+
+    def test_copy(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertTrue(game.make_move('ann', (0, 0), 'R'))
+        other = game.copy(bitboard=True)
+        self.assertEqual(other.get_state(), game.get_state())
+        self.assertEqual(other.get_players(), [('ann', 'W'), ('bob', 'B')])
+        self.assertTrue(other.make_move('bob', (6, 0), 'R'))
+        self.assertEqual(game.get_current_turn(), 'bob')
+        self.assertEqual(game.get_marble((6, 0)), 'B')
+
+    def test_undo_and_redo(self):
+        rand = random.Random(5)
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            name = 'ann'
+            states = [game.get_state()]
+            moves = []
+            for _ in range(60):
+                legal = game.legal_moves(name)
+                if not legal or game.get_winner() is not None:
+                    break
+                move = rand.choice(legal)
+                self.assertTrue(game.make_move(name, *move))
+                moves.append((name, move))
+                states.append(game.get_state())
+                name = game.get_current_turn()
+            self.assertEqual(game.get_history(), moves)
+            for name, move in reversed(moves):
+                self.assertEqual(game.undo(), move)
+                states.pop()
+                self.assertEqual(game.get_state(), states[-1])
+            self.assertIsNone(game.undo())
+            self.assertIsNone(game.get_current_turn())
+            self.assertEqual(game.get_repetitions(), 1)
+            for name, move in moves[:10]:
+                self.assertEqual(game.redo(), move)
+            self.assertEqual(game.get_history(), moves[:10])
+            self.assertEqual(game.undo(), moves[9][1])
+            name, move = moves[9]
+            self.assertTrue(game.make_move(name, *move))
+            self.assertIsNone(game.redo())  # make_move forgets the redo moves
+
+    def test_undo_after_push(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+        self.assertTrue(game.make_move('ann', (6, 6), 'F'))
+        state = game.get_state()
+        game.push(game.legal_moves()[0])
+        with self.assertRaises(ValueError):
+            game.undo()
+        game.pop()
+        self.assertEqual(game.get_state(), state)
+        self.assertEqual(game.undo(), ((6, 6), 'F'))
+
+    def test_repetition_draw(self):
+        # Both players keep pushing their corner marbles back and forth
+        cycle = [('ann', (6, 6), 'F'), ('bob', (6, 0), 'R'),
+                 ('ann', (4, 6), 'B'), ('bob', (6, 2), 'L')]
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        game.set_draw_policy(repetitions=3)
+        for move in cycle * 2:
+            self.assertTrue(game.make_move(*move))
+        self.assertFalse(game.is_draw())
+        self.assertEqual(game.get_repetitions(), 2)
+        # The position after the first move comes up for the third time
+        self.assertTrue(game.make_move(*cycle[0]))
+        self.assertEqual(game.get_repetitions(), 3)
+        self.assertTrue(game.is_draw())
+        self.assertIsNone(game.get_winner())
+        self.assertEqual(game.legal_moves(), [])
+        self.assertFalse(game.make_move(*cycle[1]))
+        game.undo()
+        self.assertFalse(game.is_draw())
+        self.assertEqual(game.get_repetitions(), 2)
+        self.assertTrue(game.make_move(*cycle[0]))
+        self.assertTrue(game.is_draw())
+
+    def test_move_cap_draw(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        game.set_draw_policy(max_moves=2)
+        self.assertTrue(game.make_move('ann', (6, 6), 'F'))
+        self.assertFalse(game.is_draw())
+        self.assertTrue(game.make_move('bob', (6, 0), 'R'))
+        self.assertTrue(game.is_draw())
+        self.assertFalse(game.make_move('ann', (4, 6), 'B'))
+
+    def test_move_cap_survives_copy_and_push(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+        game.set_draw_policy(max_moves=4)
+        self.assertTrue(game.make_move('ann', (6, 6), 'F'))
+        self.assertTrue(game.make_move('bob', (6, 0), 'R'))
+        copy = game.copy()
+        self.assertEqual(copy.get_move_count(), 2)
+        self.assertTrue(copy.make_move('ann', (4, 6), 'B'))
+        self.assertFalse(copy.is_draw())
+        self.assertTrue(copy.make_move('bob', (6, 1), 'F'))
+        self.assertTrue(copy.is_draw())
+
+        # Moves made with push count too, and undo and pop take them back
+        game.push(((4, 6), 'B'))
+        self.assertEqual(game.get_move_count(), 3)
+        self.assertTrue(game.make_move('bob', (6, 1), 'F'))
+        self.assertTrue(game.is_draw())
+        self.assertEqual(game.undo(), ((6, 1), 'F'))
+        self.assertEqual(game.get_move_count(), 3)
+        other = KubaGame.from_state(('ann', 'W'), ('bob', 'B'),
+                                    game.get_state(), move_count=3)
+        other.set_draw_policy(max_moves=4)
+        self.assertTrue(other.make_move('bob', (6, 1), 'F'))
+        self.assertTrue(other.is_draw())
+
+    def test_incremental_marble_count(self):
+        rand = random.Random(18)
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            for _ in range(200):
+                name = game.get_current_turn() or 'ann'
+                moves = game.legal_moves(name)
+                if not moves:
+                    break
+                action = rand.random()
+                if action < 0.1:
+                    game.undo()
+                elif action < 0.3:
+                    game.push(rand.choice(moves))
+                    self.assertEqual(game.get_marble_count(),
+                            game._board.get_marble_count())
+                    game.pop()
+                else:
+                    self.assertTrue(game.make_move(name, *rand.choice(moves)))
+                self.assertEqual(game.get_marble_count(),
+                        game._board.get_marble_count())
+
+    def test_features(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        features = game.get_features('ann')
+        self.assertEqual(features['marbles'], 8)
+        self.assertEqual(features['red'], 13)
+        self.assertEqual(features['edge'], 6)
+        self.assertEqual(features['mobility'], 8)
+        self.assertEqual(features['exposed'], 0)
+        self.assertEqual(features['opponent_mobility'], 8)
+        self.assertEqual(game.get_features('bob')['opponent_edge'], 6)
+
+        edges = {'L': lambda row, col: (row, 0), 'R': lambda row, col: (row, 6),
+                 'F': lambda row, col: (0, col), 'B': lambda row, col: (6, col)}
+        rand = random.Random(5)
+        for _ in range(60):
+            name = game.get_current_turn() or 'ann'
+            moves = game.legal_moves(name)
+            if not moves:
+                break
+            game.make_move(name, *rand.choice(moves))
+            name = game.get_current_turn()
+            features = game.get_features()
+            self.assertEqual(features, game.copy(bitboard=True).get_features())
+            # Compare with pushing every candidate move of both players
+            board = game._board
+            fallen = {}
+            for player in (name, game.get_opponent(name)):
+                color = game.get_color(player)
+                moves = board.candidate_moves(color)
+                cells = {edges[direction](row, col)
+                         for (row, col), direction in moves
+                         if board.pushed_off(row, col, direction)}
+                fallen[color] = [board.get_marble(cell) for cell in cells]
+                self.assertEqual(game.get_features(player)['mobility'],
+                        len(moves))
+            color = game.get_color(name)
+            other = game.get_color(game.get_opponent(name))
+            self.assertEqual(features['capturable'], fallen[color].count('R'))
+            self.assertEqual(features['threats'], fallen[color].count(other))
+            self.assertEqual(features['exposed'], fallen[other].count(color))
+            self.assertEqual(features['opponent_capturable'],
+                    fallen[other].count('R'))
+
     def test_transpose_matrix(self):
         game = KubaGame(('ann', 'W'), ('bob', 'B'))
         matrix = [
@@ -0,0 +1,122 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_batch.py file. Run using make test.
+
+import unittest
+from KubaGame import KubaGame, index_to_move, move_to_index
+
+try:
+    import numpy as np
+except ImportError:         # NumPy is only needed by the batched modules
+    np = None
+else:
+    from kuba_batch import KubaBatch
+
+
+@unittest.skipUnless(np, 'NumPy is not installed')
+class TestKubaBatch(unittest.TestCase):
+    def assertMatches(self, batch, games):
+        counts = batch.get_marble_counts()
+        for index, game in enumerate(games):
+            other = batch.get_game(index)
+            self.assertEqual(other._board.board, game._board.board)
+            self.assertEqual(other._old_board.board, game._old_board.board)
+            self.assertEqual(other.get_current_turn(), game.get_current_turn())
+            self.assertEqual(other.get_winner(), game.get_winner())
+            self.assertEqual(other.get_captured('ann'), game.get_captured('ann'))
+            self.assertEqual(other.get_captured('bob'), game.get_captured('bob'))
+            self.assertEqual(tuple(counts[index]), game.get_marble_count())
+
+    def test_start(self):
+        batch = KubaBatch(3, ('ann', 'W'), ('bob', 'B'))
+        self.assertEqual(batch.get_boards().shape, (3, 7, 7))
+        self.assertEqual(batch.get_marble_counts().tolist(), [[8, 8, 13]] * 3)
+        self.assertEqual(batch.get_game(0)._board.board,
+                KubaGame(('ann', 'W'), ('bob', 'B'))._board.board)
+        self.assertFalse(batch.legal_move_mask().any())
+
+    def test_random_moves_match_make_move(self):
+        rand = np.random.default_rng(1)
+        size = 40
+        batch = KubaBatch(size, ('ann', 'W'), ('bob', 'B'))
+        games = [KubaGame(('ann', 'W'), ('bob', 'B')) for _ in range(size)]
+        names = ['ann', 'bob']
+        for step in range(150):
+            players = rand.integers(0, 2, size)
+            moves = rand.integers(-2, 198, size)
+            if step % 2:
+                # Half of the steps use legal moves so games get somewhere
+                mask = batch.legal_move_mask()
+                for index in range(size):
+                    legal = np.nonzero(mask[index])[0]
+                    if len(legal):
+                        players[index] = batch.get_turns()[index]
+                        moves[index] = rand.choice(legal)
+            made = batch.make_moves(players, moves)
+            for index, game in enumerate(games):
+                if 0 <= moves[index] < 196:
+                    expected = game.make_move(names[players[index]],
+                            *index_to_move(int(moves[index])))
+                else:
+                    expected = game.make_move(names[players[index]], (7, 0), 'L')
+                self.assertEqual(made[index], expected)
+        self.assertMatches(batch, games)
+        self.assertGreater(batch.get_captured().sum(), 0)
+
+    def test_legal_move_mask(self):
+        rand = np.random.default_rng(2)
+        size = 10
+        batch = KubaBatch(size, ('ann', 'W'), ('bob', 'B'))
+        games = [KubaGame(('ann', 'W'), ('bob', 'B')) for _ in range(size)]
+        mask = batch.legal_move_mask(np.zeros(size))
+        for index, game in enumerate(games):
+            expected = [move_to_index(move) for move in game.legal_moves('ann')]
+            self.assertEqual(np.nonzero(mask[index])[0].tolist(), expected)
+        for _ in range(40):
+            mask = batch.legal_move_mask(np.where(batch.get_turns() < 0, 0,
+                    batch.get_turns()))
+            players = np.where(batch.get_turns() < 0, 0, batch.get_turns())
+            moves = np.zeros(size, dtype=int)
+            for index, game in enumerate(games):
+                expected = [move_to_index(move) for move in
+                        game.legal_moves(game.get_current_turn() or 'ann')]
+                self.assertEqual(np.nonzero(mask[index])[0].tolist(), expected)
+                if expected:
+                    moves[index] = rand.choice(expected)
+                    game.make_move(game.get_current_turn() or 'ann',
+                            *index_to_move(int(moves[index])))
+            batch.make_moves(players, moves)
+        self.assertMatches(batch, games)
+
+    def test_reset(self):
+        batch = KubaBatch(2, ('ann', 'W'), ('bob', 'B'))
+        self.assertTrue(batch.make_moves([0, 1], [move_to_index(((0, 0), 'R')),
+                move_to_index(((6, 0), 'R'))]).all())
+        batch.reset([1])
+        self.assertEqual(batch.get_turns().tolist(), [1, -1])
+        self.assertEqual(batch.get_game(1)._board.board,
+                KubaGame(('ann', 'W'), ('bob', 'B'))._board.board)
+
+    def test_from_states_and_take(self):
+        rand = np.random.default_rng(3)
+        games = []
+        for index in range(6):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+            for _ in range(index * 5):
+                moves = game.legal_moves(game.get_current_turn() or 'ann')
+                if not moves:
+                    break
+                game.make_move(game.get_current_turn() or 'ann',
+                        *moves[rand.integers(len(moves))])
+            games.append(game)
+        batch = KubaBatch.from_states(('ann', 'W'), ('bob', 'B'),
+                [game.get_state() for game in games])
+        self.assertMatches(batch, games)
+        subset = batch.take([4, 1, 1])
+        self.assertMatches(subset, [games[4], games[1], games[1]])
+        subset.reset([0])
+        self.assertMatches(batch, games)
+
+
+if __name__ == '__main__':
+    unittest.main()
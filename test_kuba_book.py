@@ -0,0 +1,122 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_book.py file. Run using make test.
+
+import os
+import random
+import tempfile
+import unittest
+from KubaGame import KubaGame
+from kuba_book import KubaOpeningBook, build_book
+from kuba_records import KubaRecordWriter
+from kuba_search import KubaSearchPlayer
+
+
+def opening(seed, moves=6):
+    """Returns the first moves of a random game starting with ann"""
+    rand = random.Random(seed)
+    game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+    name = 'ann'
+    played = []
+    for _ in range(moves):
+        move = rand.choice(game.legal_moves(name))
+        game.make_move(name, *move)
+        played.append(move)
+        name = game.get_current_turn()
+    return played
+
+
+class TestKubaOpeningBook(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.records = os.path.join(directory.name, 'games.kuba')
+        self.path = os.path.join(directory.name, 'book.kbb')
+
+    def test_statistics(self):
+        # Pushing (0, 0) right is (6, 6) forward mirrored along the
+        # antidiagonal, so both openings reach the same book position.
+        with KubaRecordWriter(self.records) as writer:
+            for _ in range(3):
+                writer.write(('ann', 'W'), ('bob', 'B'),
+                             [((6, 6), 'F'), ((6, 0), 'R')])
+            writer.write(('ann', 'W'), ('bob', 'B'),
+                         [((0, 0), 'R'), ((6, 0), 'F')])
+        self.assertEqual(build_book(self.path, [self.records], plies=2), 3)
+        with KubaOpeningBook(self.path) as book:
+            self.assertEqual(len(book), 3)
+            self.assertEqual(book.get_plies(), 2)
+            game = KubaGame(('ann', 'W'), ('bob', 'B'))
+            moves = book.lookup(game)
+            self.assertEqual([book_move.move for book_move in moves],
+                             [((6, 6), 'F'), ((0, 0), 'R')])
+            self.assertEqual(moves[0].games, 3)
+            self.assertEqual(moves[0].wins, 0)
+            self.assertEqual(moves[0].average_captured, 0)
+            game.make_move('ann', (0, 0), 'R')
+            moves = book.lookup(game)
+            self.assertEqual(len(moves), 1)
+            self.assertEqual(moves[0].move, ((6, 0), 'F'))
+            self.assertEqual(moves[0].games, 4)
+            game.make_move('bob', (6, 0), 'F')
+            self.assertEqual(book.lookup(game), [])
+
+    def test_symmetric_positions(self):
+        # Pushing (0, 0) right is (6, 6) left turned half way around
+        with KubaRecordWriter(self.records) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'),
+                         [((6, 6), 'L'), ((0, 6), 'L')])
+        build_book(self.path, [self.records], plies=2)
+        with KubaOpeningBook(self.path) as book:
+            game = KubaGame(('ann', 'W'), ('bob', 'B'))
+            game.make_move('ann', (0, 0), 'R')
+            self.assertEqual(book.lookup(game)[0].move, ((6, 0), 'R'))
+            # The players passed the other way around
+            game = KubaGame(('bob', 'B'), ('ann', 'W'))
+            game.make_move('ann', (6, 6), 'L')
+            self.assertEqual(book.lookup(game)[0].move, ((0, 6), 'L'))
+
+    def test_first_mover(self):
+        # bob (B) moves first. Playing with the colors swapped is a symmetry,
+        # so ann (W) is shown the same opening with a white marble.
+        with KubaRecordWriter(self.records) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'),
+                         [((0, 6), 'B'), ((6, 6), 'F')], first=1)
+        build_book(self.path, [self.records], plies=2)
+        with KubaOpeningBook(self.path) as book:
+            game = KubaGame(('ann', 'W'), ('bob', 'B'))
+            for name, move in (('bob', ((0, 6), 'B')),
+                               ('ann', ((0, 0), 'R'))):
+                moves = book.lookup(game, name)
+                self.assertEqual([book_move.move for book_move in moves],
+                                 [move])
+                self.assertEqual(game.get_marble(move[0]),
+                                 game.get_color(name))
+            self.assertEqual(book.best_move(game), ((0, 0), 'R'))
+            self.assertEqual(book.best_move(game, player_name='bob'),
+                             ((0, 6), 'B'))
+
+    def test_search_player(self):
+        with KubaRecordWriter(self.records) as writer:
+            for seed in range(20):
+                writer.write(('ann', 'W'), ('bob', 'B'), opening(seed))
+        build_book(self.path, [self.records], plies=6)
+        with KubaOpeningBook(self.path) as book:
+            game = KubaGame(('ann', 'W'), ('bob', 'B'))
+            game.make_move('ann', *opening(0)[0])
+            player = KubaSearchPlayer(time_limit_ms=50, book=book)
+            move = player.choose_move(game)
+            self.assertIn(move, [book_move.move
+                                 for book_move in book.lookup(game)])
+            self.assertTrue(player.get_stats()['book'])
+            self.assertEqual(player.get_stats()['nodes'], 0)
+
+    def test_not_a_book(self):
+        with open(self.path, 'wb') as other:
+            other.write(b'KUBA' + bytes(20))
+        with self.assertRaises(ValueError):
+            KubaOpeningBook(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
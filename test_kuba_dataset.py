@@ -0,0 +1,95 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_dataset.py file. Run using make test.
+
+import tempfile
+import unittest
+from KubaGame import KubaGame, move_to_index
+from kuba_records import KubaRecord
+
+try:
+    import numpy as np
+except ImportError:         # NumPy is only needed by the batched modules
+    np = None
+else:
+    from kuba_dataset import (PLANES, build_planes, game_samples,
+                              load_shards, self_play_records, write_dataset)
+
+
+@unittest.skipUnless(np, 'NumPy is not installed')
+class TestKubaDataset(unittest.TestCase):
+    def test_planes_match_board(self):
+        game = KubaGame(('ann', 'B'), ('bob', 'W'), bitboard=True)
+        game.make_move('ann', (6, 0), 'F')
+        planes = build_planes([game.get_state()[:6]], [True])[0]
+        self.assertEqual(planes.shape, (len(PLANES), 7, 7))
+        board = game._board.board
+        old_board = game._old_board.board
+        for row in range(7):
+            for col in range(7):
+                self.assertEqual(planes[0, row, col], board[row][col] == 'W')
+                self.assertEqual(planes[1, row, col], board[row][col] == 'B')
+                self.assertEqual(planes[2, row, col], board[row][col] == 'R')
+                self.assertEqual(planes[3, row, col], board[row][col] == ' ')
+                self.assertEqual(planes[5, row, col],
+                                 old_board[row][col] == 'B')
+        self.assertTrue(planes[7].all())
+        black = build_planes([game.get_state()[:6]], [False])[0]
+        self.assertTrue((black[0] == planes[1]).all())
+        self.assertFalse(black[7].any())
+
+    def test_game_samples(self):
+        moves = [((6, 6), 'F'), ((6, 0), 'R'), ((4, 6), 'B')]
+        record = KubaRecord(('ann', 'W'), ('bob', 'B'), 1,
+                            bytes(move_to_index(move) for move in moves))
+        with self.assertRaises(ValueError):
+            game_samples(record)
+        record = KubaRecord(('ann', 'W'), ('bob', 'B'), 0,
+                            bytes(move_to_index(move) for move in moves))
+        samples, outcomes, captured = game_samples(record)
+        self.assertEqual(len(samples), 3)
+        self.assertEqual([white for _, white, _, _ in samples],
+                         [True, False, True])
+        self.assertEqual(len(samples[0][2]), 8)
+        self.assertEqual(outcomes, [0, 0, 0])
+        self.assertEqual(captured, [(0, 0)] * 3)
+
+    def test_write_and_load(self):
+        records = list(self_play_records(3, max_moves=40))
+        total = sum(len(record.moves) for record in records)
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(write_dataset(directory, records, shard_size=32),
+                             total)
+            shards = list(load_shards(directory))
+            self.assertEqual(len(shards), (total + 31) // 32)
+            self.assertEqual(sum(len(shard['moves']) for shard in shards),
+                             total)
+            for shard in shards:
+                self.assertIsInstance(shard['planes'], np.memmap)
+                rows = np.arange(len(shard['moves']))
+                # The move that was played is always legal
+                self.assertTrue(shard['masks'][rows, shard['moves']].all())
+                self.assertTrue(set(np.unique(shard['outcomes'])) <= {-1, 0, 1})
+            first = shards[0]
+            game = KubaGame(('white', 'W'), ('black', 'B'))
+            self.assertEqual(first['masks'][0].sum(), 8)
+            self.assertTrue((first['planes'][0, 3] == np.array(
+                [[cell == ' ' for cell in row] for row in game._board.board])
+                ).all())
+            del shards, first, shard
+
+            # A second export into the same directory needs overwrite
+            with self.assertRaises(FileExistsError):
+                write_dataset(directory, records[:1], shard_size=32)
+            self.assertEqual(len(list(load_shards(directory))),
+                             (total + 31) // 32)
+            smaller = len(records[0].moves)
+            self.assertEqual(write_dataset(directory, records[:1],
+                                           shard_size=32, overwrite=True),
+                             smaller)
+            self.assertEqual(sum(len(shard['moves'])
+                                 for shard in load_shards(directory)), smaller)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_fuzz.py file. Run using make test.
+
+import unittest
+from unittest import mock
+import kuba_fuzz
+from kuba_fuzz import (ENGINES, KubaFuzzCase, bitboard_engine,
+                       first_difference, fuzz, generate_case,
+                       reference_engine, shrink)
+
+
+def _miscounting_engine(cases):
+    """bitboard_engine that always reports the marble counts of the start"""
+    return [[observation[:2] + (trace[0][2],) + observation[3:]
+             for observation in trace] for trace in bitboard_engine(cases)]
+
+
+def _bits(cells):
+    """Returns the bitboard of the cells (row, col)"""
+    return sum(1 << (7 * row + col) for row, col in cells)
+
+
+class TestKubaFuzz(unittest.TestCase):
+    def test_generate_case(self):
+        case = generate_case(7, length=25)
+        self.assertEqual(case, generate_case(7, length=25))
+        self.assertEqual(len(case.moves), 25)
+        self.assertNotEqual(case, generate_case(8, length=25))
+
+    def test_engines_match(self):
+        report = fuzz(['bitboard', 'push', 'state', 'playout'], cases=20,
+                      length=30, workers=1, chunk_size=8)
+        self.assertEqual(report.failures, [])
+        self.assertEqual((report.cases, report.steps), (20, 600))
+        self.assertEqual(set(report.engine_seconds), {
+            'reference', 'bitboard', 'push', 'state', 'playout'})
+        # The moves are timed without the observations of every move
+        for name, seconds in report.engine_seconds.items():
+            self.assertGreater(report.move_seconds[name], 0)
+            self.assertLess(report.move_seconds[name], seconds)
+
+    def test_default_engines_without_numpy(self):
+        with mock.patch.object(kuba_fuzz, '_has_numpy', return_value=False):
+            with self.assertWarns(UserWarning):
+                report = fuzz(cases=2, length=10, workers=1)
+        self.assertEqual(report.failures, [])
+        self.assertEqual(set(report.engine_seconds),
+                         set(ENGINES) - {'batch'} | {'reference'})
+
+    def test_full_lines(self):
+        # Row 3 is W and six R, row 4 is W W B W W W B, so both pushes move a
+        # whole row and push a marble off of the other end
+        white = _bits([(3, 0), (4, 0), (4, 1), (4, 3), (4, 4), (4, 5)])
+        black = _bits([(4, 2), (4, 6)])
+        red = _bits([(3, col) for col in range(1, 7)])
+        board = (white, black, red)
+        case = KubaFuzzCase(0, (('ann', 'W'), ('bob', 'B')),
+                            board + board + (None, None, 0, 0, None),
+                            [('ann', (3, 0), 'R'), ('bob', (4, 6), 'L')])
+        expected, = reference_engine([case])
+        self.assertEqual(expected[2][1][21:35], 'XWRRRRR' + 'WBWWWBX')
+        self.assertEqual(expected[2][2], (5, 2, 5))
+        self.assertEqual(expected[2][3], (1, 0))
+        for name in ('bitboard', 'push', 'state', 'playout'):
+            actual, = ENGINES[name]([case])
+            self.assertIsNone(first_difference(expected, actual), name)
+
+    def test_shrink(self):
+        self.assertIsNone(shrink(bitboard_engine, generate_case(0)))
+        case = next(case for case in map(generate_case, range(100))
+                    if shrink(_miscounting_engine, case))
+        failure = shrink(_miscounting_engine, case)
+        self.assertLessEqual(len(failure.case.moves), len(case.moves))
+        self.assertEqual(failure.step, len(failure.case.moves))
+        self.assertNotEqual(failure.expected[2], failure.actual[2])
+        moves = failure.case.moves
+        for index in range(len(moves)):
+            smaller = failure.case._replace(
+                moves=moves[:index] + moves[index + 1:])
+            self.assertIsNone(shrink(_miscounting_engine, smaller))
+
+
+if __name__ == '__main__':
+    unittest.main()
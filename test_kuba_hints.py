@@ -0,0 +1,124 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_hints.py file. Run using make test.
+
+import asyncio
+import unittest
+from KubaGame import KubaGame
+from kuba_client import KubaClient, KubaServerError
+from kuba_server import KubaServer
+
+try:
+    import numpy as np
+except ImportError:         # NumPy is only needed by the batched modules
+    np = None
+else:
+    from kuba_hints import (KubaHintService, greedy_evaluator,
+                            search_evaluator)
+
+
+def _job(game, player_name=None):
+    return (game.get_players(), game.get_state(),
+            player_name or game.get_current_turn())
+
+
+@unittest.skipUnless(np, 'NumPy is not installed')
+class TestEvaluators(unittest.TestCase):
+    def test_greedy_matches_one_ply(self):
+        for players in ((('ann', 'W'), ('bob', 'B')),
+                        (('ann', 'B'), ('bob', 'W'))):
+            game = KubaGame(*players, bitboard=True)
+            jobs, expected = [], []
+            for ply in range(40):
+                name = game.get_current_turn() or 'ann'
+                moves = game.legal_moves(name)
+                if not moves:
+                    break
+                scores = [self._score(game, name, move) for move in moves]
+                jobs.append(_job(game, name))
+                expected.append(moves[scores.index(max(scores))])
+                game.make_move(name, *moves[(ply * 7) % len(moves)])
+            self.assertEqual(greedy_evaluator(jobs), expected)
+
+    def test_greedy_without_moves(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertEqual(greedy_evaluator([]), [])
+        self.assertEqual(greedy_evaluator([_job(game, 'ann')]),
+                         [((0, 0), 'R')])
+        game._winner = 'bob'
+        self.assertEqual(greedy_evaluator([_job(game, 'ann')]), [None])
+
+    @staticmethod
+    def _score(game, name, move):
+        child = game.copy()
+        child.make_move(name, *move)
+        opponent = child.get_opponent(name)
+        white, black, _ = child.get_marble_count()
+        own, other = (white, black) if child.get_color(name) == 'W' \
+            else (black, white)
+        return (100 * (child.get_captured(name) - child.get_captured(opponent))
+                + 60 * (own - other) + 100000 * (child.get_winner() == name))
+
+    def test_search_evaluator(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        move, = search_evaluator([_job(game, 'ann')], time_limit_ms=50)
+        self.assertIn(move, game.legal_moves('ann'))
+
+
+@unittest.skipUnless(np, 'NumPy is not installed')
+class TestKubaHintService(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesces_requests(self):
+        sizes = []
+
+        def evaluator(jobs):
+            sizes.append(len(jobs))
+            return greedy_evaluator(jobs)
+
+        games = [KubaGame(('ann', 'W'), ('bob', 'B')) for _ in range(20)]
+        async with KubaHintService(evaluator, max_batch=8,
+                                   max_wait_ms=50) as hints:
+            moves = await asyncio.gather(
+                *(hints.best_move(game, 'ann') for game in games))
+            stats = hints.get_stats()
+        self.assertEqual(sizes, [8, 8, 4])
+        self.assertEqual(len(set(moves)), 1)
+        self.assertEqual(stats['requests'], 20)
+        self.assertEqual(stats['batches'], 3)
+        self.assertEqual(stats['max_queue_depth'], 20)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['latency_ms']['count'], 20)
+        self.assertEqual(dict(map(tuple, stats['batch_size']['buckets']))[8],
+                         2)
+
+    async def test_errors_reach_waiters(self):
+        def evaluator(jobs):
+            raise ValueError('broken')
+
+        async with KubaHintService(evaluator) as hints:
+            with self.assertRaises(ValueError):
+                await hints.best_move(KubaGame(('ann', 'W'), ('bob', 'B')),
+                                      'ann')
+            with self.assertRaises(ValueError):
+                await hints.best_move(KubaGame(('ann', 'W'), ('bob', 'B')))
+
+    async def test_server_hint(self):
+        async with KubaHintService(max_wait_ms=1) as hints:
+            server = KubaServer(port=0, hints=hints)
+            await server.start()
+            client = await KubaClient.connect(port=server.get_port())
+            try:
+                game, _ = await client.create(('ann', 'W'), ('bob', 'B'))
+                await client.move(game, 'ann', (6, 6), 'F')
+                move = await client.hint(game)
+                state = await client.state(game)
+                self.assertIn([move[0][0], move[0][1], move[1]],
+                              state['legal_moves'])
+                with self.assertRaises(KubaServerError):
+                    await client.hint(game, 'carl')
+            finally:
+                await client.close()
+                await server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_mcts.py file. Run using make test.
+
+import unittest
+from KubaGame import KubaGame
+from kuba_mcts import KubaMCTSPlayer
+from kuba_test_games import seven_captures_game
+
+
+class TestKubaMCTSPlayer(unittest.TestCase):
+    def test_finds_winning_move(self):
+        game = seven_captures_game()
+        key = game.position_key()
+        with KubaMCTSPlayer(playouts=200, batch_size=8, workers=1,
+                max_playout_moves=20) as player:
+            self.assertEqual(player.choose_move(game), ((2, 4), 'F'))
+            self.assertEqual(player.get_stats()['playouts'], 200)
+        self.assertEqual(game.position_key(), key)
+
+    def test_same_move_for_any_worker_count(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertTrue(game.make_move('bob', (6, 0), 'R'))
+        moves = []
+        stats = []
+        for workers in (1, 2):
+            with KubaMCTSPlayer(playouts=48, batch_size=16, workers=workers,
+                    seed=5, max_playout_moves=30) as player:
+                moves.append(player.choose_move(game))
+                stats.append(player.get_stats())
+        self.assertEqual(moves[0], moves[1])
+        self.assertEqual(stats[0]['nodes'], stats[1]['nodes'])
+        self.assertIn(moves[0], game.legal_moves())
+
+    def test_no_moves(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        with KubaMCTSPlayer(playouts=10, workers=1) as player:
+            self.assertIsNone(player.choose_move(game))
+
+
+if __name__ == '__main__':
+    unittest.main()
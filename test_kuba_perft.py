@@ -0,0 +1,51 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_perft.py file. Run using make test.
+
+import copy
+import unittest
+from kuba_perft import (PERFT_COUNTS, POSITIONS, compare, make_position,
+                        perft, perft_make_move, run_benchmark)
+
+
+class TestKubaPerft(unittest.TestCase):
+    def test_perft_counts(self):
+        for name in POSITIONS:
+            for bitboard in (False, True):
+                game = make_position(name, bitboard)
+                player = game.get_current_turn() or 'white'
+                counts = [perft(game, depth, player) for depth in range(1, 4)]
+                self.assertEqual(counts, PERFT_COUNTS[name][:3])
+
+    def test_perft_make_move(self):
+        for name in POSITIONS:
+            for bitboard in (False, True):
+                game = make_position(name, bitboard)
+                player = game.get_current_turn() or 'white'
+                self.assertEqual(perft_make_move(game, 2, player),
+                                 PERFT_COUNTS[name][1])
+
+    def test_perft_leaves_game_unchanged(self):
+        game = make_position('middlegame', bitboard=True)
+        state = game.get_state()
+        perft(game, 3)
+        perft_make_move(game, 2)
+        self.assertEqual(game.get_state(), state)
+
+    def test_compare(self):
+        results = run_benchmark(1, ['start'])
+        self.assertEqual(results['mismatches'], [])
+        self.assertEqual(compare(results, results), [])
+
+        faster = copy.deepcopy(results)
+        faster['operations']['list']['make_move'] *= 2
+        self.assertEqual(len(compare(results, faster, 0.1)), 1)
+        self.assertEqual(compare(faster, results, 0.1), [])
+
+        wrong = copy.deepcopy(results)
+        wrong['perft']['start']['list']['counts'] = [7]
+        self.assertEqual(len(compare(results, wrong)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
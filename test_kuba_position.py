@@ -0,0 +1,68 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_position.py file. Run using make test.
+
+import pickle
+import random
+import unittest
+from KubaGame import KubaGame
+from kuba_position import KubaPosition
+
+
+class TestKubaPosition(unittest.TestCase):
+    def test_start(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        position = KubaPosition.from_game(game)
+        self.assertEqual(position.get_turn(), None)
+        self.assertEqual(position.get_winner(), None)
+        self.assertEqual(position.get_last_move(), None)
+        self.assertEqual(position.get_marble((0, 0)), 'W')
+        self.assertEqual(position.get_marble((3, 3)), 'R')
+        self.assertEqual(position.get_marble((0, 2)), ' ')
+        self.assertEqual(position.to_state(), game.get_state())
+        self.assertEqual(position.to_board().board, game._board.board)
+
+    def test_round_trip(self):
+        rand = random.Random(4)
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            name = 'ann'
+            for _ in range(120):
+                moves = game.legal_moves(name)
+                if not moves or game.get_winner() is not None:
+                    break
+                game.make_move(name, *rand.choice(moves))
+                name = game.get_current_turn()
+                position = KubaPosition.from_game(game)
+                self.assertEqual(position.to_state(), game.get_state())
+                other = position.to_game(('ann', 'W'), ('bob', 'B'),
+                                         bitboard=bitboard)
+                self.assertEqual(other.get_state(), game.get_state())
+                self.assertEqual(other.legal_moves(), game.legal_moves())
+                self.assertEqual(other.position_key(), game.position_key())
+                self.assertEqual(KubaPosition.from_bytes(position.to_bytes()),
+                                 position)
+
+    def test_equal_and_hashable(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        game.make_move('ann', (6, 5), 'F')
+        first = KubaPosition.from_game(game)
+        second = KubaPosition.from_game(game.copy(bitboard=True))
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second}), 1)
+        self.assertEqual(first.get_turn(), 1)
+        self.assertEqual(first.get_last_move(), ((6, 5), 'F'))
+        game.make_move('bob', (6, 0), 'F')
+        self.assertNotEqual(KubaPosition.from_game(game), first)
+        self.assertEqual(pickle.loads(pickle.dumps(first)), first)
+
+    def test_immutable(self):
+        position = KubaPosition.from_game(KubaGame(('ann', 'W'), ('bob', 'B')))
+        with self.assertRaises(AttributeError):
+            position._bits = 0
+        with self.assertRaises(AttributeError):
+            position.turn = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
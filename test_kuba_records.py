@@ -0,0 +1,149 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_records.py file. Run using make test.
+
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+import kuba_records
+from KubaGame import KubaGame
+from kuba_records import KubaRecordWriter, read_records
+
+
+def random_game(seed, max_moves=80):
+    """Returns a game and the list of moves of a random game"""
+    rand = random.Random(seed)
+    game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+    moves = []
+    name = 'bob' if seed % 2 else 'ann'
+    while len(moves) < max_moves and game.get_winner() is None:
+        legal = game.legal_moves(name)
+        if not legal:
+            break
+        move = rand.choice(legal)
+        game.make_move(name, *move)
+        moves.append(move)
+        name = game.get_current_turn()
+    return game, moves
+
+
+class TestKubaRecords(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'games.kuba')
+
+    def test_round_trip(self):
+        games = [random_game(seed) for seed in range(5)]
+        with KubaRecordWriter(self.path) as writer:
+            for seed, (_, moves) in enumerate(games):
+                writer.write(('ann', 'W'), ('bob', 'B'), moves, first=seed % 2)
+        records = list(read_records(self.path))
+        self.assertEqual(len(records), 5)
+        for record, (game, moves) in zip(records, games):
+            self.assertEqual(record.player1_info, ('ann', 'W'))
+            self.assertEqual(record.player2_info, ('bob', 'B'))
+            self.assertEqual(record.get_moves(), moves)
+            self.assertEqual(len(record.moves), len(moves))
+            final = record.final_game()
+            self.assertEqual(final.get_state(), game.get_state())
+
+    def test_replay_is_lazy(self):
+        _, moves = random_game(3)
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), moves, first=1)
+        record = next(read_records(self.path))
+        replay = record.replay()
+        move, game = next(replay)
+        self.assertEqual(move, moves[0])
+        self.assertEqual(game.get_current_turn(), 'ann')
+
+    def test_append_and_long_games(self):
+        _, moves = random_game(0, max_moves=200)
+        moves = moves * 2       # More than 127 moves needs a longer count
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('Zoë', 'B'), ('bob', 'W'), [])
+        records = list(read_records(self.path))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].get_moves(), moves)
+        self.assertEqual(records[1].player1_info, ('Zoë', 'B'))
+        self.assertEqual(records[1].moves, b'')
+
+    def test_cut_off_record_is_skipped(self):
+        _, moves = random_game(1)
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+        with open(self.path, 'r+b') as record_file:
+            record_file.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual(len(list(read_records(self.path))), 1)
+
+    def test_append_after_cut_off_record(self):
+        _, moves = random_game(2)
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+        with open(self.path, 'r+b') as record_file:
+            record_file.truncate(os.path.getsize(self.path) - 3)
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('Zoë', 'B'), ('bob', 'W'), moves[:5])
+        records = list(read_records(self.path))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].get_moves(), moves)
+        self.assertEqual(records[1].player1_info, ('Zoë', 'B'))
+        self.assertEqual(records[1].get_moves(), moves[:5])
+
+        # A header cut off by a crash is written again
+        with open(self.path, 'wb') as record_file:
+            record_file.write(b'KU')
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), [])
+        self.assertEqual(len(list(read_records(self.path))), 1)
+
+    def test_index_and_small_chunks(self):
+        _, moves = random_game(4)
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+        first_end = os.path.getsize(self.path)
+        with open(self.path + '.idx', 'rb') as index_file:
+            index = index_file.read()
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+            writer.write(('ann', 'W'), ('bob', 'B'), moves)
+        # Records cut off after the index was written are found from there
+        with open(self.path, 'r+b') as record_file:
+            record_file.truncate(first_end + 20)
+        with open(self.path + '.idx', 'wb') as index_file:
+            index_file.write(index)
+        with mock.patch.object(kuba_records, '_CHUNK', 7):
+            self.assertEqual(kuba_records._complete_length(self.path),
+                             first_end)
+            self.assertEqual([record.get_moves() for record
+                              in read_records(self.path)], [moves])
+        # An index that does not match the file is not trusted
+        with open(self.path + '.idx', 'wb') as index_file:
+            index_file.write(index[:-1] + bytes((index[-1] ^ 1,)))
+        self.assertEqual(kuba_records._complete_length(self.path), first_end)
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as record_file:
+            record_file.write(b'not a record file')
+        with self.assertRaises(ValueError):
+            list(read_records(self.path))
+        with self.assertRaises(ValueError):
+            KubaRecordWriter(self.path)
+
+    def test_invalid_move(self):
+        with KubaRecordWriter(self.path) as writer:
+            writer.write(('ann', 'W'), ('bob', 'B'), [((0, 0), 'L')])
+        record = next(read_records(self.path))
+        with self.assertRaises(ValueError):
+            record.final_game()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_render.py file. Run using make test.
+
+import contextlib
+import io
+import re
+import unittest
+from KubaGame import KubaGame
+from kuba_render import (FRAME_HEIGHT, FRAME_WIDTH, KubaBoardView,
+                         KubaTiledView, render_board)
+
+_CURSOR = re.compile(r'\033\[(\d+);(\d+)H')
+
+
+def _screen(data, height=40, width=80):
+    """Returns the plain text lines a terminal shows after writing data"""
+    screen = [[' '] * width for _ in range(height)]
+    line = column = 0
+    data = re.sub(r'\033\[\d+m|\033\[2J', '', data)
+    position = 0
+    for match in _CURSOR.finditer(data + '\033[1;1H'):
+        for char in data[position:match.start()]:
+            if char == '\n':
+                line, column = line + 1, 0
+            else:
+                screen[line][column] = char
+                column += 1
+        line, column = int(match.group(1)) - 1, int(match.group(2)) - 1
+        position = match.end()
+    return [''.join(row).rstrip() for row in screen]
+
+
+class TestKubaRender(unittest.TestCase):
+    def setUp(self):
+        self.game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.game.make_move('ann', (6, 5), 'F')
+
+    def test_render_board(self):
+        plain = render_board(self.game._board)
+        self.assertEqual(plain.splitlines()[:2],
+                         ['  0 1 2 3 4 5 6', '0 W W       B B '])
+        self.assertEqual(plain.splitlines()[5], '4     R R R W   ')
+        colored = render_board(self.game._board.board, colored=True)
+        lines = colored.splitlines()
+        self.assertEqual(len(lines), FRAME_HEIGHT)
+        self.assertEqual(lines[1], '  | 0 1 2 3 4 5 6 |')
+        self.assertEqual(len(re.sub(r'\033\[\d+m', '', lines[3])),
+                         FRAME_WIDTH)
+        for colored in (False, True):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.game._board.display(colored)
+            self.assertEqual(output.getvalue(),
+                             render_board(self.game._board, colored))
+            bits = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+            bits.make_move('ann', (6, 5), 'F')
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                bits._board.display(colored)
+            self.assertEqual(output.getvalue(),
+                             render_board(self.game._board, colored))
+
+    def test_view_draws_changes(self):
+        view = KubaBoardView(top=2, left=5, colored=False)
+        first = view.draw(self.game._board, 'game 1')
+        screen = _screen(first)
+        self.assertEqual(screen[2], '     game 1')
+        self.assertEqual(screen[6], '     0 | W W       B B |')
+        self.assertEqual(view.draw(self.game._board, 'game 1'), '')
+        self.game.make_move('bob', (6, 0), 'R')
+        changes = view.draw(self.game._board, 'game 1')
+        # Only the cells of row 6 that changed are sent
+        self.assertEqual(_CURSOR.sub('|', changes), '| |B')
+        self.assertEqual(_screen(first + changes)[12],
+                         '     6 |   B B       W |')
+        view.invalidate()
+        self.assertEqual(_screen(view.draw(self.game._board, 'game 1')),
+                         _screen(first + changes))
+
+    def test_tiled_view(self):
+        tiles = KubaTiledView(3, columns=2, colored=False, gap=3)
+        output = io.StringIO()
+        for index in range(3):
+            tiles.update(index, self.game._board, 'game {}'.format(index))
+        self.assertGreater(tiles.flush(output), 0)
+        screen = _screen(output.getvalue())
+        self.assertEqual(screen[0], 'game 0' + ' ' * 17 + 'game 1')
+        self.assertEqual(screen[FRAME_HEIGHT + 1], 'game 2')
+        self.assertTrue(screen[FRAME_HEIGHT + 5].startswith('0 | W W'))
+        self.assertEqual(tiles.flush(output), 0)
+        tiles.update(0, self.game._board, 'game 0')
+        self.assertEqual(tiles.flush(output), 0)
+        self.game.make_move('bob', (6, 0), 'R')
+        tiles.update(2, self.game._board, 'game 2')
+        written = tiles.flush(output)
+        self.assertLess(written, 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_script.py file. Run using make test.
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from kuba_script import format_result, replay_script, run_scripts
+
+SCRIPT = """\
+# Two games and a stray move
+game ann W bob B
+ann 6 5 F
+bob 6 0 R
+bob 6 1 R
+ann 9 9 L
+carl 1 1 R
+ann 5 5
+end
+ann 1 1 L
+
+game x B y W
+y 0 0 R
+x 6 0 F
+game bad W worse W
+"""
+
+
+class TestKubaScript(unittest.TestCase):
+    def test_replay(self):
+        results = list(replay_script(SCRIPT.splitlines(), 'moves.txt'))
+        self.assertEqual(len(results), 4)
+        first, stray, second, bad = results
+        self.assertEqual(first.line, 2)
+        self.assertEqual(first.players, [('ann', 'W'), ('bob', 'B')])
+        self.assertEqual(first.moves, 2)
+        self.assertEqual([(number, reason) for number, _, reason
+                          in first.invalid],
+                         [(5, 'wrong_turn'), (6, 'out_of_range'),
+                          (7, 'unknown player carl'),
+                          (8, 'expected: name row col direction')])
+        self.assertEqual(first.marbles, (8, 8, 13))
+        self.assertIsNone(first.winner)
+        self.assertIsNone(stray.players)
+        self.assertEqual(stray.invalid[0][2], 'move outside of a game')
+        self.assertEqual(second.moves, 2)
+        self.assertEqual(second.captured, {'x': 0, 'y': 0})
+        self.assertIsNone(bad.players)
+        self.assertEqual(bad.line, 15)
+        self.assertIn('moves.txt:2: ann (W) vs bob (B), 2 moves',
+                      format_result(first))
+
+    def test_undo_and_win(self):
+        lines = ['game ann W bob B', 'ann 0 0 B', 'bob 6 0 F', 'ann 1 0 B',
+                 'bob 5 0 F', 'ann 1 0 B']
+        result, = replay_script(lines)
+        self.assertEqual(result.invalid, [(6, 'ann 1 0 B', 'undo_rule')])
+        moves = ['ann 0 0 R', 'bob 6 0 R', 'ann 0 1 R', 'bob 6 2 L',
+                 'ann 0 3 B', 'bob 6 0 F', 'ann 1 3 B', 'bob 4 0 B',
+                 'ann 2 3 B', 'bob 6 0 F', 'ann 3 3 B', 'bob 4 0 B',
+                 'ann 4 3 B', 'bob 6 0 F', 'ann 5 3 B', 'bob 4 0 B',
+                 'ann 5 6 L', 'bob 6 0 F', 'ann 5 4 F', 'bob 4 0 B',
+                 'ann 4 4 F', 'bob 6 0 F', 'ann 3 4 F', 'bob 4 0 B',
+                 'ann 2 4 F', 'bob 6 0 F']
+        result, = replay_script(['game ann W bob B'] + moves)
+        self.assertEqual(result.winner, 'ann')
+        self.assertEqual(result.captured['ann'], 7)
+        self.assertEqual(result.invalid, [(27, 'bob 6 0 F', 'game_over')])
+
+    def test_run_scripts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'moves.txt')
+            with open(path, 'w') as script:
+                script.write(SCRIPT)
+            output = io.StringIO()
+            self.assertEqual(run_scripts([path], output, as_json=True), 6)
+            games = [json.loads(line) for line in output.getvalue().splitlines()]
+            self.assertEqual(len(games), 4)
+            self.assertEqual(games[0]['invalid'][0],
+                             {'line': 5, 'text': 'bob 6 1 R',
+                              'reason': 'wrong_turn'})
+            self.assertEqual(games[2]['players'], [['x', 'B'], ['y', 'W']])
+
+
+if __name__ == '__main__':
+    unittest.main()
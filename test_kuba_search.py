@@ -0,0 +1,76 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_search.py file. Run using make test.
+
+import time
+import unittest
+from KubaGame import KubaGame
+from kuba_search import KubaSearchPlayer
+from kuba_test_games import SEVEN_CAPTURES_MOVES, seven_captures_game
+
+
+class TestKubaSearchPlayer(unittest.TestCase):
+    def setUp(self):
+        self.game = seven_captures_game()
+
+    def test_finds_winning_move(self):
+        player = KubaSearchPlayer(time_limit_ms=2000)
+        self.assertEqual(player.choose_move(self.game), ((2, 4), 'F'))
+        stats = player.get_stats()
+        self.assertEqual(stats['score'], 99999)
+        self.assertEqual(stats['depth'], 1)
+
+    def test_table_win_scores(self):
+        # A win stored one ply from the root is scored from its own position
+        game = seven_captures_game(len(SEVEN_CAPTURES_MOVES) - 1)
+        table = {}
+        KubaSearchPlayer(time_limit_ms=2000, max_depth=3,
+                         table=table).choose_move(game)
+        game.make_move(*SEVEN_CAPTURES_MOVES[-1])
+        self.assertEqual(table[game.position_key()][1], 99999)
+        player = KubaSearchPlayer(time_limit_ms=2000, table=table)
+        self.assertEqual(player.choose_move(game), ((2, 4), 'F'))
+        self.assertEqual(player.get_stats()['score'], 99999)
+        for score in (99990, -99990, 500, -500):
+            stored = KubaSearchPlayer._to_table(score, 3)
+            self.assertEqual(KubaSearchPlayer._from_table(stored, 3), score)
+
+    def test_symmetry(self):
+        player = KubaSearchPlayer(time_limit_ms=2000, symmetry=True)
+        self.assertEqual(player.choose_move(self.game), ((2, 4), 'F'))
+        self.assertEqual(player.get_stats()['score'], 99999)
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        game.make_move('ann', (6, 6), 'F')
+        player = KubaSearchPlayer(time_limit_ms=100, symmetry=True)
+        self.assertIn(player.choose_move(game), game.legal_moves())
+
+    def test_does_not_change_game(self):
+        board = [row[:] for row in self.game._board.board]
+        key = self.game.position_key()
+        KubaSearchPlayer(time_limit_ms=50).choose_move(self.game)
+        self.assertEqual(self.game._board.board, board)
+        self.assertEqual(self.game.position_key(), key)
+
+    def test_time_limit(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        player = KubaSearchPlayer(time_limit_ms=100)
+        start = time.perf_counter()
+        move = player.choose_move(game, 'ann')
+        elapsed = time.perf_counter() - start
+        self.assertIn(move, game.legal_moves('ann'))
+        self.assertLess(elapsed, 0.2)
+        stats = player.get_stats()
+        self.assertGreater(stats['nodes'], 0)
+        self.assertGreaterEqual(stats['depth'], 1)
+        self.assertGreaterEqual(stats['tt_hit_rate'], 0)
+        self.assertLessEqual(stats['tt_hit_rate'], 1)
+
+    def test_no_moves(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        player = KubaSearchPlayer(time_limit_ms=50)
+        self.assertIsNone(player.choose_move(game))
+        self.assertEqual(player.get_stats()['depth'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
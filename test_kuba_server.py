@@ -0,0 +1,152 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_server.py and kuba_client.py files. Run
+#               using make test.
+
+import asyncio
+import json
+import unittest
+from kuba_client import KubaClient, KubaServerError, run_load
+from kuba_server import KubaServer
+from kuba_test_games import SEVEN_CAPTURES_MOVES, SEVEN_CAPTURES_WIN
+
+
+class TestKubaServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = KubaServer(port=0, queue_size=4, finished_ttl=0.5)
+        await self.server.start()
+        self.client = await KubaClient.connect(port=self.server.get_port())
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_create_move_state(self):
+        game, state = await self.client.create(('ann', 'W'), ('bob', 'B'))
+        self.assertEqual(state['board'][0], 'WW   BB')
+        self.assertEqual(state['turn'], None)
+        made, state = await self.client.move(game, 'ann', (6, 5), 'F')
+        self.assertTrue(made)
+        self.assertEqual(state['turn'], 'bob')
+        self.assertEqual(state['moves'], 1)
+        self.assertIn([6, 0, 'F'], state['legal_moves'])
+        made, state = await self.client.move(game, 'ann', (6, 6), 'F')
+        self.assertFalse(made)
+        self.assertEqual(await self.client.state(game), state)
+        self.assertEqual(self.server.get_game_count(), 1)
+
+    async def test_errors(self):
+        with self.assertRaises(KubaServerError):
+            await self.client.state(12345)
+        with self.assertRaises(KubaServerError):
+            await self.client.create(('ann', 'W'), ('bob', 'W'))
+        with self.assertRaises(KubaServerError):
+            await self.client.request('fly')
+        game, _ = await self.client.create(('ann', 'W'), ('bob', 'B'))
+        with self.assertRaises(KubaServerError):
+            await self.client.move(game, 'eve', (6, 5), 'F')
+        # The connection still works after errors
+        self.assertEqual((await self.client.state(game))['moves'], 0)
+
+    async def test_unhashable_op(self):
+        reader, writer = await asyncio.open_connection(
+            port=self.server.get_port())
+        for op in ([], {}):
+            writer.write(json.dumps({'id': 7, 'op': op}).encode() + b'\n')
+            response = json.loads(await reader.readline())
+            self.assertEqual(response, {'id': 7, 'ok': False,
+                                        'error': 'unknown op'})
+        writer.close()
+
+    async def test_close_and_finished_games(self):
+        game, _ = await self.client.create(('ann', 'W'), ('bob', 'B'))
+        spectator = await KubaClient.connect(port=self.server.get_port())
+        await spectator.subscribe(game)
+        await self.client.close_game(game)
+        self.assertEqual(await spectator.next_update(),
+                         {'event': 'closed', 'game': game})
+        self.assertEqual(self.server.get_game_count(), 0)
+        with self.assertRaises(KubaServerError):
+            await self.client.state(game)
+
+        # A game with a winner is kept until finished_ttl has passed
+        game, _ = await self.client.create(('ann', 'W'), ('bob', 'B'))
+        await spectator.subscribe(game)
+        moves = SEVEN_CAPTURES_MOVES + [SEVEN_CAPTURES_WIN]
+        for name, coordinates, direction in moves:
+            made, state = await self.client.move(game, name, coordinates,
+                                                 direction)
+            self.assertTrue(made)
+        self.assertEqual(state['winner'], 'ann')
+        self.assertEqual(await self.client.state(game), state)
+        # Nobody watching is no reason to remove it either
+        await spectator.unsubscribe(game)
+        await spectator.subscribe(game)
+        self.assertEqual(self.server.get_game_count(), 1)
+        await asyncio.sleep(0.6)
+        with self.assertRaises(KubaServerError):
+            await self.client.state(game)
+        self.assertEqual(self.server.get_game_count(), 0)
+        updates = [await spectator.next_update() for _ in range(len(moves))]
+        self.assertEqual(updates[-1]['state']['winner'], 'ann')
+        self.assertEqual(await spectator.next_update(),
+                         {'event': 'closed', 'game': game})
+        await spectator.close()
+
+    async def test_invalid_json(self):
+        reader, writer = await asyncio.open_connection(
+            port=self.server.get_port())
+        writer.write(b'not json\n')
+        response = json.loads(await reader.readline())
+        self.assertFalse(response['ok'])
+        writer.close()
+
+    async def test_subscribe(self):
+        game, _ = await self.client.create(('ann', 'W'), ('bob', 'B'))
+        spectator = await KubaClient.connect(port=self.server.get_port())
+        try:
+            await spectator.subscribe(game)
+            await self.client.move(game, 'ann', (6, 5), 'F')
+            await self.client.move(game, 'ann', (6, 6), 'F')   # Not made
+            await self.client.move(game, 'bob', (6, 0), 'F')
+            first = await spectator.next_update()
+            second = await spectator.next_update()
+            self.assertEqual(first['game'], game)
+            self.assertEqual(first['state']['moves'], 1)
+            self.assertEqual(second['state']['turn'], 'ann')
+        finally:
+            await spectator.close()
+
+    async def test_slow_spectator_does_not_block(self):
+        game, state = await self.client.create(('ann', 'W'), ('bob', 'B'))
+        reader, writer = await asyncio.open_connection(
+            port=self.server.get_port())
+        writer.write(json.dumps(
+            {'id': 1, 'op': 'subscribe', 'game': game}).encode() + b'\n')
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        # The spectator never reads, but the players can keep playing
+        name, moves = 'ann', [[6, 5, 'F']]
+        for _ in range(60):
+            if state['winner'] is not None or not moves:
+                break
+            row, col, direction = moves[0]
+            made, state = await asyncio.wait_for(
+                self.client.move(game, name, (row, col), direction), 5)
+            self.assertTrue(made)
+            name, moves = state['turn'], state['legal_moves']
+        self.assertGreater(state['moves'], 10)
+        writer.close()
+
+    async def test_load(self):
+        report = await run_load(port=self.server.get_port(), games=6,
+                                concurrency=3, max_moves=20)
+        self.assertEqual(report['games'], 6)
+        self.assertGreater(report['moves'], 0)
+        # Every game is closed, also the ones stopped after max_moves
+        self.assertEqual(self.server.get_game_count(), 0)
+        self.assertLessEqual(report['p50_ms'], report['p99_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_shared_table.py file. Run using make test.
+
+import pickle
+import struct
+import unittest
+from KubaGame import KubaGame
+from kuba_search import KubaSearchPlayer
+from kuba_shared_table import KubaParallelSearchPlayer, KubaSharedTable
+
+
+class TestKubaSharedTable(unittest.TestCase):
+    def setUp(self):
+        self.table = KubaSharedTable(megabytes=1)
+        self.addCleanup(self.table.__exit__)
+
+    def test_store_and_get(self):
+        key = KubaGame(('ann', 'W'), ('bob', 'B')).position_key()
+        self.assertIsNone(self.table.get(key))
+        self.table[key] = (3, -99950, 1, ((6, 6), 'F'))
+        self.assertEqual(self.table.get(key), (3, -99950, 1, ((6, 6), 'F')))
+        self.table[key] = (4, 12, -1, None)
+        self.assertEqual(self.table.get(key), (4, 12, -1, None))
+        self.assertIsNone(self.table.get(key ^ 1))
+        self.assertEqual(self.table.get(1 << 70 | 5), None)
+        self.table[1 << 70 | 5] = (1, 0, 0, None)
+        self.assertEqual(self.table.get(1 << 70 | 5), (1, 0, 0, None))
+        self.table.clear()
+        self.assertIsNone(self.table.get(key))
+
+    def test_replacement(self):
+        buckets = self.table.get_capacity() // 2
+        deep, shallow, other = 7, 7 + buckets, 7 + 2 * buckets
+        self.table[deep] = (5, 1, 0, None)
+        self.table[shallow] = (2, 2, 0, None)
+        self.table[other] = (1, 3, 0, None)
+        # The deep entry stays, the always replaced entry holds the last one
+        self.assertEqual(self.table.get(deep), (5, 1, 0, None))
+        self.assertIsNone(self.table.get(shallow))
+        self.assertEqual(self.table.get(other), (1, 3, 0, None))
+        self.table.new_search()
+        self.table[shallow] = (2, 2, 0, None)
+        self.assertIsNone(self.table.get(deep))
+        self.assertEqual(self.table.get(shallow), (2, 2, 0, None))
+
+    def test_torn_entry_is_missing(self):
+        self.table[9] = (3, 4, 0, None)
+        offset = 16 + 9 * 32 + 8
+        data, = struct.unpack_from('<Q', self.table._buffer, offset)
+        struct.pack_into('<Q', self.table._buffer, offset, data ^ 1 << 40)
+        self.assertIsNone(self.table.get(9))
+
+    def test_pickle_attaches(self):
+        other = pickle.loads(pickle.dumps(self.table))
+        self.assertEqual(other.get_name(), self.table.get_name())
+        other[42] = (2, 5, 0, ((0, 0), 'R'))
+        self.assertEqual(self.table.get(42), (2, 5, 0, ((0, 0), 'R')))
+
+    def test_search_with_shared_table(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+        player = KubaSearchPlayer(time_limit_ms=10000, max_depth=2,
+                                  table=self.table, seed=1)
+        move = player.choose_move(game, 'ann')
+        self.assertIn(move, game.legal_moves('ann'))
+        self.assertEqual(player.get_stats()['depth'], 2)
+        self.assertIsNotNone(self.table.get(game.position_key()))
+
+
+class TestKubaParallelSearchPlayer(unittest.TestCase):
+    def test_choose_move(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+        with KubaParallelSearchPlayer(time_limit_ms=300, workers=2,
+                                      megabytes=1, max_depth=3) as player:
+            move = player.choose_move(game, 'ann')
+            self.assertIn(move, game.legal_moves('ann'))
+            stats = player.get_stats()
+            self.assertEqual(stats['workers'], 2)
+            self.assertGreater(stats['nodes'], 0)
+            game.make_move('ann', *move)
+            self.assertIn(player.choose_move(game), game.legal_moves())
+
+
+if __name__ == '__main__':
+    unittest.main()
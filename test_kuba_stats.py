@@ -0,0 +1,84 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_stats.py file. Run using make test.
+
+import unittest
+from KubaGame import KubaGame
+from kuba_stats import KubaStats
+
+
+class TestKubaStats(unittest.TestCase):
+    def test_disabled_by_default(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertIsNone(game.get_stats())
+        self.assertTrue(game.make_move('ann', (6, 5), 'F'))
+        self.assertIsNone(game.get_stats())
+
+    def test_rejection_reasons(self):
+        for bitboard in (False, True):
+            game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=bitboard)
+            game.enable_stats()
+            self.assertFalse(game.make_move('ann', (0, 2), 'R'))  # wrong color
+            self.assertFalse(game.make_move('ann', (0, 1), 'R'))  # blocked
+            self.assertFalse(game.make_move('ann', (1, 1), 'B'))  # blocked
+            self.assertFalse(game.make_move('ann', (0, 0), 'X'))  # direction
+            self.assertFalse(game.make_move('ann', (7, 0), 'L'))  # range
+            self.assertFalse(game.make_move('ann', (6, 6), 'R'))  # own marble
+            self.assertTrue(game.make_move('ann', (0, 0), 'B'))
+            self.assertFalse(game.make_move('ann', (6, 6), 'L'))  # wrong turn
+            self.assertTrue(game.make_move('bob', (6, 0), 'F'))
+            self.assertTrue(game.make_move('ann', (1, 0), 'B'))
+            self.assertTrue(game.make_move('bob', (5, 0), 'F'))
+            self.assertFalse(game.make_move('ann', (1, 0), 'B'))  # undo rule
+            stats = game.get_stats()
+            self.assertEqual(stats['rejections'], {
+                'wrong_turn': 1, 'game_over': 0, 'out_of_range': 1,
+                'wrong_color': 1, 'blocked': 2, 'own_marble_push_off': 1,
+                'bad_direction': 1, 'undo_rule': 1,
+            })
+            self.assertEqual(stats['timings']['make_move']['calls'], 12)
+            self.assertEqual(stats['timings']['validate_move']['calls'], 12)
+            self.assertEqual(stats['counters']['moves_made'], 4)
+            self.assertEqual(stats['counters']['board_allocations'], 5)
+
+    def test_game_over(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'), bitboard=True)
+        game._winner = 'ann'
+        game._turn = 'ann'
+        game.enable_stats()
+        self.assertFalse(game.make_move('ann', (6, 5), 'F'))
+        self.assertEqual(game.get_stats()['rejections']['game_over'], 1)
+
+    def test_shared_and_disabled(self):
+        stats = KubaStats()
+        games = [KubaGame(('ann', 'W'), ('bob', 'B')) for _ in range(3)]
+        for game in games:
+            self.assertIs(game.enable_stats(stats), stats)
+            game.make_move('ann', (6, 5), 'F')
+            game.get_marble_count()
+        games[0].disable_stats()
+        games[0].make_move('bob', (6, 0), 'F')
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['counters']['moves_made'], 3)
+        self.assertEqual(snapshot['timings']['make_move']['calls'], 3)
+        stats.reset()
+        self.assertEqual(stats.snapshot()['counters']['moves_made'], 0)
+
+    def test_prometheus(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        stats = game.enable_stats()
+        game.make_move('ann', (6, 5), 'F')
+        game.make_move('ann', (6, 6), 'L')
+        text = stats.to_prometheus()
+        self.assertIn('# TYPE kuba_make_move_seconds summary\n', text)
+        self.assertIn('kuba_make_move_seconds_count 2\n', text)
+        self.assertIn('kuba_moves_made_total 1\n', text)
+        self.assertIn('kuba_rejected_moves_total{reason="wrong_turn"} 1\n', text)
+        for line in text.splitlines():
+            if not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                float(value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_symmetry.py file. Run using make test.
+
+import random
+import unittest
+from KubaGame import KubaGame
+from kuba_symmetry import (IDENTITY, SWAP_COLORS, TRANSFORMS,
+                           canonical_position, canonicalize, inverse,
+                           transform_move, transform_state)
+
+PLAYERS = (('ann', 'W'), ('bob', 'B'))
+
+
+def random_game(seed, moves=40):
+    """Returns a game after up to moves random moves"""
+    rand = random.Random(seed)
+    game = KubaGame(*PLAYERS, bitboard=True)
+    name = 'ann'
+    for _ in range(moves):
+        legal = game.legal_moves(name)
+        if not legal or game.get_winner() is not None:
+            break
+        game.make_move(name, *rand.choice(legal))
+        name = game.get_current_turn()
+    return game
+
+
+class TestKubaSymmetry(unittest.TestCase):
+    def test_inverse(self):
+        move = ((1, 2), 'L')
+        state = random_game(1).get_state()
+        for transform in TRANSFORMS:
+            self.assertEqual(
+                transform_move(transform_move(move, transform),
+                               inverse(transform)), move)
+            self.assertEqual(
+                transform_state(transform_state(state, transform),
+                                inverse(transform)), state)
+        self.assertEqual(transform_move(move, 1), ((2, 5), 'F'))
+        self.assertEqual(transform_move(move, 4), ((1, 4), 'R'))
+
+    def test_start(self):
+        state = KubaGame(*PLAYERS).get_state()
+        self.assertEqual(transform_state(state, 2), state)
+        swapped = transform_state(state, 4 | SWAP_COLORS)
+        self.assertEqual(swapped[:6], state[:6])
+        self.assertEqual(len({transform_state(state, transform)
+                              for transform in TRANSFORMS}), 2)
+
+    def test_moves_commute(self):
+        for seed in range(5):
+            game = random_game(seed, 20)
+            if game.get_winner() is not None:
+                continue
+            name = game.get_current_turn()
+            state = game.get_state()
+            for move in game.legal_moves():
+                after = game.copy()
+                after.make_move(name, *move)
+                for transform in TRANSFORMS:
+                    other = KubaGame.from_state(
+                        *PLAYERS, transform_state(state, transform))
+                    other_name = other.get_current_turn()
+                    self.assertTrue(other.make_move(
+                        other_name, *transform_move(move, transform)))
+                    self.assertEqual(
+                        other.get_state(),
+                        transform_state(after.get_state(), transform))
+
+    def test_canonical(self):
+        for seed in range(10):
+            game = random_game(seed)
+            position, transform = canonical_position(game)
+            state = game.get_state()
+            self.assertEqual(position.to_state(),
+                             transform_state(state, transform))
+            for other in TRANSFORMS:
+                symmetric = transform_state(state, other)
+                self.assertEqual(canonicalize(symmetric)[0],
+                                 position.to_state())
+
+    def test_shrinks_positions(self):
+        positions = set()
+        canonical = set()
+        for seed in range(20):
+            state = random_game(seed, 10).get_state()
+            for transform in TRANSFORMS:
+                symmetric = transform_state(state, transform)
+                positions.add(symmetric)
+                canonical.add(canonicalize(symmetric)[0])
+        self.assertLessEqual(len(canonical) * 8, len(positions))
+        self.assertEqual(canonicalize(canonicalize(state)[0])[1], IDENTITY)
+
+
+if __name__ == '__main__':
+    unittest.main()
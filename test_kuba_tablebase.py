@@ -0,0 +1,110 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_tablebase.py file. Run using make test.
+
+import os
+import random
+import tempfile
+import unittest
+from KubaGame import KubaGame
+from kuba_search import KubaSearchPlayer
+from kuba_tablebase import (KubaTablebase, block_keys, board_count,
+                            build_tablebase, _board_index, _boards)
+
+
+def make_game(white, black, red, turn):
+    """Returns a game with one marble of each color at the given cells"""
+    bits = (1 << white, 1 << black, 1 << red)
+    state = bits + bits + (turn, None, 6, 6, None)
+    return KubaGame.from_state(('ann', 'W'), ('bob', 'B'), state)
+
+
+class TestKubaTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'kuba.kbt')
+        build_tablebase(cls.path, workers=2)
+        cls.tablebase = KubaTablebase(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+        cls.directory.cleanup()
+
+    def child_result(self, game, move):
+        """Returns (score, plies) for the player who made move in game"""
+        child = game.copy(bitboard=True)
+        child.push(move)
+        if child.get_winner() is not None:
+            return 1, 1
+        result = self.tablebase.probe(child)
+        if result.score == 0:
+            return 0, None
+        return -result.score, result.plies + 1
+
+    def test_block_keys(self):
+        self.assertEqual(block_keys(1, 1, 1), [(1, 1, 1, 6)])
+        self.assertEqual(block_keys(1, 1, 2), [(1, 1, 1, 6), (1, 1, 2, 5),
+                                               (1, 1, 2, 6)])
+
+    def test_board_index(self):
+        indices = sorted(_board_index(*board, (2, 1, 1))
+                         for board in _boards(2, 1, 1))
+        self.assertEqual(indices, list(range(board_count(2, 1, 1))))
+
+    def test_win_in_one(self):
+        # Ann pushes the red marble at (0, 4) off the board for her 7th
+        game = make_game(7 + 4, 6 * 7, 4, 0)
+        result = self.tablebase.probe(game)
+        self.assertEqual(result, (1, 1, ((1, 4), 'F')))
+
+    def test_values_agree_with_moves(self):
+        rand = random.Random(3)
+        for _ in range(300):
+            game = make_game(*rand.sample(range(49), 3), rand.randrange(2))
+            # Make a quiet move so the undo rule takes part
+            moves = game.legal_moves()
+            if moves:
+                move = rand.choice(moves)
+                child = game.copy(bitboard=True)
+                child.push(move)
+                if child.get_winner() is None:
+                    game = child
+            result = self.tablebase.probe(game)
+            moves = game.legal_moves()
+            if not moves:
+                self.assertEqual(result, (-1, 0, None))
+                continue
+            results = [self.child_result(game, move) for move in moves]
+            best = max(results, key=lambda item: (
+                item[0], -item[1] if item[0] > 0 else item[1] or 0))
+            self.assertEqual((result.score, result.plies), best)
+            self.assertIn(result.move, moves)
+            self.assertEqual(self.child_result(game, result.move), best)
+
+    def test_not_in_tablebase(self):
+        game = KubaGame(('ann', 'W'), ('bob', 'B'))
+        self.assertIsNone(self.tablebase.probe(game))
+        game.make_move('ann', (6, 6), 'F')
+        self.assertIsNone(self.tablebase.probe(game))
+
+    def test_search_player(self):
+        game = make_game(7 + 4, 6 * 7, 4, 0)
+        player = KubaSearchPlayer(time_limit_ms=1000, tablebase=self.tablebase)
+        self.assertEqual(player.choose_move(game), ((1, 4), 'F'))
+        stats = player.get_stats()
+        self.assertEqual(stats['tablebase_hits'], 1)
+        self.assertEqual(stats['nodes'], 0)
+        self.assertEqual(stats['score'], 99999)
+
+    def test_not_a_tablebase(self):
+        path = os.path.join(self.directory.name, 'other')
+        with open(path, 'wb') as other:
+            other.write(b'KUBA' + bytes(20))
+        with self.assertRaises(ValueError):
+            KubaTablebase(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# Author      : Ethan Rietz
+# Date        : 2026-10-18
+# Description : Unittests for the kuba_tournament.py file. Run using make test.
+
+import functools
+import json
+import os
+import tempfile
+import time
+import unittest
+from kuba_tournament import (KubaTournament, compute_elo, load_results,
+                             make_random_player)
+
+
+def crash_once(marker, seed):
+    """Kills the worker process the first time it is called"""
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return make_random_player(seed)
+
+
+def crash_on_seed(bad_seed, seed):
+    """Kills the worker process every time the game with bad_seed starts"""
+    if seed == bad_seed:
+        os._exit(1)
+    return make_random_player(seed)
+
+
+def crash_or_wait(bad_seed, seed):
+    """
+    Kills the worker process if seed is bad_seed, else waits a little so the
+    game is still running when another worker dies
+    """
+    if seed == bad_seed:
+        os._exit(1)
+    time.sleep(0.2)
+    return make_random_player(seed)
+
+
+class TestKubaTournament(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'results.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_schedule_is_fair(self):
+        tournament = KubaTournament(
+            [('a', make_random_player), ('b', make_random_player),
+             ('c', make_random_player)], 8, self.path)
+        games = tournament.schedule()
+        self.assertEqual(len(games), 24)
+        self.assertEqual(len({game['seed'] for game in games}), 24)
+        for label in 'abc':
+            self.assertEqual(sum(game['white'] == label for game in games), 8)
+            self.assertEqual(sum(game['black'] == label for game in games), 8)
+            moved_first = sum(
+                (game['white'] == label) == (game['first'] == 'W')
+                for game in games if label in (game['white'], game['black']))
+            self.assertEqual(moved_first, 8)
+
+    def test_run_and_resume(self):
+        entrants = [('a', make_random_player), ('b', make_random_player)]
+        tournament = KubaTournament(entrants, 4, self.path, workers=2,
+                                    max_moves=40)
+        records = tournament.run()
+        self.assertEqual(sorted(record['game'] for record in records),
+                         [0, 1, 2, 3])
+        for record in records:
+            self.assertEqual(len(record['latency_ms']), record['moves'])
+            self.assertIn(record['reason'], ('move_cap', 'captures',
+                    'pushed_off', 'no_moves'))
+
+        # Drop one finished game and cut off the last line like a crash would
+        with open(self.path) as results_file:
+            lines = results_file.readlines()
+        with open(self.path, 'w') as results_file:
+            results_file.writelines(lines[1:-1])
+            results_file.write(lines[-1][:10])
+        records = tournament.run()
+        self.assertEqual(sorted(record['game'] for record in records),
+                         [0, 1, 2, 3])
+        again = tournament.run()
+        self.assertEqual(len(again), len(records))
+
+    def test_survives_worker_crash(self):
+        marker = os.path.join(self.directory.name, 'crashed')
+        entrants = [('a', make_random_player),
+                    ('b', functools.partial(crash_once, marker))]
+        tournament = KubaTournament(entrants, 3, self.path, workers=2,
+                                    max_moves=20)
+        records = tournament.run()
+        self.assertTrue(os.path.exists(marker))
+        self.assertEqual(sorted(record['game'] for record in records), [0, 1, 2])
+        self.assertFalse(any(record.get('error') for record in records))
+
+    def test_crashing_game_does_not_fail_others(self):
+        entrants = [('a', make_random_player),
+                    ('b', functools.partial(crash_on_seed, 1))]
+        tournament = KubaTournament(entrants, 4, self.path, workers=1,
+                                    max_moves=20, max_retries=1)
+        records = tournament.run()
+        self.assertEqual([record['game'] for record in records], [0, 1, 2, 3])
+        self.assertEqual([record['game'] for record in records
+                          if record.get('error')], [0])
+
+        # Resuming plays the failed game again instead of treating it as done
+        records = tournament.run()
+        self.assertEqual(len(records), 4)
+        errors = [record for record in load_results(self.path)
+                  if record.get('error')]
+        self.assertEqual([record['game'] for record in errors], [0, 0])
+
+    def test_crash_only_counts_for_crashing_game(self):
+        # The games running next to the crashing one are not charged a retry
+        entrants = [('a', functools.partial(crash_or_wait, 0)),
+                    ('b', make_random_player)]
+        tournament = KubaTournament(entrants, 4, self.path, workers=2,
+                                    max_moves=20, max_retries=1)
+        records = tournament.run()
+        self.assertEqual([record['game'] for record in records], [0, 1, 2, 3])
+        self.assertEqual([record['game'] for record in load_results(self.path)
+                          if record.get('error')], [0])
+
+    def test_elo(self):
+        records = []
+        for game in range(40):
+            white, black = ('strong', 'weak') if game % 2 else ('weak', 'strong')
+            winner = 'W' if white == 'strong' or game % 10 == 0 else 'B'
+            records.append({'game': game, 'white': white, 'black': black,
+                            'winner_color': winner})
+        ratings = compute_elo(records, bootstrap=50)
+        elo, low, high = ratings['strong']
+        self.assertGreater(elo - ratings['weak'][0], 300)
+        self.assertLessEqual(low, elo)
+        self.assertGreaterEqual(high, elo)
+        self.assertAlmostEqual(elo, -ratings['weak'][0])
+
+    def test_load_results_missing_file(self):
+        self.assertEqual(load_results(self.path), [])
+
+
+if __name__ == '__main__':
+    unittest.main()